@@ -17,7 +17,9 @@ if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
 # Import all models for autogenerate
-from app.models import Prediction, ModelMetrics, ModelVersion
+from app.models import (
+    Prediction, FeatureVector, ModelMetrics, ModelVersion, ModelPerformance, MonitorWatermark
+)
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,66 @@
+"""Incremental performance monitor
+
+Revision ID: 002
+Revises: 001
+Create Date: 2024-02-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('predictions', sa.Column('labeled_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_predictions_labeled_at_id', 'predictions', ['labeled_at', 'id'], unique=False)
+
+    op.create_table(
+        'model_performance',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('model_version', sa.String(), nullable=True),
+        sa.Column('true_positives', sa.Integer(), nullable=True),
+        sa.Column('false_positives', sa.Integer(), nullable=True),
+        sa.Column('true_negatives', sa.Integer(), nullable=True),
+        sa.Column('false_negatives', sa.Integer(), nullable=True),
+        sa.Column('squared_error_sum', sa.Float(), nullable=True),
+        sa.Column('calibration_counts', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.Column('calibration_probability_sums', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.Column('calibration_positives', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.Column('score_histogram_positive', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.Column('score_histogram_negative', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('model_version')
+    )
+    op.create_index(op.f('ix_model_performance_id'), 'model_performance', ['id'], unique=False)
+    op.create_index(op.f('ix_model_performance_model_version'), 'model_performance', ['model_version'], unique=True)
+
+    op.create_table(
+        'monitor_watermarks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('labeled_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('prediction_id', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_monitor_watermarks_id'), 'monitor_watermarks', ['id'], unique=False)
+    op.create_index(op.f('ix_monitor_watermarks_name'), 'monitor_watermarks', ['name'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_monitor_watermarks_name'), table_name='monitor_watermarks')
+    op.drop_index(op.f('ix_monitor_watermarks_id'), table_name='monitor_watermarks')
+    op.drop_table('monitor_watermarks')
+    op.drop_index(op.f('ix_model_performance_model_version'), table_name='model_performance')
+    op.drop_index(op.f('ix_model_performance_id'), table_name='model_performance')
+    op.drop_table('model_performance')
+    op.drop_index('ix_predictions_labeled_at_id', table_name='predictions')
+    op.drop_column('predictions', 'labeled_at')
@@ -0,0 +1,128 @@
+"""Partition predictions by timestamp and add composite indexes
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-03-01 00:00:00.000000
+
+On PostgreSQL the predictions table is rebuilt as a table range-partitioned
+by month on ``timestamp`` (primary key becomes ``(id, timestamp)``), with a
+default partition as a safety net. Future partitions and retention are then
+handled by ``app.services.partition_manager``. Other databases only get the
+composite indexes.
+
+"""
+from datetime import datetime, timezone
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+COLUMNS = "id, customer_id, prediction, probability, model_version, features, timestamp, is_churn, labeled_at"
+
+
+def _add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _create_indexes():
+    op.create_index('ix_predictions_model_version_timestamp', 'predictions', ['model_version', 'timestamp'], unique=False)
+    op.create_index('ix_predictions_customer_id_timestamp', 'predictions', ['customer_id', 'timestamp'], unique=False)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.drop_index('ix_predictions_customer_id', table_name='predictions')
+        op.drop_index('ix_predictions_id', table_name='predictions')
+        _create_indexes()
+        return
+
+    op.execute("ALTER TABLE predictions RENAME TO predictions_legacy")
+    op.execute("ALTER TABLE predictions_legacy RENAME CONSTRAINT predictions_pkey TO predictions_legacy_pkey")
+    op.execute("ALTER SEQUENCE predictions_id_seq OWNED BY NONE")
+    op.drop_index('ix_predictions_customer_id', table_name='predictions_legacy')
+    op.drop_index('ix_predictions_id', table_name='predictions_legacy')
+    op.drop_index('ix_predictions_labeled_at_id', table_name='predictions_legacy')
+
+    op.execute("""
+        CREATE TABLE predictions (
+            id INTEGER NOT NULL DEFAULT nextval('predictions_id_seq'),
+            customer_id VARCHAR,
+            prediction FLOAT,
+            probability FLOAT,
+            model_version VARCHAR,
+            features JSON,
+            timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            is_churn BOOLEAN,
+            labeled_at TIMESTAMP WITH TIME ZONE,
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+    op.execute("ALTER SEQUENCE predictions_id_seq OWNED BY predictions.id")
+    op.execute("CREATE TABLE predictions_default PARTITION OF predictions DEFAULT")
+
+    # Monthly partitions covering existing rows plus a few months ahead
+    oldest = bind.execute(sa.text("SELECT min(timestamp) FROM predictions_legacy")).scalar()
+    now = datetime.now(timezone.utc)
+    start = _add_months(oldest.astimezone(timezone.utc) if oldest else now, 0)
+    end = _add_months(now, MONTHS_AHEAD + 1)
+    while start < end:
+        upper = _add_months(start, 1)
+        op.execute(
+            f"CREATE TABLE predictions_p{start:%Y%m} PARTITION OF predictions "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        start = upper
+
+    _create_indexes()
+    op.create_index('ix_predictions_labeled_at_id', 'predictions', ['labeled_at', 'id'], unique=False)
+
+    op.execute(f"""
+        INSERT INTO predictions ({COLUMNS})
+        SELECT id, customer_id, prediction, probability, model_version, features,
+               COALESCE(timestamp, now()), is_churn, labeled_at
+        FROM predictions_legacy
+    """)
+    op.execute("DROP TABLE predictions_legacy")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.drop_index('ix_predictions_customer_id_timestamp', table_name='predictions')
+        op.drop_index('ix_predictions_model_version_timestamp', table_name='predictions')
+        op.create_index(op.f('ix_predictions_customer_id'), 'predictions', ['customer_id'], unique=False)
+        op.create_index(op.f('ix_predictions_id'), 'predictions', ['id'], unique=False)
+        return
+
+    op.execute("ALTER TABLE predictions RENAME TO predictions_partitioned")
+    op.execute("ALTER TABLE predictions_partitioned RENAME CONSTRAINT predictions_pkey TO predictions_partitioned_pkey")
+    op.execute("ALTER SEQUENCE predictions_id_seq OWNED BY NONE")
+    op.execute("""
+        CREATE TABLE predictions (
+            id INTEGER NOT NULL DEFAULT nextval('predictions_id_seq'),
+            customer_id VARCHAR,
+            prediction FLOAT,
+            probability FLOAT,
+            model_version VARCHAR,
+            features JSON,
+            timestamp TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            is_churn BOOLEAN,
+            labeled_at TIMESTAMP WITH TIME ZONE,
+            PRIMARY KEY (id)
+        )
+    """)
+    op.execute("ALTER SEQUENCE predictions_id_seq OWNED BY predictions.id")
+    op.execute(f"INSERT INTO predictions ({COLUMNS}) SELECT {COLUMNS} FROM predictions_partitioned")
+    op.execute("DROP TABLE predictions_partitioned CASCADE")
+
+    op.create_index(op.f('ix_predictions_customer_id'), 'predictions', ['customer_id'], unique=False)
+    op.create_index(op.f('ix_predictions_id'), 'predictions', ['id'], unique=False)
+    op.create_index('ix_predictions_labeled_at_id', 'predictions', ['labeled_at', 'id'], unique=False)
@@ -0,0 +1,32 @@
+"""Compact feature-vector storage for predictions
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-03-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'feature_vectors',
+        sa.Column('content_hash', sa.LargeBinary(length=16), nullable=False),
+        sa.Column('codec_version', sa.String(), nullable=False),
+        sa.Column('vector', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('content_hash')
+    )
+    op.add_column('predictions', sa.Column('feature_hash', sa.LargeBinary(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('predictions', 'feature_hash')
+    op.drop_table('feature_vectors')
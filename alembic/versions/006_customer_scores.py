@@ -0,0 +1,37 @@
+"""Precomputed customer scores
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-04-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'customer_scores',
+        sa.Column('model_version', sa.String(), nullable=False),
+        sa.Column('customer_id', sa.String(), nullable=False),
+        sa.Column('prediction', sa.Float(), nullable=False),
+        sa.Column('probability', sa.Float(), nullable=False),
+        sa.Column('feature_hash', sa.LargeBinary(length=16), nullable=False),
+        sa.Column('scored_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('model_version', 'customer_id')
+    )
+    op.create_index(
+        'ix_customer_scores_model_version_probability', 'customer_scores',
+        ['model_version', 'probability'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_customer_scores_model_version_probability', table_name='customer_scores')
+    op.drop_table('customer_scores')
@@ -0,0 +1,52 @@
+"""Covering indexes for keyset-paginated prediction history
+
+Revision ID: 007
+Revises: 006
+Create Date: 2024-05-01 00:00:00.000000
+
+History pages are read newest first on (timestamp, id), optionally for one
+customer or model version. The (customer_id, timestamp) and
+(model_version, timestamp) indexes gain ``id`` as a tie-breaker and
+replace the ones from 003, which they also serve. On PostgreSQL the
+returned columns that never change after insert are INCLUDEd, so a page
+reads the heap only for ``is_churn``. That one is left out on purpose:
+labels are written long after the prediction, and an INCLUDEd ``is_churn``
+would widen all three indexes and make every label update a change to
+indexed data.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+PAYLOAD = ['prediction', 'probability']
+
+
+def upgrade() -> None:
+    op.drop_index('ix_predictions_customer_id_timestamp', table_name='predictions')
+    op.drop_index('ix_predictions_model_version_timestamp', table_name='predictions')
+    op.create_index(
+        'ix_predictions_customer_id_timestamp_id', 'predictions', ['customer_id', 'timestamp', 'id'],
+        unique=False, postgresql_include=['model_version'] + PAYLOAD
+    )
+    op.create_index(
+        'ix_predictions_model_version_timestamp_id', 'predictions', ['model_version', 'timestamp', 'id'],
+        unique=False, postgresql_include=['customer_id'] + PAYLOAD
+    )
+    op.create_index(
+        'ix_predictions_timestamp_id', 'predictions', ['timestamp', 'id'],
+        unique=False, postgresql_include=['customer_id', 'model_version'] + PAYLOAD
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_predictions_timestamp_id', table_name='predictions')
+    op.drop_index('ix_predictions_model_version_timestamp_id', table_name='predictions')
+    op.drop_index('ix_predictions_customer_id_timestamp_id', table_name='predictions')
+    op.create_index('ix_predictions_model_version_timestamp', 'predictions', ['model_version', 'timestamp'], unique=False)
+    op.create_index('ix_predictions_customer_id_timestamp', 'predictions', ['customer_id', 'timestamp'], unique=False)
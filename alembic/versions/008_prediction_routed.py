@@ -0,0 +1,29 @@
+"""Mark predictions routed by the canary split
+
+Revision ID: 008
+Revises: 007
+Create Date: 2024-05-15 00:00:00.000000
+
+Only predictions whose version was chosen by the random split between the
+active and canary models are comparable, so only their outcomes feed the
+canary analysis. Existing rows stay NULL (unknown) and are left out. The
+column is nullable without a default, so adding it is a catalog-only change
+on PostgreSQL, partitions included.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('predictions', sa.Column('routed', sa.Boolean(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('predictions', 'routed')
@@ -0,0 +1,209 @@
+"""Admission control: per-lane row budgets, queueing, load shedding and request deadlines"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+from prometheus_client import Counter, Gauge, Histogram
+from app.config import settings
+from app.instrumentation import current_timings
+
+# Header with the client's time budget for the request, in milliseconds
+TIMEOUT_HEADER = "x-request-timeout-ms"
+
+ADMISSION_REJECTED = Counter(
+    'admission_rejected_total',
+    'Prediction requests shed before inference',
+    ['lane', 'reason']  # overloaded, deadline
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    'admission_queue_wait_seconds',
+    'Time admitted requests waited for their lane',
+    ['lane'],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+ROWS_IN_FLIGHT = Gauge('admission_rows_in_flight', 'Rows being scored per lane', ['lane'])
+ROWS_QUEUED = Gauge('admission_rows_queued', 'Rows waiting for admission per lane', ['lane'])
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class Overloaded(Exception):
+    """Raised when a lane cannot take the request within its deadline"""
+    
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+    
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's deadline passed before its work could run"""
+
+
+def request_deadline(lane: str, timeout_ms: Optional[str] = None) -> float:
+    """Monotonic deadline of the current request.
+    
+    The budget is the client's ``X-Request-Timeout-Ms`` when given (capped
+    at the lane default), counted from when the request arrived.
+    """
+    budget = settings.admission_batch_timeout_ms if lane == "batch" else settings.admission_interactive_timeout_ms
+    if timeout_ms:
+        try:
+            budget = min(budget, max(float(timeout_ms), 0.0))
+        except ValueError:
+            pass
+    timings = current_timings()
+    started = timings.started if timings is not None else time.perf_counter()
+    return started + budget / 1000.0
+
+
+def check_deadline():
+    """Drop work whose deadline already passed; call before expensive stages"""
+    deadline = _deadline.get()
+    if deadline is not None and time.perf_counter() >= deadline:
+        raise DeadlineExceeded("Request deadline passed before inference")
+
+
+class _Waiter:
+    def __init__(self, rows: int):
+        self.rows = rows
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class Lane:
+    """Rows in flight and a FIFO queue for one class of traffic.
+    
+    A request is admitted while the rows in flight stay within ``capacity``;
+    one larger than the whole budget runs alone. Queue waits are estimated
+    from a moving average of the time each admitted row held the lane.
+    """
+    
+    def __init__(self, name: str, capacity: int, max_queued_rows: int):
+        self.name = name
+        self.capacity = capacity
+        self.max_queued_rows = max_queued_rows
+        self.in_flight = 0
+        self.queued_rows = 0
+        self.seconds_per_row = 0.0
+        self._queue: "deque[_Waiter]" = deque()
+    
+    def _fits(self, rows: int) -> bool:
+        return self.in_flight == 0 or self.in_flight + rows <= self.capacity
+    
+    def estimated_wait(self, rows: int) -> float:
+        """Seconds until ``rows`` more rows would be admitted"""
+        ahead = self.in_flight + self.queued_rows + rows - self.capacity
+        return max(ahead, 0) * self.seconds_per_row
+    
+    async def acquire(self, rows: int, deadline: float):
+        if not self._queue and self._fits(rows):
+            self._take(rows)
+            return
+        
+        remaining = deadline - time.perf_counter()
+        wait = self.estimated_wait(rows)
+        if self.queued_rows + rows > self.max_queued_rows or wait > remaining:
+            ADMISSION_REJECTED.labels(lane=self.name, reason="overloaded").inc()
+            raise Overloaded(f"The {self.name} lane is overloaded", retry_after=wait)
+        
+        waiter = _Waiter(rows)
+        self._queue.append(waiter)
+        self.queued_rows += rows
+        ROWS_QUEUED.labels(lane=self.name).set(self.queued_rows)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=max(remaining, 0.0))
+        except asyncio.TimeoutError:
+            if waiter.future.done():
+                # Admitted just as the wait timed out; give the rows back
+                self.release(rows, 0.0)
+            else:
+                self._dequeue(waiter)
+            ADMISSION_REJECTED.labels(lane=self.name, reason="deadline").inc()
+            raise DeadlineExceeded(f"Request deadline passed while queued in the {self.name} lane")
+        except BaseException:
+            if waiter.future.done():
+                self.release(rows, 0.0)
+            else:
+                self._dequeue(waiter)
+            raise
+    
+    def release(self, rows: int, seconds: float):
+        self.in_flight -= rows
+        if seconds > 0:
+            sample = seconds / rows
+            alpha = settings.admission_estimate_smoothing
+            self.seconds_per_row = sample if self.seconds_per_row == 0 else (
+                alpha * sample + (1 - alpha) * self.seconds_per_row
+            )
+        while self._queue and self._fits(self._queue[0].rows):
+            waiter = self._queue.popleft()
+            self.queued_rows -= waiter.rows
+            self._take(waiter.rows)
+            waiter.future.set_result(None)
+        ROWS_QUEUED.labels(lane=self.name).set(self.queued_rows)
+        ROWS_IN_FLIGHT.labels(lane=self.name).set(self.in_flight)
+    
+    def _take(self, rows: int):
+        self.in_flight += rows
+        ROWS_IN_FLIGHT.labels(lane=self.name).set(self.in_flight)
+    
+    def _dequeue(self, waiter: _Waiter):
+        self._queue.remove(waiter)
+        self.queued_rows -= waiter.rows
+        ROWS_QUEUED.labels(lane=self.name).set(self.queued_rows)
+
+
+class AdmissionController:
+    """Separate budgets for interactive (single-row) and batch prediction traffic"""
+    
+    def __init__(self):
+        self.lanes: Dict[str, Lane] = {}
+    
+    def lane(self, name: str) -> Lane:
+        if name not in self.lanes:
+            if name == "interactive":
+                lane = Lane(name, settings.admission_interactive_rows, settings.admission_interactive_queue_rows)
+            elif name == "batch":
+                lane = Lane(name, settings.admission_batch_rows, settings.admission_batch_queue_rows)
+            else:
+                raise ValueError(f"Unknown admission lane: {name}")
+            self.lanes[name] = lane
+        return self.lanes[name]
+    
+    @asynccontextmanager
+    async def admit(self, lane_name: str, rows: int, timeout_ms: Optional[str] = None):
+        """Hold ``rows`` of the lane's budget for the block, with the request deadline set.
+        
+        Raises ``Overloaded`` when the estimated queue wait exceeds the
+        deadline and ``DeadlineExceeded`` when it passes while queued.
+        """
+        deadline = request_deadline(lane_name, timeout_ms)
+        token = _deadline.set(deadline)
+        try:
+            if not settings.admission_enabled:
+                yield
+                return
+            rows = max(rows, 1)
+            lane = self.lane(lane_name)
+            queued_at = time.perf_counter()
+            await lane.acquire(rows, deadline)
+            admitted_at = time.perf_counter()
+            ADMISSION_QUEUE_WAIT.labels(lane=lane_name).observe(admitted_at - queued_at)
+            try:
+                yield
+            finally:
+                lane.release(rows, time.perf_counter() - admitted_at)
+        finally:
+            _deadline.reset(token)
+    
+    def reset(self):
+        self.lanes.clear()
+
+
+admission_controller = AdmissionController()
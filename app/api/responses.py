@@ -0,0 +1,51 @@
+"""Compact JSON responses for the prediction routes"""
+import json
+from datetime import date, datetime
+from typing import Any, Optional
+import numpy as np
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+# Accept header value that opts a request into the compact representation
+COMPACT_MEDIA_TYPE = "application/vnd.churn.compact+json"
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize plain data, numpy arrays and datetimes to JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+class CompactJSONResponse(Response):
+    """JSON response rendered straight from the handler's data.
+    
+    Returning a ``Response`` makes FastAPI skip the route's response model,
+    so data the service already built is not validated a second time.
+    """
+    media_type = COMPACT_MEDIA_TYPE
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def wants_compact(request: Request, compact: Optional[bool] = None) -> bool:
+    """Whether the client asked for the compact representation (query flag or Accept)"""
+    if compact is not None:
+        return compact
+    return COMPACT_MEDIA_TYPE in request.headers.get("accept", "")
@@ -0,0 +1,71 @@
+"""Admin-only API endpoints (on-demand profiling)"""
+import asyncio
+import os
+import secrets
+import time
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, Response
+from app.config import settings
+from app.profiling import sampling_profiler, request_profiler, stats_to_bytes, stats_to_text
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Reject requests without the configured admin token"""
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin API is disabled")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.post("/profile/sample", response_class=PlainTextResponse)
+async def sample_profile(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(5.0, ge=1)
+):
+    """Sample all threads of this worker for N seconds; returns collapsed stacks"""
+    if seconds > settings.profiling_max_seconds:
+        raise HTTPException(status_code=400, detail=f"seconds must be <= {settings.profiling_max_seconds}")
+    try:
+        result = await run_in_threadpool(sampling_profiler.sample, seconds, interval_ms / 1000)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(
+        result["collapsed"],
+        headers={"X-Worker-Pid": str(os.getpid()), "X-Profile-Samples": str(result["samples"])}
+    )
+
+
+@router.post("/profile/requests")
+async def profile_requests(
+    route: str = Query(..., description="Route template, e.g. /api/v1/predict"),
+    count: int = Query(10, ge=1, le=10000),
+    timeout_seconds: float = Query(60.0, gt=0),
+    format: str = Query("text", pattern="^(text|pstats)$")
+):
+    """cProfile the next K requests to a route on this worker; returns pstats"""
+    if timeout_seconds > settings.profiling_max_seconds:
+        raise HTTPException(status_code=400, detail=f"timeout_seconds must be <= {settings.profiling_max_seconds}")
+    try:
+        request_profiler.arm(route, count)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    deadline = time.monotonic() + timeout_seconds
+    try:
+        while not request_profiler.done and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+    finally:
+        profiled = request_profiler.profiled
+        stats = request_profiler.collect()
+    
+    headers = {"X-Worker-Pid": str(os.getpid()), "X-Profiled-Requests": str(profiled)}
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"No requests to {route} within {timeout_seconds}s")
+    if format == "pstats":
+        return Response(stats_to_bytes(stats), media_type="application/octet-stream", headers=headers)
+    return PlainTextResponse(stats_to_text(stats), headers=headers)
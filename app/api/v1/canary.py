@@ -0,0 +1,17 @@
+"""Canary analysis API endpoints"""
+from datetime import datetime
+from fastapi import APIRouter, HTTPException
+from app.schemas import CanaryAnalysisResponse
+from app.services.canary_service import CanaryService
+
+router = APIRouter(prefix="/canary", tags=["canary"])
+
+
+@router.get("", response_model=CanaryAnalysisResponse)
+async def get_canary_analysis():
+    """Live canary vs active comparison and promote/rollback recommendation from this worker"""
+    try:
+        report = await CanaryService().analyze()
+        return CanaryAnalysisResponse(**report, timestamp=datetime.utcnow())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,18 @@
+"""Feature drift API endpoints"""
+from datetime import datetime
+from typing import List
+from fastapi import APIRouter
+from app.schemas import DriftResponse
+from app.ml.drift import drift_monitor
+
+router = APIRouter(prefix="/drift", tags=["drift"])
+
+
+@router.get("", response_model=List[DriftResponse])
+async def get_drift(model_version: str = None):
+    """Get live feature drift (PSI/KS vs training data) tracked by this worker"""
+    now = datetime.utcnow()
+    return [
+        DriftResponse(**entry, timestamp=now)
+        for entry in drift_monitor.report(model_version)
+    ]
@@ -1,10 +1,11 @@
 """Health check endpoints"""
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from app.schemas import HealthResponse
 from app.database import SessionLocal
 from app.ml.model_manager import ModelManager
-import mlflow
 from app.config import settings
+from app.startup import startup
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -24,6 +25,7 @@ async def health_check():
     # Check MLflow
     mlflow_status = "healthy"
     try:
+        import mlflow
         mlflow.set_tracking_uri(settings.mlflow_tracking_uri)
         mlflow.search_experiments()
     except Exception:
@@ -51,3 +53,7 @@ async def health_check():
     )
 
 
+@router.get("/ready")
+async def readiness():
+    """Readiness probe: 200 once startup stages have finished, 503 before"""
+    return JSONResponse(status_code=200 if startup.ready else 503, content=startup.status())
@@ -0,0 +1,50 @@
+"""Prediction history and export API endpoints"""
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.schemas import PredictionHistoryResponse
+from app.services.prediction_export import PredictionExporter
+from app.services.prediction_history import PredictionHistoryService
+
+router = APIRouter(prefix="/predictions", tags=["predictions"])
+
+
+@router.get("/history", response_model=PredictionHistoryResponse)
+async def get_prediction_history(
+    customer_id: Optional[str] = None,
+    model_version: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Past predictions, newest first; pass ``next_cursor`` back as ``cursor`` for the next page"""
+    try:
+        return PredictionHistoryResponse(**await PredictionHistoryService().page(
+            customer_id=customer_id, model_version=model_version,
+            start=start, end=end, cursor=cursor, limit=limit
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/export")
+async def export_predictions(
+    file_format: Literal["parquet", "csv"] = Query("parquet", alias="format"),
+    model_version: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    """All predictions in ``[start, end)`` as one Parquet or CSV file, streamed a chunk at a time.
+    
+    Partitioned exports by day and model version are written by
+    ``scripts/export_predictions.py``.
+    """
+    return StreamingResponse(
+        PredictionExporter().stream(file_format, start=start, end=end, model_version=model_version),
+        media_type="text/csv" if file_format == "csv" else "application/vnd.apache.parquet",
+        headers={"Content-Disposition": f'attachment; filename="predictions.{file_format}"'}
+    )
@@ -0,0 +1,66 @@
+"""Asynchronous batch scoring job API endpoints"""
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from app.schemas import BatchJobRequest, BatchJobResponse
+from app.services.batch_jobs import BatchJobService
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.post("", response_model=BatchJobResponse, status_code=202)
+async def submit_job(request: BatchJobRequest):
+    """Queue a batch scoring job and return its id at once; workers score it in chunks"""
+    try:
+        job = await BatchJobService().submit(
+            customers=request.customers,
+            path=request.path,
+            model_version=request.model_version,
+            chunk_size=request.chunk_size
+        )
+        return BatchJobResponse(**job)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{job_id}", response_model=BatchJobResponse)
+async def get_job(job_id: str):
+    """Job status and progress"""
+    job = await BatchJobService().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return BatchJobResponse(**job)
+
+
+@router.post("/{job_id}/resume", response_model=BatchJobResponse)
+async def resume_job(job_id: str):
+    """Queue a failed job again from its last completed chunk"""
+    try:
+        job = await BatchJobService().resume(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return BatchJobResponse(**job)
+
+
+@router.get("/{job_id}/results")
+async def get_job_results(job_id: str):
+    """Results of the chunks completed so far, streamed as CSV one chunk at a time.
+    
+    ``X-Job-Status`` tells whether the job has finished; while it runs the
+    download holds only the completed chunks.
+    """
+    service = BatchJobService()
+    job = await service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return StreamingResponse(
+        service.iter_results_csv(job),
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f'attachment; filename="{job_id}.csv"',
+            "X-Job-Status": job["status"]
+        }
+    )
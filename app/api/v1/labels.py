@@ -0,0 +1,35 @@
+"""Ground-truth label ingestion API endpoints"""
+import os
+import shutil
+import tempfile
+from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from app.schemas import LabelIngestionResponse
+from app.services.label_service import LabelIngestionService
+
+router = APIRouter(prefix="/labels", tags=["labels"])
+
+
+@router.post("", response_model=LabelIngestionResponse)
+async def ingest_labels(file: UploadFile = File(...)):
+    """Bulk-apply a CSV or Parquet file of customer_id, timestamp, label"""
+    suffix = os.path.splitext(file.filename or "")[1].lower()
+    if suffix not in (".csv", ".parquet", ".pq"):
+        raise HTTPException(status_code=400, detail="Label file must be .csv or .parquet")
+    
+    path = None
+    try:
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+            path = tmp.name
+            await run_in_threadpool(shutil.copyfileobj, file.file, tmp)
+        
+        service = LabelIngestionService()
+        report = await run_in_threadpool(service.ingest_file, path)
+        return LabelIngestionResponse(**report)
+    except (ValueError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if path and os.path.exists(path):
+            os.remove(path)
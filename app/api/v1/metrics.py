@@ -1,5 +1,7 @@
 """Metrics API endpoints"""
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from app.live_metrics import live_metrics, live_broadcaster, server_sent_events
 from app.schemas import MetricsResponse
 from app.services.metrics_service import MetricsService
 
@@ -11,8 +13,25 @@ async def get_metrics(model_version: str = None):
     """Get model performance metrics"""
     try:
         service = MetricsService()
-        return service.get_latest_metrics(model_version)
+        return await service.get_latest_metrics(model_version)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+
+
+@router.get("/live")
+async def get_live_metrics():
+    """Live serving aggregates of this worker, from memory"""
+    return live_metrics.snapshot()
+
+
+@router.get("/stream")
+async def stream_live_metrics():
+    """Live serving aggregates of this worker as server-sent events, one per update interval"""
+    return StreamingResponse(
+        server_sent_events(live_broadcaster.subscribe()),
+        media_type="text/event-stream",
+        # Proxies must pass events through as they are sent
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
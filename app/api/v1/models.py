@@ -1,9 +1,11 @@
 """Model management API endpoints"""
 from fastapi import APIRouter, HTTPException
 from typing import List
-from app.schemas import ModelInfo
+from datetime import datetime
+from app.schemas import ModelInfo, ModelPoolResponse, PooledModelInfo
 from app.services.metrics_service import MetricsService
 from app.ml.model_manager import ModelManager
+from app.ml.model_pool import model_pool
 
 router = APIRouter(prefix="/models", tags=["models"])
 
@@ -13,7 +15,7 @@ async def list_models():
     """List all model versions"""
     try:
         service = MetricsService()
-        models = service.get_all_model_versions()
+        models = await service.get_all_model_versions()
         return [ModelInfo(**m) for m in models]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -24,7 +26,7 @@ async def get_model(version: str):
     """Get model details"""
     try:
         service = MetricsService()
-        models = service.get_all_model_versions()
+        models = await service.get_all_model_versions()
         model = next((m for m in models if m["version"] == version), None)
         if not model:
             raise HTTPException(status_code=404, detail="Model not found")
@@ -39,9 +41,24 @@ async def get_model(version: str):
 async def get_current_model_info():
     """Get current model information"""
     try:
-        manager = ModelManager()
+        manager = await ModelManager.create()
         return manager.get_model_info()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/info/pool", response_model=ModelPoolResponse)
+async def get_model_pool():
+    """Model versions resident in this worker's pool and their memory"""
+    entries = model_pool.stats()
+    return ModelPoolResponse(
+        models=[
+            PooledModelInfo(
+                **dict(entry, loaded_at=datetime.fromtimestamp(entry["loaded_at"]),
+                       last_used=datetime.fromtimestamp(entry["last_used"]))
+            )
+            for entry in entries
+        ],
+        total_memory_bytes=sum(entry["memory_bytes"] for entry in entries),
+        max_memory_bytes=model_pool.max_bytes
+    )
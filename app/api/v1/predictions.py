@@ -1,36 +1,153 @@
 """Prediction API endpoints"""
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
 from app.schemas import (
     PredictionRequest, PredictionResponse,
-    BatchPredictionRequest, BatchPredictionResponse
+    BatchPredictionRequest, BatchPredictionResponse,
+    CustomerIdPredictionRequest, CustomerIdPredictionResponse
 )
 from app.services.prediction_service import PredictionService
+from app.ml.model_manager import ModelVersionNotFound
+from app.ml.compression import ExplanationUnavailable
+from app.feature_store.online import FeatureStoreUnavailable
+from app.instrumentation import mark_validated
+from app.admission import admission_controller, Overloaded, DeadlineExceeded, TIMEOUT_HEADER
+from app.api.responses import CompactJSONResponse, wants_compact
 
 router = APIRouter(prefix="/predict", tags=["predictions"])
 
+COMPACT_DESCRIPTION = "Return the compact representation (also selected by `Accept: application/vnd.churn.compact+json`)"
+EXPLAIN_DESCRIPTION = "Include per-feature contributions to each prediction"
 
-@router.post("", response_model=PredictionResponse)
-async def predict(request: PredictionRequest):
+
+@router.post("", response_model=PredictionResponse, response_model_exclude_none=True)
+async def predict(request: PredictionRequest, http_request: Request,
+                  compact: Optional[bool] = Query(None, description=COMPACT_DESCRIPTION),
+                  explain: bool = Query(False, description=EXPLAIN_DESCRIPTION)):
     """Real-time single prediction"""
+    mark_validated()
     try:
-        service = PredictionService()
-        return service.predict_single(request.customer)
+        async with admission_controller.admit("interactive", 1, http_request.headers.get(TIMEOUT_HEADER)):
+            service = await PredictionService.create()
+            response = await service.predict_single(request.customer, request.model_version, explain)
+        if wants_compact(http_request, compact):
+            return CompactJSONResponse(response.model_dump(exclude_none=True))
+        return response
+    except Overloaded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": e.retry_after_header})
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ModelVersionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ExplanationUnavailable as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/batch", response_model=BatchPredictionResponse)
-async def predict_batch(request: BatchPredictionRequest):
-    """Batch prediction"""
+@router.post("/batch", response_model=BatchPredictionResponse, response_model_exclude_none=True)
+async def predict_batch(request: BatchPredictionRequest, http_request: Request,
+                        compact: Optional[bool] = Query(None, description=COMPACT_DESCRIPTION),
+                        explain: bool = Query(False, description=EXPLAIN_DESCRIPTION)):
+    """Batch prediction.
+    
+    The compact representation carries one timestamp and model version for
+    the batch and parallel ``customer_ids``/``predictions``/``probabilities``
+    arrays instead of one object per customer.
+    """
+    mark_validated()
     try:
-        service = PredictionService()
-        predictions = service.predict_batch(request.customers)
+        async with admission_controller.admit(
+            "batch", len(request.customers), http_request.headers.get(TIMEOUT_HEADER)
+        ):
+            service = await PredictionService.create()
+            if wants_compact(http_request, compact):
+                return CompactJSONResponse(
+                    await service.predict_batch_compact(request.customers, request.model_version, explain)
+                )
+            predictions = await service.predict_batch(request.customers, request.model_version, explain)
         return BatchPredictionResponse(
             predictions=predictions,
             total=len(predictions),
             model_version=predictions[0].model_version if predictions else "unknown"
         )
+    except Overloaded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": e.retry_after_header})
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ModelVersionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ExplanationUnavailable as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _customer_responses(result: dict) -> list:
+    return [
+        PredictionResponse(
+            customer_id=customer_id,
+            prediction=float(result["predictions"][i]),
+            probability=float(result["probabilities"][i]),
+            model_version=result["model_version"],
+            timestamp=result["timestamp"]
+        )
+        for i, customer_id in enumerate(result["customer_ids"])
+    ]
+
+
+@router.post("/customers", response_model=CustomerIdPredictionResponse, response_model_exclude_none=True)
+async def predict_customers(request: CustomerIdPredictionRequest, http_request: Request,
+                            compact: Optional[bool] = Query(None, description=COMPACT_DESCRIPTION)):
+    """Predictions for customer ids, with features from the online feature store.
+    
+    Ids the store does not know are listed in ``missing_customer_ids``.
+    """
+    mark_validated()
+    try:
+        async with admission_controller.admit(
+            "batch", len(request.customer_ids), http_request.headers.get(TIMEOUT_HEADER)
+        ):
+            service = await PredictionService.create()
+            result = await service.predict_customers(request.customer_ids, request.model_version)
+        if wants_compact(http_request, compact):
+            return CompactJSONResponse(result)
+        return CustomerIdPredictionResponse(
+            predictions=_customer_responses(result),
+            total=result["total"],
+            model_version=result["model_version"],
+            missing_customer_ids=result["missing_customer_ids"]
+        )
+    except Overloaded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": e.retry_after_header})
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ModelVersionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except FeatureStoreUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/customers/{customer_id}", response_model=PredictionResponse, response_model_exclude_none=True)
+async def predict_customer(customer_id: str, http_request: Request, model_version: Optional[str] = None):
+    """Prediction for one customer id, with features from the online feature store"""
+    mark_validated()
+    try:
+        async with admission_controller.admit("interactive", 1, http_request.headers.get(TIMEOUT_HEADER)):
+            service = await PredictionService.create()
+            result = await service.predict_customers([customer_id], model_version)
+    except Overloaded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": e.retry_after_header})
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ModelVersionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except FeatureStoreUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if result["missing_customer_ids"]:
+        raise HTTPException(status_code=404, detail=f"Customer {customer_id} is not in the feature store")
+    return _customer_responses(result)[0]
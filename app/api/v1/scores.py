@@ -0,0 +1,21 @@
+"""Precomputed customer score API endpoints"""
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from app.schemas import TopScoresResponse
+from app.services.score_store import ScoreStore
+
+router = APIRouter(prefix="/scores", tags=["scores"])
+
+
+@router.get("/top", response_model=TopScoresResponse)
+async def get_top_scores(
+    k: int = Query(100, ge=1, le=10000),
+    model_version: Optional[str] = None
+):
+    """The K highest-risk customers from the last bulk scoring run (default: active model)"""
+    try:
+        return TopScoresResponse(**await ScoreStore().top(k, model_version))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
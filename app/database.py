@@ -1,15 +1,29 @@
 """Database connection and session management"""
+import asyncio
+import weakref
+from typing import Dict
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.config import settings
+from app.db_pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, instrument_pool
+
+# Async drivers for the synchronous URLs in DATABASE_URL
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
 
 engine = create_engine(
     settings.database_url,
+    poolclass=InstrumentedQueuePool,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout_seconds,
+    pool_recycle=settings.db_pool_recycle_seconds
 )
+instrument_pool(engine.pool, "default")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -25,3 +39,72 @@ def get_db():
         db.close()
 
 
+def async_database_url(url: str) -> str:
+    """``DATABASE_URL`` with its synchronous driver swapped for the async one"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend} databases")
+    parsed = parsed.set(drivername=ASYNC_DRIVERS[backend])
+    if backend == "postgresql":
+        # asyncpg prepares every statement; keep the hot ones prepared per connection
+        parsed = parsed.update_query_dict({"prepared_statement_cache_size": str(settings.db_statement_cache_size)})
+    return parsed.render_as_string(hide_password=False)
+
+
+def _pool_settings(role: str) -> Dict[str, int]:
+    if role == "write":
+        return {"pool_size": settings.db_write_pool_size, "max_overflow": settings.db_write_max_overflow}
+    if role == "read":
+        return {"pool_size": settings.db_read_pool_size, "max_overflow": settings.db_read_max_overflow}
+    raise ValueError(f"Unknown connection pool role: {role}")
+
+
+# Async engines per event loop and role: asyncpg connections belong to the
+# loop that opened them, so a loop never reuses another loop's pool
+_async_engines: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AsyncEngine]]" = weakref.WeakKeyDictionary()
+_async_sessions: "weakref.WeakKeyDictionary[AsyncEngine, async_sessionmaker]" = weakref.WeakKeyDictionary()
+
+
+def get_async_engine(role: str = "write") -> AsyncEngine:
+    """Async engine of a pool role: "write" (prediction logging) or "read" (metrics).
+    
+    SQLite engines do not pool: every aiosqlite connection runs its own
+    thread, and idle pooled ones would keep short-lived scripts from exiting.
+    """
+    pool_settings = _pool_settings(role)
+    engines = _async_engines.setdefault(asyncio.get_running_loop(), {})
+    if role not in engines:
+        url = async_database_url(settings.async_database_url or settings.database_url)
+        if make_url(url).get_backend_name() == "sqlite":
+            async_engine = create_async_engine(url, poolclass=NullPool)
+        else:
+            async_engine = create_async_engine(
+                url,
+                poolclass=InstrumentedAsyncQueuePool,
+                pool_pre_ping=True,
+                pool_timeout=settings.db_pool_timeout_seconds,
+                pool_recycle=settings.db_pool_recycle_seconds,
+                **pool_settings
+            )
+            instrument_pool(async_engine.sync_engine.pool, role)
+        engines[role] = async_engine
+    return engines[role]
+
+
+def async_session(role: str = "write") -> AsyncSession:
+    """New async session on the pool of ``role``; use as ``async with async_session("read") as db``"""
+    async_engine = get_async_engine(role)
+    factory = _async_sessions.get(async_engine)
+    if factory is None:
+        factory = _async_sessions[async_engine] = async_sessionmaker(
+            async_engine, autoflush=False, expire_on_commit=False
+        )
+    return factory()
+
+
+async def dispose_async_engines():
+    """Close the pooled async connections of the running event loop"""
+    engines = _async_engines.pop(asyncio.get_running_loop(), {})
+    for async_engine in engines.values():
+        await async_engine.dispose()
@@ -0,0 +1,100 @@
+"""Connection pools instrumented with checkout wait, exhaustion and connection age metrics"""
+import time
+import weakref
+from prometheus_client import Counter, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+POOL_CHECKOUT_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds',
+    'Time to obtain a pooled connection, including opening a new one',
+    ['role'],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+POOL_EXHAUSTED = Counter(
+    'db_pool_exhausted_total',
+    'Checkouts that found every connection of the pool, overflow included, in use',
+    ['role']
+)
+POOL_TIMEOUTS = Counter(
+    'db_pool_checkout_timeouts_total',
+    'Checkouts that gave up after waiting pool_timeout for a connection',
+    ['role']
+)
+CONNECTION_AGE = Histogram(
+    'db_pool_connection_age_seconds',
+    'Age of database connections when they are checked out',
+    ['role'],
+    buckets=(1, 10, 60, 300, 900, 1800, 3600, 7200, 21600, 86400)
+)
+
+# Live instrumented pools, for the gauges
+_POOLS: "weakref.WeakSet" = weakref.WeakSet()
+
+
+class _InstrumentedPool:
+    """Mixin timing ``QueuePool._do_get``, the step that waits for a free connection"""
+    role = "default"
+    
+    def _do_get(self):
+        if self._max_overflow > -1 and self.checkedin() == 0 and self.overflow() >= self._max_overflow:
+            POOL_EXHAUSTED.labels(role=self.role).inc()
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.labels(role=self.role).inc()
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.labels(role=self.role).observe(time.perf_counter() - start)
+        CONNECTION_AGE.labels(role=self.role).observe(time.time() - record.starttime)
+        return record
+    
+    def recreate(self):
+        pool = super().recreate()
+        pool.role = self.role
+        _POOLS.add(pool)
+        return pool
+    
+    def capacity(self) -> int:
+        return self.size() + max(self._max_overflow, 0)
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_pool(pool, role: str):
+    """Label an engine's pool with its role and include it in the gauges"""
+    pool.role = role
+    _POOLS.add(pool)
+    return pool
+
+
+class DatabasePoolCollector:
+    """Prometheus collector for connections in use, idle and available per pool role"""
+    
+    def collect(self):
+        in_use = GaugeMetricFamily("db_pool_connections_in_use", "Connections checked out of the pool", labels=["role"])
+        idle = GaugeMetricFamily("db_pool_connections_idle", "Open connections waiting in the pool", labels=["role"])
+        capacity = GaugeMetricFamily(
+            "db_pool_capacity", "Maximum connections of the pool, overflow included", labels=["role"]
+        )
+        totals = {}
+        for pool in list(_POOLS):
+            role_totals = totals.setdefault(pool.role, [0, 0, 0])
+            role_totals[0] += pool.checkedout()
+            role_totals[1] += pool.checkedin()
+            role_totals[2] += pool.capacity()
+        for role, (checked_out, checked_in, size) in sorted(totals.items()):
+            in_use.add_metric([role], checked_out)
+            idle.add_metric([role], checked_in)
+            capacity.add_metric([role], size)
+        yield in_use
+        yield idle
+        yield capacity
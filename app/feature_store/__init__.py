@@ -0,0 +1 @@
+"""Feature store"""
@@ -0,0 +1,146 @@
+"""Offline feature store: date-partitioned Parquet with point-in-time joins"""
+import os
+import uuid
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Sequence, Union
+import pandas as pd
+from app.config import settings
+from app.ml.feature_codec import FEATURE_SCHEMA
+
+FEATURE_COLUMNS = [name for name, _, _ in FEATURE_SCHEMA]
+TIMESTAMP_COLUMN = "feature_timestamp"
+
+DateLike = Union[str, date, datetime, pd.Timestamp]
+
+
+def offline_store_path() -> str:
+    return os.path.join(settings.feature_store_path, "offline")
+
+
+def _timestamps(values) -> pd.Series:
+    """Naive UTC timestamps, whatever timezone the input carried"""
+    return pd.to_datetime(pd.Series(values), utc=True).dt.tz_convert(None)
+
+
+def _day(value: DateLike) -> str:
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+class OfflineFeatureStore:
+    """Customer feature history as Parquet files partitioned by ``date=YYYY-MM-DD``.
+    
+    Every materialized row carries the ``feature_timestamp`` it was observed
+    at. Reads prune partitions by date, read only the requested columns and
+    push the remaining filters down to the Parquet row groups.
+    """
+    
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or offline_store_path()
+    
+    def materialize(self, df: pd.DataFrame, as_of: Optional[DateLike] = None) -> int:
+        """Append customer features; rows without ``feature_timestamp`` are stamped ``as_of`` (default now)"""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        
+        frame = df[["customer_id"] + FEATURE_COLUMNS].copy()
+        frame["customer_id"] = frame["customer_id"].astype(str)
+        if TIMESTAMP_COLUMN in df:
+            frame[TIMESTAMP_COLUMN] = _timestamps(df[TIMESTAMP_COLUMN]).to_numpy()
+        else:
+            frame[TIMESTAMP_COLUMN] = _timestamps([as_of or datetime.utcnow()] * len(frame)).to_numpy()
+        frame["date"] = frame[TIMESTAMP_COLUMN].dt.strftime("%Y-%m-%d")
+        frame = frame.sort_values(["customer_id", TIMESTAMP_COLUMN])
+        
+        ds.write_dataset(
+            pa.Table.from_pandas(frame, preserve_index=False),
+            self.root,
+            format="parquet",
+            partitioning=self._partitioning(),
+            # A unique name per write, so loads append instead of replacing files
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore"
+        )
+        return len(frame)
+    
+    def read(self, columns: Optional[Sequence[str]] = None, start: Optional[DateLike] = None,
+             end: Optional[DateLike] = None, customer_ids: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Feature rows observed in [start, end], with ``customer_id``, ``feature_timestamp`` and ``columns``"""
+        import pyarrow.dataset as ds
+        
+        columns = list(columns or FEATURE_COLUMNS)
+        if not self.partitions():
+            # Typed like a real read, so merges on the timestamp still work
+            empty = pd.DataFrame(columns=["customer_id", TIMESTAMP_COLUMN] + columns)
+            return empty.astype({TIMESTAMP_COLUMN: "datetime64[ns]"})
+        
+        dataset = ds.dataset(self.root, format="parquet", partitioning=self._partitioning())
+        condition = None
+        clauses = []
+        if start is not None:
+            clauses.append(ds.field("date") >= _day(start))
+            clauses.append(ds.field(TIMESTAMP_COLUMN) >= _timestamps([start])[0])
+        if end is not None:
+            clauses.append(ds.field("date") <= _day(end))
+            clauses.append(ds.field(TIMESTAMP_COLUMN) <= _timestamps([end])[0])
+        if customer_ids is not None:
+            clauses.append(ds.field("customer_id").isin(list(customer_ids)))
+        for clause in clauses:
+            condition = clause if condition is None else condition & clause
+        
+        table = dataset.to_table(columns=["customer_id", TIMESTAMP_COLUMN] + columns, filter=condition)
+        return table.to_pandas()
+    
+    def latest(self, as_of: Optional[DateLike] = None, columns: Optional[Sequence[str]] = None,
+               lookback_days: Optional[int] = None) -> pd.DataFrame:
+        """Most recent features of every customer observed within ``lookback_days`` before ``as_of``"""
+        as_of = _timestamps([as_of or datetime.utcnow()])[0]
+        lookback = timedelta(days=lookback_days or settings.offline_store_lookback_days)
+        df = self.read(columns, start=as_of - lookback, end=as_of)
+        df = df.sort_values(TIMESTAMP_COLUMN).drop_duplicates("customer_id", keep="last")
+        return df.sort_values("customer_id").reset_index(drop=True)
+    
+    def point_in_time_join(self, labels: pd.DataFrame, columns: Optional[Sequence[str]] = None,
+                           timestamp_column: str = "label_timestamp",
+                           lookback_days: Optional[int] = None) -> pd.DataFrame:
+        """Attach to each label row the latest features observed at or before its timestamp.
+        
+        Features recorded after a label never leak into it. Only partitions
+        between the earliest label minus ``lookback_days`` and the latest
+        label are read; labels without features in that window are dropped.
+        """
+        lookback = timedelta(days=lookback_days or settings.offline_store_lookback_days)
+        labels = labels.copy()
+        labels["customer_id"] = labels["customer_id"].astype(str)
+        labels[timestamp_column] = _timestamps(labels[timestamp_column]).to_numpy()
+        if labels.empty:
+            return labels
+        
+        features = self.read(
+            columns,
+            start=labels[timestamp_column].min() - lookback,
+            end=labels[timestamp_column].max(),
+            customer_ids=labels["customer_id"].unique()
+        )
+        joined = pd.merge_asof(
+            labels.sort_values(timestamp_column),
+            features.sort_values(TIMESTAMP_COLUMN),
+            left_on=timestamp_column,
+            right_on=TIMESTAMP_COLUMN,
+            by="customer_id",
+            direction="backward",
+            tolerance=lookback
+        )
+        return joined.dropna(subset=[TIMESTAMP_COLUMN]).reset_index(drop=True)
+    
+    def partitions(self) -> List[str]:
+        """Dates with materialized features"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name[len("date="):] for name in os.listdir(self.root) if name.startswith("date="))
+    
+    @staticmethod
+    def _partitioning():
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        
+        return ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
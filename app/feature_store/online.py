@@ -0,0 +1,206 @@
+"""Online feature store: pre-encoded feature vectors per customer_id in memory-mapped snapshots"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from prometheus_client import Counter
+from app.config import settings
+from app.ml.feature_codec import CODEC_VERSION, FeatureVectorCodec
+from app.feature_store.transformer import FeatureTransformer
+
+ONLINE_LOOKUPS = Counter(
+    'online_feature_lookups_total',
+    'Customer ids looked up in the online feature store',
+    ['result']  # cache_hit, hit, miss
+)
+
+# File in the online store directory naming the snapshot being served
+CURRENT_FILE = "CURRENT"
+
+
+class FeatureStoreUnavailable(RuntimeError):
+    """Raised when no online feature snapshot has been loaded"""
+
+
+def online_store_path() -> str:
+    return os.path.join(settings.feature_store_path, "online")
+
+
+def read_features(path: str) -> pd.DataFrame:
+    """Customer features from a CSV or Parquet file"""
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def build_snapshot(df: pd.DataFrame, root: Optional[str] = None,
+                   transformer: Optional[FeatureTransformer] = None) -> Dict[str, Any]:
+    """Encode customer features into a new snapshot and make it the current one.
+    
+    A snapshot holds the customer ids sorted (for binary search), the model
+    input vectors from ``FeatureTransformer`` and the codec vectors of the
+    raw features (for drift tracking and prediction logging), all float32
+    ``.npy`` files served memory-mapped. Rows with values outside the codec
+    vocabularies are rejected; for duplicate ids the last row wins.
+    """
+    root = root or online_store_path()
+    transformer = transformer or FeatureTransformer()
+    codec = FeatureVectorCodec()
+    
+    df = df.drop_duplicates("customer_id", keep="last")
+    raw = codec.encode_frame(df)
+    accepted = ~np.isnan(raw).any(axis=1)
+    df, raw = df[accepted], raw[accepted]
+    
+    ids = df["customer_id"].astype(str).to_numpy()
+    order = np.argsort(ids, kind="stable")
+    vectors = np.asarray(transformer.transform_batch(df[codec.fields]), dtype=np.float32)
+    
+    name = "snapshot-" + datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    directory = os.path.join(root, name)
+    os.makedirs(directory)
+    np.save(os.path.join(directory, "ids.npy"), ids[order].astype(str))
+    np.save(os.path.join(directory, "vectors.npy"), vectors[order])
+    np.save(os.path.join(directory, "raw.npy"), raw[order])
+    meta = {
+        "snapshot": name,
+        "created_at": datetime.now().isoformat(),
+        "rows": int(len(ids)),
+        "rejected": int((~accepted).sum()),
+        "codec_version": CODEC_VERSION,
+        "n_features": int(vectors.shape[1]) if len(vectors) else 0
+    }
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    
+    # Swap the pointer atomically so readers see either snapshot, never a mix
+    pointer = os.path.join(root, CURRENT_FILE)
+    with open(pointer + ".tmp", "w") as f:
+        f.write(name)
+    os.replace(pointer + ".tmp", pointer)
+    return meta
+
+
+class Snapshot:
+    """One memory-mapped snapshot"""
+    
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, "meta.json")) as f:
+            self.meta = json.load(f)
+        if self.meta["codec_version"] != CODEC_VERSION:
+            raise FeatureStoreUnavailable(
+                f"Snapshot {self.meta['snapshot']} was written with codec {self.meta['codec_version']}"
+            )
+        self.name = self.meta["snapshot"]
+        self.ids = np.load(os.path.join(directory, "ids.npy"), mmap_mode="r")
+        self.vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r")
+        self.raw = np.load(os.path.join(directory, "raw.npy"), mmap_mode="r")
+        # LRU of recently requested ids -> row, guarded by the store's lock
+        self.rows: "OrderedDict[str, int]" = OrderedDict()
+    
+    def find(self, customer_ids: Sequence[str]) -> np.ndarray:
+        """Row of each customer id, -1 when it is not in the snapshot"""
+        keys = np.asarray(customer_ids, dtype=str)
+        if len(self.ids) == 0:
+            return np.full(len(keys), -1, dtype=np.intp)
+        positions = np.searchsorted(self.ids, keys)
+        positions = np.minimum(positions, len(self.ids) - 1)
+        return np.where(self.ids[positions] == keys, positions, -1)
+
+
+class FeatureLookup:
+    """Features of the customer ids found in the store, in request order"""
+    
+    def __init__(self, customer_ids: List[str], vectors: np.ndarray, raw: np.ndarray, missing: List[str]):
+        self.customer_ids = customer_ids
+        self.vectors = vectors
+        self.raw = raw
+        self.missing = missing
+
+
+class OnlineFeatureStore:
+    """Customer id -> feature vector lookups against the current snapshot.
+    
+    Snapshots are opened lazily and re-checked every
+    ``online_store_refresh_seconds``, so a new bulk load is picked up
+    without restarting workers. An LRU of recently requested ids maps them
+    straight to their snapshot row; ids not cached are found by one
+    vectorized binary search.
+    """
+    
+    def __init__(self, root: Optional[str] = None, cache_size: Optional[int] = None):
+        self.root = root
+        self.cache_size = settings.online_store_cache_size if cache_size is None else cache_size
+        self._snapshot: Optional[Snapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+    
+    def snapshot(self) -> Snapshot:
+        """Current snapshot, reopened when the CURRENT pointer changed"""
+        now = time.monotonic()
+        with self._lock:
+            if self._snapshot is None or now - self._checked_at >= settings.online_store_refresh_seconds:
+                self._checked_at = now
+                root = self.root or online_store_path()
+                try:
+                    with open(os.path.join(root, CURRENT_FILE)) as f:
+                        name = f.read().strip()
+                except FileNotFoundError:
+                    name = None
+                if name is None:
+                    self._snapshot = None
+                elif self._snapshot is None or self._snapshot.name != name:
+                    self._snapshot = Snapshot(os.path.join(root, name))
+            if self._snapshot is None:
+                raise FeatureStoreUnavailable("No online feature snapshot loaded")
+            return self._snapshot
+    
+    def lookup(self, customer_ids: Sequence[str]) -> FeatureLookup:
+        """Vectors of ``customer_ids``; ids not in the store are reported as missing"""
+        snapshot = self.snapshot()
+        rows = np.empty(len(customer_ids), dtype=np.intp)
+        uncached = []
+        with self._lock:
+            for i, customer_id in enumerate(customer_ids):
+                row = snapshot.rows.get(customer_id)
+                if row is None:
+                    uncached.append(i)
+                else:
+                    snapshot.rows.move_to_end(customer_id)
+                    rows[i] = row
+        ONLINE_LOOKUPS.labels(result="cache_hit").inc(len(customer_ids) - len(uncached))
+        
+        if uncached:
+            found = snapshot.find([customer_ids[i] for i in uncached])
+            rows[uncached] = found
+            hits = int((found >= 0).sum())
+            ONLINE_LOOKUPS.labels(result="hit").inc(hits)
+            ONLINE_LOOKUPS.labels(result="miss").inc(len(uncached) - hits)
+            if self.cache_size > 0:
+                with self._lock:
+                    for i, row in zip(uncached, found):
+                        if row >= 0:
+                            snapshot.rows[customer_ids[i]] = int(row)
+                    while len(snapshot.rows) > self.cache_size:
+                        snapshot.rows.popitem(last=False)
+        
+        present = rows >= 0
+        found_rows = rows[present]
+        return FeatureLookup(
+            customer_ids=[customer_id for customer_id, ok in zip(customer_ids, present) if ok],
+            vectors=np.asarray(snapshot.vectors[found_rows]),
+            raw=np.asarray(snapshot.raw[found_rows]),
+            missing=[customer_id for customer_id, ok in zip(customer_ids, present) if not ok]
+        )
+    
+    def reset(self):
+        with self._lock:
+            self._snapshot = None
+
+
+online_store = OnlineFeatureStore()
@@ -0,0 +1,121 @@
+"""Per-request, per-stage latency instrumentation"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+from prometheus_client import Histogram
+from starlette.routing import Match
+
+# Known stages; anything else is rejected so label cardinality stays bounded
+STAGES = (
+    "validation", "model_load", "encoding", "routing", "score_lookup", "inference", "explanation", "drift", "persistence"
+)
+
+# Upper bounds of the batch-size buckets used as a label
+BATCH_SIZE_BUCKETS = (1, 10, 100, 1000, 10000)
+
+STAGE_DURATION = Histogram(
+    'prediction_stage_duration_seconds',
+    'Time spent per prediction pipeline stage',
+    ['stage', 'route', 'model_version', 'batch_size'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+_current_timings: ContextVar[Optional["RequestTimings"]] = ContextVar("request_timings", default=None)
+
+
+def batch_size_bucket(size: Optional[int]) -> str:
+    """Coarse batch-size label, e.g. "1", "2-10", "11-100" or ">10000" """
+    if not size:
+        return "none"
+    lower = 1
+    for upper in BATCH_SIZE_BUCKETS:
+        if size <= upper:
+            return str(upper) if lower == upper else f"{lower}-{upper}"
+        lower = upper + 1
+    return f">{BATCH_SIZE_BUCKETS[-1]}"
+
+
+def route_template(app, scope) -> str:
+    """Path template of the route serving ``scope`` ("/api/v1/models/{version}"), not the raw path"""
+    for route in app.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class RequestTimings:
+    """Stage durations collected while one request is served"""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.model_version: Optional[str] = None
+        self.batch_size: Optional[int] = None
+    
+    def add(self, stage: str, seconds: float):
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage: {stage}")
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+    
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+    
+    def observe(self, route: str):
+        """Record the collected stages in the stage histogram"""
+        model_version = self.model_version or "none"
+        batch_size = batch_size_bucket(self.batch_size)
+        for stage, seconds in self.stages.items():
+            STAGE_DURATION.labels(
+                stage=stage, route=route, model_version=model_version, batch_size=batch_size
+            ).observe(seconds)
+    
+    def server_timing(self, total: float) -> str:
+        """``Server-Timing`` header value with durations in milliseconds"""
+        entries = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in self.stages.items()]
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+
+def start_request() -> RequestTimings:
+    """Begin collecting stage timings for the current request context"""
+    timings = RequestTimings()
+    _current_timings.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current_timings.get()
+
+
+def annotate(model_version: Optional[str] = None, batch_size: Optional[int] = None):
+    """Attach the model version and batch size to the current request's timings"""
+    timings = _current_timings.get()
+    if timings is None:
+        return
+    if model_version is not None:
+        timings.model_version = model_version
+    if batch_size is not None:
+        timings.batch_size = batch_size
+
+
+def mark_validated():
+    """Record everything before the handler started (body parsing and validation)"""
+    timings = _current_timings.get()
+    if timings is not None and "validation" not in timings.stages:
+        timings.add("validation", timings.elapsed())
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block as one pipeline stage; a no-op outside an instrumented request"""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
@@ -0,0 +1,171 @@
+"""Live serving aggregates, pushed to dashboard clients at a fixed cadence"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, AsyncIterator, Optional, Sequence, Set
+import numpy as np
+from app.config import settings
+from app.ml.canary import LatencySketch, SCORE_BINS
+
+
+class _Bucket:
+    """Traffic of one second"""
+    
+    def __init__(self, second: int):
+        self.second = second
+        self.requests = 0
+        self.errors = 0
+        self.latency = LatencySketch()
+        self.scores = np.zeros(SCORE_BINS)
+        self.versions: Dict[str, int] = {}
+
+
+class LiveMetrics:
+    """Prediction traffic of this worker over a sliding window, in per-second buckets.
+    
+    Requests, errors, a latency sketch, a score histogram and predictions
+    per model version are counted per second and summed over the window
+    when a snapshot is taken, so memory is bounded by the window length.
+    Realized metrics are the latest ones the performance monitor computed.
+    """
+    
+    def __init__(self, window_seconds: Optional[int] = None):
+        self.window_seconds = window_seconds or settings.live_metrics_window_seconds
+        self.realized: Dict[str, Dict[str, float]] = {}
+        self._buckets: "deque[_Bucket]" = deque()
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def record_request(self, seconds: float, status_code: int):
+        with self._lock:
+            bucket = self._bucket()
+            bucket.requests += 1
+            bucket.errors += status_code >= 500
+            bucket.latency.add([seconds])
+    
+    def record_predictions(self, model_version: Optional[str], probabilities: Sequence[float]):
+        bins = np.clip((np.asarray(probabilities, dtype=float) * SCORE_BINS).astype(int), 0, SCORE_BINS - 1)
+        counts = np.bincount(bins, minlength=SCORE_BINS)
+        version = model_version or "unknown"
+        with self._lock:
+            bucket = self._bucket()
+            bucket.scores += counts
+            bucket.versions[version] = bucket.versions.get(version, 0) + len(bins)
+    
+    def record_realized(self, model_version: str, metrics: Dict[str, float]):
+        with self._lock:
+            self.realized[model_version] = metrics
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Aggregates over the window, ready to serialize"""
+        latency = LatencySketch()
+        scores = np.zeros(SCORE_BINS)
+        versions: Dict[str, int] = {}
+        requests = errors = 0
+        with self._lock:
+            self._expire(int(time.monotonic()))
+            for bucket in self._buckets:
+                requests += bucket.requests
+                errors += bucket.errors
+                latency.merge(bucket.latency)
+                scores += bucket.scores
+                for version, count in bucket.versions.items():
+                    versions[version] = versions.get(version, 0) + count
+            realized = {version: dict(metrics) for version, metrics in self.realized.items()}
+        
+        span = max(min(self.window_seconds, time.monotonic() - self._started), 1.0)
+        predictions = int(scores.sum())
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "window_seconds": self.window_seconds,
+            "request_rate": requests / span,
+            "error_rate": errors / requests if requests else 0.0,
+            "latency": {
+                "p50": latency.quantile(0.5),
+                "p95": latency.quantile(0.95),
+                "p99": latency.quantile(0.99)
+            },
+            "predictions": predictions,
+            "score_histogram": scores.astype(int).tolist(),
+            "versions": {
+                version: {"predictions": count, "share": count / predictions if predictions else 0.0}
+                for version, count in sorted(versions.items())
+            },
+            "realized_metrics": realized
+        }
+    
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+            self.realized.clear()
+            self._started = time.monotonic()
+    
+    def _bucket(self) -> _Bucket:
+        second = int(time.monotonic())
+        if not self._buckets or self._buckets[-1].second != second:
+            self._buckets.append(_Bucket(second))
+            self._expire(second)
+        return self._buckets[-1]
+    
+    def _expire(self, second: int):
+        while self._buckets and self._buckets[0].second <= second - self.window_seconds:
+            self._buckets.popleft()
+
+
+class LiveMetricsBroadcaster:
+    """Fans one snapshot per ``live_metrics_interval_seconds`` out to every subscriber.
+    
+    The snapshot is computed once per tick however many clients listen.
+    Each client has a queue of one update, so a slow client skips updates
+    instead of buffering them or holding up the others. The publishing
+    task runs only while someone is subscribed.
+    """
+    
+    def __init__(self, metrics: LiveMetrics, interval_seconds: Optional[float] = None):
+        self.metrics = metrics
+        self.interval_seconds = interval_seconds or settings.live_metrics_interval_seconds
+        self._subscribers: "Set[asyncio.Queue]" = set()
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+    
+    async def subscribe(self) -> AsyncIterator[Dict[str, Any]]:
+        """Snapshots from now on, starting with the current one"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        queue.put_nowait(self.metrics.snapshot())
+        self._subscribers.add(queue)
+        self._ensure_publisher()
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(queue)
+    
+    def _ensure_publisher(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._publish())
+    
+    async def _publish(self):
+        while self._subscribers:
+            await asyncio.sleep(self.interval_seconds)
+            snapshot = self.metrics.snapshot()
+            for queue in list(self._subscribers):
+                if queue.full():
+                    queue.get_nowait()  # drop the update the client has not read yet
+                queue.put_nowait(snapshot)
+
+
+async def server_sent_events(snapshots: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Format snapshots as ``metrics`` server-sent events"""
+    async for snapshot in snapshots:
+        yield f"event: metrics\ndata: {json.dumps(snapshot)}\n\n"
+
+
+live_metrics = LiveMetrics()
+live_broadcaster = LiveMetricsBroadcaster(live_metrics)
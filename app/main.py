@@ -1,23 +1,154 @@
 """FastAPI application main file"""
+from app.startup import startup, MODEL_WARMUP_SECONDS  # first import: starts the import timer
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1 import predictions, models, metrics, health
-from app.database import Base, engine
+from app.api.v1 import predictions, models, metrics, health, labels, drift, admin, jobs, canary, scores, history
 from app.config import settings
-from prometheus_client import make_asgi_app, Counter, Histogram
-import time
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from app.services.performance_monitor import PerformanceMonitor
+from app.services.partition_manager import PredictionPartitionManager
+from app.services.batch_jobs import BatchJobWorker
+from app.services.canary_service import CanaryService
+from app.ml.drift import DriftCollector, drift_monitor
+from app.ml.model_pool import ModelPoolCollector, model_pool
+from app.database import dispose_async_engines
+from app.db_pool import DatabasePoolCollector
+from app.instrumentation import start_request, route_template
+from app.live_metrics import live_metrics
+from app.profiling import request_profiler
+from prometheus_client import make_asgi_app, Counter, Histogram, REGISTRY
+from contextlib import asynccontextmanager
+import asyncio
 
 # Prometheus metrics
-REQUEST_COUNT = Counter('http_requests_total', 'Total HTTP requests', ['method', 'endpoint'])
-REQUEST_DURATION = Histogram('http_request_duration_seconds', 'HTTP request duration')
+REQUEST_COUNT = Counter('http_requests_total', 'Total HTTP requests', ['method', 'endpoint', 'status'])
+REQUEST_DURATION = Histogram('http_request_duration_seconds', 'HTTP request duration', ['method', 'endpoint'])
+REGISTRY.register(DriftCollector(drift_monitor))
+REGISTRY.register(ModelPoolCollector(model_pool))
+REGISTRY.register(DatabasePoolCollector())
+
+
+async def refresh_performance_loop():
+    """Periodically fold newly labelled predictions into realized metrics and publish them to live metrics"""
+    monitor = PerformanceMonitor()
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await loop.run_in_executor(None, monitor.refresh)
+        except Exception as e:
+            print(f"Performance monitor refresh failed: {e}")
+        await asyncio.sleep(settings.performance_monitor_interval_seconds)
+
+
+async def partition_maintenance_loop():
+    """Periodically create upcoming prediction partitions and apply retention"""
+    manager = PredictionPartitionManager()
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            result = await loop.run_in_executor(None, manager.run_maintenance)
+            if result["created"] or result["dropped"]:
+                print(
+                    f"Prediction partitions created: {result['created']}, dropped: {result['dropped']}, "
+                    f"rows moved from default: {result.get('rows_moved', 0)}, "
+                    f"orphaned feature vectors deleted: {result.get('orphan_vectors_deleted', 0)}"
+                )
+        except Exception as e:
+            print(f"Partition maintenance failed: {e}")
+        await asyncio.sleep(settings.partition_maintenance_interval_seconds)
+
+
+async def batch_job_loop():
+    """Score batch jobs once the worker is ready.
+    
+    Job state is in the database, so jobs left running by a stopped
+    process are taken over and resumed from their last completed chunk.
+    """
+    while not startup.ready:
+        await asyncio.sleep(settings.batch_job_poll_seconds)
+    await BatchJobWorker().run_forever()
+
+
+async def canary_analysis_loop():
+    """Periodically act on the canary recommendation (only started with ``canary_auto_action``).
+    
+    Only one worker at a time leads and acts; see ``CanaryService.lead``.
+    """
+    service = CanaryService()
+    try:
+        while True:
+            await asyncio.sleep(settings.canary_analysis_interval_seconds)
+            try:
+                report = await service.run()
+                if report["action"]:
+                    print(f"Canary {report['canary_version']} {report['action']}: {report['reason']}")
+            except Exception as e:
+                print(f"Canary analysis failed: {e}")
+    finally:
+        await service.resign()
+
+
+def load_models():
+    """Load the active and canary models once so artifacts and their imports are warm"""
+    from app.ml.model_manager import ModelManager
+    return ModelManager()
+
+
+def warm_up_models(manager):
+    """Run synthetic traffic through the loaded models and record the durations"""
+    report = manager.warm_up()
+    for version, timings in report.items():
+        for batch_size, seconds in timings.items():
+            MODEL_WARMUP_SECONDS.labels(model_version=version, batch_size=str(batch_size)).set(seconds)
+        print(f"Warm-up of {version}: " + ", ".join(f"{size} rows {s:.3f}s" for size, s in timings.items()))
+    return report
+
+
+async def startup_stages():
+    """Run startup stages in the background; the worker is ready once they finish.
+    
+    Schema changes are left to Alembic, so nothing here creates tables, and
+    a database that is not reachable yet only delays readiness.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            with startup.stage("load_models"):
+                manager = await loop.run_in_executor(None, load_models)
+            break
+        except Exception as e:
+            print(f"Model loading failed: {e}. Retrying in {settings.startup_retry_seconds}s")
+            await asyncio.sleep(settings.startup_retry_seconds)
+    print(f"Models loaded: active={manager.model_version}, canary={manager.canary_version}")
+    
+    if settings.warmup_enabled:
+        try:
+            with startup.stage("warm_up"):
+                await loop.run_in_executor(None, warm_up_models, manager)
+        except Exception as e:
+            print(f"Model warm-up failed: {e}")
+    startup.mark_ready()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background tasks"""
+    tasks = [asyncio.create_task(startup_stages()), asyncio.create_task(partition_maintenance_loop())]
+    if settings.performance_monitor_enabled:
+        tasks.append(asyncio.create_task(refresh_performance_loop()))
+    if settings.canary_analysis_enabled and settings.canary_auto_action:
+        tasks.append(asyncio.create_task(canary_analysis_loop()))
+    tasks.extend(asyncio.create_task(batch_job_loop()) for _ in range(settings.batch_job_workers))
+    yield
+    for task in tasks:
+        task.cancel()
+    await dispose_async_engines()
+
 
 app = FastAPI(
     title="Production ML System API",
     description="Production-ready ML system for customer churn prediction with real-time and batch inference",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -34,6 +165,13 @@ app.include_router(predictions.router, prefix="/api/v1")
 app.include_router(models.router, prefix="/api/v1")
 app.include_router(metrics.router, prefix="/api/v1")
 app.include_router(health.router, prefix="/api/v1")
+app.include_router(labels.router, prefix="/api/v1")
+app.include_router(drift.router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1")
+app.include_router(jobs.router, prefix="/api/v1")
+app.include_router(canary.router, prefix="/api/v1")
+app.include_router(scores.router, prefix="/api/v1")
+app.include_router(history.router, prefix="/api/v1")
 
 # Prometheus metrics endpoint
 metrics_app = make_asgi_app()
@@ -43,12 +181,28 @@ app.mount("/metrics", metrics_app)
 @app.middleware("http")
 async def metrics_middleware(request, call_next):
     """Middleware for collecting metrics"""
-    start_time = time.time()
-    response = await call_next(request)
-    duration = time.time() - start_time
+    timings = start_request()
+    
+    # Label by route template so per-id paths don't explode cardinality
+    endpoint = route_template(request.app, request.scope)
+    
+    profile = request_profiler.begin(endpoint)
+    try:
+        response = await call_next(request)
+    finally:
+        if profile is not None:
+            request_profiler.end(profile)
+    duration = timings.elapsed()
+    
+    REQUEST_COUNT.labels(method=request.method, endpoint=endpoint, status=response.status_code).inc()
+    REQUEST_DURATION.labels(method=request.method, endpoint=endpoint).observe(duration)
+    timings.observe(endpoint)
+    if endpoint.startswith("/api/v1/predict"):
+        live_metrics.record_request(duration, response.status_code)
     
-    REQUEST_COUNT.labels(method=request.method, endpoint=request.url.path).inc()
-    REQUEST_DURATION.observe(duration)
+    threshold = settings.server_timing_threshold_ms
+    if threshold is not None and duration * 1000 >= threshold:
+        response.headers["Server-Timing"] = timings.server_timing(duration)
     
     return response
 
@@ -74,8 +228,16 @@ async def api_info():
             "batch_predict": "/api/v1/predict/batch",
             "models": "/api/v1/models",
             "metrics": "/api/v1/metrics",
-            "health": "/api/v1/health"
+            "health": "/api/v1/health",
+            "labels": "/api/v1/labels",
+            "drift": "/api/v1/drift",
+            "jobs": "/api/v1/jobs",
+            "canary": "/api/v1/canary",
+            "top_scores": "/api/v1/scores/top",
+            "prediction_history": "/api/v1/predictions/history",
+            "prediction_export": "/api/v1/predictions/export"
         }
     }
 
 
+startup.imports_done()
@@ -1,7 +1,14 @@
 """ML model components"""
-from app.ml.model_manager import ModelManager
-from app.ml.trainer import ModelTrainer
 
 __all__ = ["ModelManager", "ModelTrainer"]
 
 
+def __getattr__(name):
+    # Resolved on first use so serving code does not import the training stack
+    if name == "ModelManager":
+        from app.ml.model_manager import ModelManager
+        return ModelManager
+    if name == "ModelTrainer":
+        from app.ml.trainer import ModelTrainer
+        return ModelTrainer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
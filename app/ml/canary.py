@@ -0,0 +1,246 @@
+"""Streaming canary analysis: per-version serving aggregates and a sequential test"""
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Sequence, Tuple
+import numpy as np
+from app.config import settings
+from app.ml.drift import psi
+
+# Log-spaced latency bucket edges, 1us to 100s, ~12% wide each
+LATENCY_EDGES = np.logspace(-6, 2, 161)
+SCORE_BINS = 20
+
+
+class LatencySketch:
+    """Fixed-size log-bucketed latency histogram; quantiles are within one bucket"""
+    
+    def __init__(self):
+        self.counts = np.zeros(len(LATENCY_EDGES) + 1)
+        self.total = 0
+    
+    def add(self, seconds: Sequence[float]):
+        values = np.asarray(seconds, dtype=float)
+        self.counts += np.bincount(np.searchsorted(LATENCY_EDGES, values), minlength=len(self.counts))
+        self.total += len(values)
+    
+    def merge(self, other: "LatencySketch"):
+        self.counts += other.counts
+        self.total += other.total
+    
+    def quantile(self, q: float) -> Optional[float]:
+        if self.total == 0:
+            return None
+        bucket = int(np.searchsorted(np.cumsum(self.counts), q * self.total))
+        return float(LATENCY_EDGES[min(bucket, len(LATENCY_EDGES) - 1)])
+
+
+class VersionAggregates:
+    """Running aggregates of one model version's routed traffic and realized outcomes.
+    
+    Routed predictions add their score to a histogram and their inference
+    time to a latency sketch; labelled predictions add their Brier loss
+    (count, sum and sum of squares) and whether they were misclassified.
+    Nothing is decayed, so the sequential test sees every outcome.
+    """
+    
+    def __init__(self):
+        self.scores = np.zeros(SCORE_BINS)
+        self.latency = LatencySketch()
+        self.predictions = 0
+        self.score_sum = 0.0
+        self.outcomes = 0
+        self.loss_sum = 0.0
+        self.loss_square_sum = 0.0
+        self.errors = 0
+    
+    def observe_predictions(self, probabilities: np.ndarray, seconds: Sequence[float]):
+        bins = np.clip((probabilities * SCORE_BINS).astype(int), 0, SCORE_BINS - 1)
+        self.scores += np.bincount(bins, minlength=SCORE_BINS)
+        self.latency.add(seconds)
+        self.predictions += len(probabilities)
+        self.score_sum += float(probabilities.sum())
+    
+    def observe_outcomes(self, probabilities: np.ndarray, actual: np.ndarray):
+        loss = (probabilities - actual) ** 2
+        self.outcomes += len(loss)
+        self.loss_sum += float(loss.sum())
+        self.loss_square_sum += float((loss ** 2).sum())
+        self.errors += int(((probabilities >= 0.5) != actual).sum())
+    
+    def loss_moments(self) -> Tuple[float, float]:
+        """Mean and variance of the per-prediction Brier loss"""
+        mean = self.loss_sum / self.outcomes
+        return mean, max(self.loss_square_sum / self.outcomes - mean ** 2, 0.0)
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "predictions": self.predictions,
+            "mean_score": self.score_sum / self.predictions if self.predictions else None,
+            "latency_p50": self.latency.quantile(0.5),
+            "latency_p95": self.latency.quantile(0.95),
+            "latency_p99": self.latency.quantile(0.99),
+            "labelled": self.outcomes,
+            "brier_score": self.loss_sum / self.outcomes if self.outcomes else None,
+            "error_rate": self.errors / self.outcomes if self.outcomes else None
+        }
+
+
+def sequential_test(canary: VersionAggregates, baseline: VersionAggregates,
+                    alpha: float, min_effect: float) -> Dict[str, float]:
+    """Mixture sequential probability ratio test on the Brier loss difference (canary - baseline).
+    
+    With a normal mixture of scale ``min_effect`` over the true difference,
+    the p-value and confidence interval stay valid however often they are
+    looked at, so the test can run on every refresh without inflating
+    false alarms.
+    """
+    canary_mean, canary_variance = canary.loss_moments()
+    baseline_mean, baseline_variance = baseline.loss_moments()
+    difference = canary_mean - baseline_mean
+    variance = max(canary_variance / canary.outcomes + baseline_variance / baseline.outcomes, 1e-12)
+    mixture = min_effect ** 2
+    
+    log_ratio = 0.5 * math.log(variance / (variance + mixture)) + (
+        mixture * difference ** 2 / (2 * variance * (variance + mixture))
+    )
+    half_width = math.sqrt(
+        2 * variance * (variance + mixture) / mixture
+        * (0.5 * math.log((variance + mixture) / variance) - math.log(alpha))
+    )
+    return {
+        "loss_difference": difference,
+        "p_value": min(1.0, math.exp(-log_ratio)),
+        "lower": difference - half_width,
+        "upper": difference + half_width
+    }
+
+
+class CanaryAnalyzer:
+    """Per-process canary analysis over in-memory aggregates, one per model version.
+    
+    ``observe`` is fed by routed single predictions (the randomized split
+    between active and canary) and ``observe_outcomes`` by the performance
+    monitor as labels of routed predictions are folded in, so both sides
+    compare the same traffic and a recommendation never scans the
+    predictions table. Each test keeps the running minimum p-value and the
+    intersection of its confidence intervals, as sequential tests require.
+    """
+    
+    def __init__(self, max_versions: int = 4):
+        self.max_versions = max_versions
+        self._versions: "OrderedDict[str, VersionAggregates]" = OrderedDict()
+        self._tests: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, model_version: Optional[str], probabilities: Sequence[float], seconds: Sequence[float]):
+        """Add routed predictions and their inference times"""
+        if not settings.canary_analysis_enabled or not model_version:
+            return
+        probabilities = np.asarray(probabilities, dtype=float)
+        with self._lock:
+            self._get(model_version).observe_predictions(probabilities, seconds)
+    
+    def observe_outcomes(self, model_version: Optional[str], probabilities: Sequence[float], actual: Sequence[bool]):
+        """Add labelled predictions of a version"""
+        if not settings.canary_analysis_enabled or not model_version:
+            return
+        probabilities = np.asarray(probabilities, dtype=float)
+        actual = np.asarray(actual, dtype=bool)
+        with self._lock:
+            self._get(model_version).observe_outcomes(probabilities, actual)
+    
+    def analyze(self, active_version: Optional[str], canary_version: Optional[str]) -> Dict[str, Any]:
+        """Current comparison of the canary with the active version, and what to do about it.
+        
+        The recommendation is "rollback" when the canary breaks the latency
+        guardrail or its loss is significantly worse than the active model's
+        by more than ``canary_noninferiority_margin``, "promote" once its loss
+        is shown to be no worse than that margin, "continue" while undecided
+        and "none" without a canary.
+        """
+        with self._lock:
+            active = self._versions.get(active_version) if active_version else None
+            canary = self._versions.get(canary_version) if canary_version else None
+            versions = {
+                version: aggregates.summary()
+                for version, aggregates in ((active_version, active), (canary_version, canary))
+                if aggregates is not None
+            }
+            score_psi = None
+            if active is not None and canary is not None and active.predictions and canary.predictions:
+                score_psi = psi(active.scores / active.predictions, canary.scores / canary.predictions)
+            
+            test = None
+            if (active is not None and canary is not None and
+                    min(active.outcomes, canary.outcomes) >= settings.canary_min_outcomes):
+                test = self._update_test(active_version, canary_version, sequential_test(
+                    canary, active, settings.canary_alpha, settings.canary_min_effect
+                ))
+        
+        recommendation, reason = self._recommend(versions, test, active_version, canary_version)
+        return {
+            "active_version": active_version,
+            "canary_version": canary_version,
+            "recommendation": recommendation,
+            "reason": reason,
+            "versions": versions,
+            "score_psi": score_psi,
+            "test": dict(test, alpha=settings.canary_alpha) if test else None
+        }
+    
+    def reset(self):
+        with self._lock:
+            self._versions.clear()
+            self._tests.clear()
+    
+    def _get(self, model_version: str) -> VersionAggregates:
+        aggregates = self._versions.get(model_version)
+        if aggregates is None:
+            aggregates = self._versions[model_version] = VersionAggregates()
+            while len(self._versions) > self.max_versions:
+                evicted, _ = self._versions.popitem(last=False)
+                self._tests = {pair: test for pair, test in self._tests.items() if evicted not in pair}
+        else:
+            self._versions.move_to_end(model_version)
+        return aggregates
+    
+    def _update_test(self, active_version: str, canary_version: str, current: Dict[str, float]) -> Dict[str, float]:
+        """Fold the latest test into the running one: smallest p-value, narrowest interval"""
+        previous = self._tests.get((active_version, canary_version))
+        if previous is not None:
+            current = dict(
+                current,
+                p_value=min(current["p_value"], previous["p_value"]),
+                lower=max(current["lower"], previous["lower"]),
+                upper=min(current["upper"], previous["upper"])
+            )
+        self._tests[(active_version, canary_version)] = current
+        return current
+    
+    @staticmethod
+    def _recommend(versions: Dict[str, Dict[str, Any]], test: Optional[Dict[str, float]],
+                   active_version: Optional[str], canary_version: Optional[str]) -> Tuple[str, str]:
+        if not canary_version:
+            return "none", "No canary is deployed"
+        
+        active, canary = versions.get(active_version), versions.get(canary_version)
+        if (active and canary and
+                min(active["predictions"], canary["predictions"]) >= settings.canary_min_latency_samples and
+                canary["latency_p95"] > settings.canary_max_latency_ratio * active["latency_p95"]):
+            return "rollback", (
+                f"Canary p95 latency {canary['latency_p95'] * 1000:.2f}ms exceeds "
+                f"{settings.canary_max_latency_ratio}x the active model's {active['latency_p95'] * 1000:.2f}ms"
+            )
+        if test is None:
+            return "continue", f"Waiting for {settings.canary_min_outcomes} labelled predictions per version"
+        
+        margin = settings.canary_noninferiority_margin
+        if test["lower"] > margin:
+            return "rollback", f"Canary Brier score is worse by {test['lower']:.4f} to {test['upper']:.4f}"
+        if test["upper"] < margin:
+            return "promote", f"Canary Brier score is within {margin} of the active model's ({test['upper']:+.4f} at most)"
+        return "continue", "The loss difference is not yet resolved"
+
+
+canary_analyzer = CanaryAnalyzer()
@@ -0,0 +1,321 @@
+"""Post-training compression of tree ensembles into compact serving artifacts"""
+import os
+import pickle
+from typing import Dict, Any, Optional
+import joblib
+import numpy as np
+from app.config import settings
+
+# Leaf marker in the compact ``feature`` array
+LEAF = -1
+
+
+class ExplanationUnavailable(ValueError):
+    """Raised when a compact artifact predates node means and cannot attribute predictions"""
+
+
+def _narrowest_int(max_value: int, min_value: int = 0) -> np.dtype:
+    """Return the narrowest signed integer dtype holding the given range"""
+    for dtype in (np.int8, np.int16, np.int32, np.int64):
+        info = np.iinfo(dtype)
+        if info.min <= min_value and max_value <= info.max:
+            return np.dtype(dtype)
+    raise ValueError(f"Range [{min_value}, {max_value}] does not fit in int64")
+
+
+def _floor_float32(values: np.ndarray) -> np.ndarray:
+    """Round float64 thresholds down to float32.
+    
+    sklearn compares float32 inputs against float64 thresholds, so rounding
+    towards -inf keeps ``x <= threshold`` exact for every float32 ``x``.
+    """
+    rounded = values.astype(np.float32)
+    too_high = rounded.astype(np.float64) > values
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+def compact_artifact_path(run_id: str) -> str:
+    """Path of the compact serving artifact for an MLflow run"""
+    return os.path.join(settings.model_registry_path, f"model_{run_id}.compact.joblib")
+
+
+class CompactTreeEnsemble:
+    """Flat, float32 representation of a binary tree-ensemble classifier.
+    
+    All trees are concatenated into four parallel node arrays. ``feature`` is
+    ``LEAF`` for leaves, and ``node_value`` holds the split threshold for
+    internal nodes and the leaf output for leaves. Child indices are local to
+    each tree and shifted by ``tree_offsets`` at inference time, which keeps
+    them in the narrowest integer type. Leaves use their own index as both
+    children so traversal needs no per-row masking. ``node_mean`` is the
+    mean output of the training rows reaching each node, used to attribute
+    predictions to features; artifacts written before it existed lack it.
+    """
+    
+    def __init__(self, kind: str, feature: np.ndarray, node_value: np.ndarray,
+                 children_left: np.ndarray, children_right: np.ndarray,
+                 tree_offsets: np.ndarray, max_depth: int, classes: np.ndarray,
+                 n_features: int, init_raw: float = 0.0, node_mean: Optional[np.ndarray] = None):
+        self.kind = kind
+        self.feature = feature
+        self.node_value = node_value
+        self.children_left = children_left
+        self.children_right = children_right
+        self.tree_offsets = tree_offsets
+        self.max_depth = max_depth
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+        self.init_raw = init_raw
+        self.node_mean = node_mean
+    
+    @classmethod
+    def from_sklearn(cls, model) -> "CompactTreeEnsemble":
+        """Build a compact ensemble from a fitted sklearn classifier"""
+        from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+        
+        if len(getattr(model, "classes_", [])) != 2:
+            raise ValueError("Only binary classifiers can be compressed")
+        
+        init_raw = 0.0
+        if isinstance(model, RandomForestClassifier):
+            kind = "random_forest"
+            trees = [estimator.tree_ for estimator in model.estimators_]
+            leaf_values = []
+            for tree in trees:
+                counts = tree.value[:, 0, :]
+                totals = counts.sum(axis=1)
+                leaf_values.append(counts[:, 1] / np.where(totals > 0, totals, 1.0))
+        elif isinstance(model, GradientBoostingClassifier):
+            kind = "gradient_boosting"
+            trees = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+            leaf_values = [tree.value[:, 0, 0] * model.learning_rate for tree in trees]
+            # Constant prior used by the default ``init`` estimator
+            dummy = np.zeros((1, model.n_features_in_), dtype=np.float32)
+            init_raw = float(model._raw_predict_init(dummy)[0, 0])
+        else:
+            raise ValueError(f"Unsupported model type: {type(model).__name__}")
+        
+        n_features = model.n_features_in_
+        compacted = [
+            _compact_tree(tree, values, n_features)
+            for tree, values in zip(trees, leaf_values)
+        ]
+        
+        sizes = [len(nodes[0]) for nodes in compacted]
+        tree_offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+        child_dtype = _narrowest_int(max(sizes))
+        
+        return cls(
+            kind=kind,
+            feature=np.concatenate([n[0] for n in compacted]).astype(
+                _narrowest_int(n_features, LEAF)
+            ),
+            node_value=np.concatenate([n[1] for n in compacted]).astype(np.float32),
+            children_left=np.concatenate([n[2] for n in compacted]).astype(child_dtype),
+            children_right=np.concatenate([n[3] for n in compacted]).astype(child_dtype),
+            tree_offsets=tree_offsets,
+            max_depth=max(n[4] for n in compacted),
+            classes=np.asarray(model.classes_),
+            n_features=n_features,
+            init_raw=init_raw,
+            node_mean=np.concatenate([n[5] for n in compacted]).astype(np.float32)
+        )
+    
+    @property
+    def n_trees(self) -> int:
+        return len(self.tree_offsets)
+    
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+    
+    def leaf_values(self, X: np.ndarray, chunk_size: int = 8192) -> np.ndarray:
+        """Return the leaf output of every tree for every row, shape (n, n_trees)"""
+        X = np.asarray(X, dtype=np.float32)
+        out = np.empty((X.shape[0], self.n_trees), dtype=np.float32)
+        
+        for start in range(0, X.shape[0], chunk_size):
+            chunk = X[start:start + chunk_size]
+            rows = np.arange(chunk.shape[0])[:, None]
+            nodes = np.broadcast_to(self.tree_offsets, (chunk.shape[0], self.n_trees))
+            
+            # Leaves point at themselves, so every row can take max_depth steps
+            for _ in range(self.max_depth):
+                go_left = chunk[rows, self.feature[nodes]] <= self.node_value[nodes]
+                child = np.where(go_left, self.children_left[nodes], self.children_right[nodes])
+                nodes = child + self.tree_offsets
+            
+            out[start:start + chunk.shape[0]] = self.node_value[nodes]
+        
+        return out
+    
+    def contributions(self, X: np.ndarray, chunk_size: int = 8192) -> tuple:
+        """Per-feature contributions to every row's output, by path attribution.
+        
+        Each split on a row's path moves the tree output from the parent's
+        mean to the child's; that change is credited to the split feature.
+        Returns ``(base_value, contributions)`` with contributions of shape
+        (n, n_features) such that ``base_value + contributions.sum(axis=1)``
+        is the positive-class probability (random forests) or the raw
+        log-odds score (gradient boosting). All trees of a chunk of rows
+        are walked together, as in ``leaf_values``.
+        """
+        if getattr(self, "node_mean", None) is None:
+            raise ExplanationUnavailable(
+                "The compact artifact of this model predates explanations; recompress it to explain predictions"
+            )
+        X = np.asarray(X, dtype=np.float32)
+        node_mean = self.node_mean.astype(np.float64)
+        width = self.n_features_in_ + 1  # column 0 collects the zero deltas of leaves
+        out = np.empty((X.shape[0], self.n_features_in_), dtype=np.float64)
+        
+        for start in range(0, X.shape[0], chunk_size):
+            chunk = X[start:start + chunk_size]
+            n = chunk.shape[0]
+            rows = np.arange(n)[:, None]
+            cells = np.broadcast_to(rows * width, (n, self.n_trees)).ravel()
+            nodes = np.broadcast_to(self.tree_offsets, (n, self.n_trees))
+            totals = np.zeros(n * width)
+            
+            for _ in range(self.max_depth):
+                feature = self.feature[nodes]
+                go_left = chunk[rows, feature] <= self.node_value[nodes]
+                child = np.where(go_left, self.children_left[nodes], self.children_right[nodes]) + self.tree_offsets
+                delta = node_mean[child] - node_mean[nodes]
+                totals += np.bincount(cells + (feature.ravel() + 1), weights=delta.ravel(), minlength=n * width)
+                nodes = child
+            
+            out[start:start + n] = totals.reshape(n, width)[:, 1:]
+        
+        base_value = float(node_mean[self.tree_offsets].sum())
+        if self.kind == "random_forest":
+            return base_value / self.n_trees, out / self.n_trees
+        return self.init_raw + base_value, out
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities, matching the sklearn ``predict_proba`` layout"""
+        values = self.leaf_values(X).astype(np.float64)
+        if self.kind == "random_forest":
+            positive = values.mean(axis=1)
+        else:
+            # Imported here so loading a compact artifact does not pull in scipy
+            from scipy.special import expit
+            positive = expit(self.init_raw + values.sum(axis=1))
+        return np.column_stack([1.0 - positive, positive])
+    
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predicted class labels"""
+        positive = self.predict_proba(X)[:, 1]
+        return self.classes_[(positive > 0.5).astype(int)]
+
+
+def _compact_tree(tree, leaf_values: np.ndarray, n_features: int) -> tuple:
+    """Prune one sklearn tree and flatten it in pre-order.
+    
+    Splits whose outcome is already decided by an ancestor split on the same
+    feature are bypassed (their other branch is unreachable), and splits whose
+    two children end up as leaves with identical float32 values are collapsed.
+    ``leaf_values`` holds the output of every sklearn node, leaves or not;
+    kept nodes carry theirs as the node mean.
+    """
+    left, right = tree.children_left, tree.children_right
+    feature, thresholds = tree.feature, _floor_float32(tree.threshold)
+    values = leaf_values.astype(np.float32)
+    
+    def build(node, lower, upper):
+        # Inputs reaching this node satisfy lower < x <= upper per feature
+        while left[node] != LEAF:
+            f, t = feature[node], thresholds[node]
+            if upper[f] <= t:
+                node = left[node]
+            elif lower[f] >= t:
+                node = right[node]
+            else:
+                break
+        
+        if left[node] == LEAF:
+            return ("leaf", values[node], values[node])
+        
+        f, t = feature[node], thresholds[node]
+        left_upper = upper.copy()
+        left_upper[f] = t
+        right_lower = lower.copy()
+        right_lower[f] = t
+        
+        left_sub = build(left[node], lower, left_upper)
+        right_sub = build(right[node], right_lower, upper)
+        if left_sub[0] == "leaf" and right_sub[0] == "leaf" and left_sub[1] == right_sub[1]:
+            return left_sub
+        return ("split", f, t, left_sub, right_sub, values[node])
+    
+    root = build(0, np.full(n_features, -np.inf), np.full(n_features, np.inf))
+    
+    out_feature, out_value, out_left, out_right, out_mean = [], [], [], [], []
+    
+    def flatten(sub, depth):
+        index = len(out_feature)
+        out_feature.append(LEAF)
+        out_value.append(sub[1] if sub[0] == "leaf" else sub[2])
+        out_mean.append(sub[-1])
+        out_left.append(index)
+        out_right.append(index)
+        if sub[0] == "leaf":
+            return depth
+        out_feature[index] = sub[1]
+        out_left[index] = len(out_feature)
+        left_depth = flatten(sub[3], depth + 1)
+        out_right[index] = len(out_feature)
+        right_depth = flatten(sub[4], depth + 1)
+        return max(left_depth, right_depth)
+    
+    max_depth = flatten(root, 0)
+    return (
+        np.asarray(out_feature),
+        np.asarray(out_value, dtype=np.float32),
+        np.asarray(out_left),
+        np.asarray(out_right),
+        max_depth,
+        np.asarray(out_mean, dtype=np.float32)
+    )
+
+
+def compress_model(model, X_validation: np.ndarray, output_path: Optional[str] = None,
+                   min_agreement: Optional[float] = None) -> Dict[str, Any]:
+    """Compress a fitted model and write the serving artifact if it is accepted.
+    
+    The compact model is only written when its prediction agreement with the
+    original model on ``X_validation`` reaches ``min_agreement``.
+    """
+    if min_agreement is None:
+        min_agreement = settings.compression_min_agreement
+    
+    compact = CompactTreeEnsemble.from_sklearn(model)
+    
+    original_bytes = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    compact_bytes = len(pickle.dumps(compact, protocol=pickle.HIGHEST_PROTOCOL))
+    original_nodes = sum(
+        estimator.tree_.node_count for estimator in np.ravel(model.estimators_)
+    )
+    
+    agreement = float(np.mean(model.predict(X_validation) == compact.predict(X_validation)))
+    probability_delta = float(np.max(np.abs(
+        model.predict_proba(X_validation)[:, 1] - compact.predict_proba(X_validation)[:, 1]
+    )))
+    accepted = agreement >= min_agreement
+    
+    if accepted and output_path:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        joblib.dump(compact, output_path)
+    
+    return {
+        "original_bytes": original_bytes,
+        "compact_bytes": compact_bytes,
+        "size_reduction": 1.0 - compact_bytes / original_bytes,
+        "original_nodes": int(original_nodes),
+        "compact_nodes": compact.n_nodes,
+        "agreement_rate": agreement,
+        "max_probability_delta": probability_delta,
+        "accepted": accepted,
+        "artifact_path": output_path if accepted else None
+    }
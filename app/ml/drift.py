@@ -0,0 +1,256 @@
+"""Reference sketches and fixed-memory streaming feature drift detection"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Mapping, Optional, Sequence
+import numpy as np
+import pandas as pd
+from prometheus_client.core import GaugeMetricFamily
+from app.config import settings
+
+NUMERIC_FEATURES = ["age", "tenure", "monthly_charges", "total_charges"]
+CATEGORICAL_FEATURES = ["contract_type", "payment_method", "internet_service"]
+
+# Floor for empty bins so PSI stays finite
+PSI_EPSILON = 1e-4
+
+
+def drift_reference_path(run_id: str) -> str:
+    """Path of the drift reference saved next to the model artifacts"""
+    return os.path.join(settings.model_registry_path, f"model_{run_id}.drift.json")
+
+
+def build_reference(df: pd.DataFrame, n_bins: Optional[int] = None) -> Dict[str, Any]:
+    """Summarize training data into per-feature reference histograms.
+    
+    Numeric features get quantile bin edges (so each bin holds roughly the
+    same share of training rows); categorical features get the observed
+    categories plus an overflow bucket for unseen values.
+    """
+    n_bins = n_bins or settings.drift_numeric_bins
+    reference = {"n_samples": int(len(df)), "numeric": {}, "categorical": {}}
+    
+    for name in NUMERIC_FEATURES:
+        values = df[name].astype(float).to_numpy()
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        reference["numeric"][name] = {
+            "edges": edges.tolist(),
+            "proportions": (counts / counts.sum()).tolist()
+        }
+    
+    for name in CATEGORICAL_FEATURES:
+        shares = df[name].astype(str).value_counts(normalize=True).sort_index()
+        reference["categorical"][name] = {
+            "categories": shares.index.tolist(),
+            "proportions": shares.tolist() + [0.0]
+        }
+    
+    return reference
+
+
+def save_reference(reference: Dict[str, Any], path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(reference, f)
+
+
+def load_reference(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def sample_reference(reference: Dict[str, Any], n_rows: int, seed: int = 0) -> Dict[str, np.ndarray]:
+    """Draw synthetic feature columns that follow the reference histograms.
+    
+    Numeric values are drawn uniformly inside a bin picked by its training
+    share (open-ended outer bins extend by one inner bin width).
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, spec in reference["numeric"].items():
+        edges = np.asarray(spec["edges"], dtype=float)
+        width = np.diff(edges).mean() if len(edges) > 1 else 1.0
+        bounds = np.concatenate([[edges[0] - width], edges, [edges[-1] + width]]) if len(edges) else np.array([0.0, 1.0])
+        bins = rng.choice(len(bounds) - 1, size=n_rows, p=_normalized(spec["proportions"]))
+        columns[name] = rng.uniform(bounds[bins], bounds[bins + 1])
+    for name, spec in reference["categorical"].items():
+        shares = _normalized(spec["proportions"][:len(spec["categories"])])
+        columns[name] = rng.choice(np.asarray(spec["categories"], dtype=object), size=n_rows, p=shares)
+    return columns
+
+
+def _normalized(proportions) -> np.ndarray:
+    values = np.asarray(proportions, dtype=float)
+    return values / values.sum()
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Population stability index between two distributions over the same bins"""
+    expected = np.maximum(expected, PSI_EPSILON)
+    actual = np.maximum(actual, PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def binned_ks(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Kolmogorov-Smirnov statistic evaluated at the reference bin edges"""
+    return float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual))))
+
+
+class StreamingDriftSketch:
+    """Fixed-size live histograms for one model version.
+    
+    Every feature keeps one count array aligned with its reference bins, so
+    memory does not grow with traffic. When the live total exceeds
+    ``window_size`` all counts are halved, which keeps the sketch weighted
+    towards recent traffic.
+    """
+    
+    def __init__(self, reference: Dict[str, Any], window_size: Optional[int] = None):
+        self.reference = reference
+        self.window_size = window_size or settings.drift_window_size
+        self._lock = threading.Lock()
+        self._edges = {
+            name: np.asarray(spec["edges"], dtype=float)
+            for name, spec in reference["numeric"].items()
+        }
+        self._categories = {
+            name: pd.Index(spec["categories"])
+            for name, spec in reference["categorical"].items()
+        }
+        self._counts = {
+            name: np.zeros(len(spec["proportions"]))
+            for kind in ("numeric", "categorical")
+            for name, spec in reference[kind].items()
+        }
+        self.total = 0.0
+    
+    def update(self, columns: Mapping[str, Sequence]):
+        """Add one batch of raw customer features (a DataFrame or dict of columns)"""
+        batch = {}
+        size = 0
+        for name, edges in self._edges.items():
+            values = np.asarray(columns[name], dtype=float)
+            size = len(values)
+            batch[name] = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        for name, categories in self._categories.items():
+            overflow = len(categories)
+            bins = pd.Categorical(columns[name], categories=categories).codes.astype(np.intp)
+            bins[bins < 0] = overflow  # unseen categories
+            batch[name] = np.bincount(bins, minlength=overflow + 1)
+        
+        with self._lock:
+            for name, counts in batch.items():
+                self._counts[name] += counts
+            self.total += size
+            if self.total > self.window_size:
+                for counts in self._counts.values():
+                    counts *= 0.5
+                self.total *= 0.5
+    
+    def scores(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """PSI per feature, plus KS for numeric features"""
+        with self._lock:
+            counts = {name: c.copy() for name, c in self._counts.items()}
+        result = {}
+        for kind in ("numeric", "categorical"):
+            for name, spec in self.reference[kind].items():
+                total = counts[name].sum()
+                if total == 0:
+                    continue
+                expected = np.asarray(spec["proportions"])
+                actual = counts[name] / total
+                result[name] = {
+                    "psi": psi(expected, actual),
+                    "ks": binned_ks(expected, actual) if kind == "numeric" else None
+                }
+        return result
+
+
+class DriftMonitor:
+    """Per-process registry of streaming drift sketches, one per model version"""
+    
+    def __init__(self, max_versions: Optional[int] = None):
+        self.max_versions = max_versions or settings.drift_max_versions
+        self._sketches: "OrderedDict[str, Optional[StreamingDriftSketch]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def observe(self, model_version: Optional[str], run_id: Optional[str],
+                columns: Mapping[str, Sequence]):
+        """Feed a batch of served customers into the sketch of their model version"""
+        if not settings.drift_enabled or not model_version:
+            return
+        sketch = self._get_sketch(model_version, run_id)
+        if sketch is not None:
+            sketch.update(columns)
+    
+    def report(self, model_version: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Current drift scores of tracked model versions"""
+        with self._lock:
+            items = list(self._sketches.items())
+        return [
+            {
+                "model_version": version,
+                "sample_count": sketch.total,
+                "reference_samples": sketch.reference["n_samples"],
+                "features": sketch.scores()
+            }
+            for version, sketch in items
+            if sketch is not None and (model_version is None or version == model_version)
+        ]
+    
+    def reset(self):
+        with self._lock:
+            self._sketches.clear()
+    
+    def _get_sketch(self, model_version: str, run_id: Optional[str]) -> Optional[StreamingDriftSketch]:
+        with self._lock:
+            if model_version in self._sketches:
+                self._sketches.move_to_end(model_version)
+                return self._sketches[model_version]
+        
+        # Versions without a saved reference are remembered as None
+        reference = load_reference(drift_reference_path(run_id)) if run_id else None
+        sketch = StreamingDriftSketch(reference) if reference else None
+        
+        with self._lock:
+            sketch = self._sketches.setdefault(model_version, sketch)
+            while len(self._sketches) > self.max_versions:
+                self._sketches.popitem(last=False)
+        return sketch
+
+
+class DriftCollector:
+    """Prometheus collector computing drift gauges at scrape time"""
+    
+    def __init__(self, monitor: DriftMonitor):
+        self.monitor = monitor
+    
+    def collect(self):
+        psi_gauge = GaugeMetricFamily(
+            "feature_drift_psi", "Population stability index of live vs training features",
+            labels=["model_version", "feature"]
+        )
+        ks_gauge = GaugeMetricFamily(
+            "feature_drift_ks", "Binned KS statistic of live vs training numeric features",
+            labels=["model_version", "feature"]
+        )
+        samples_gauge = GaugeMetricFamily(
+            "feature_drift_samples", "Effective live samples in the drift sketch",
+            labels=["model_version"]
+        )
+        for entry in self.monitor.report():
+            samples_gauge.add_metric([entry["model_version"]], entry["sample_count"])
+            for feature, scores in entry["features"].items():
+                psi_gauge.add_metric([entry["model_version"], feature], scores["psi"])
+                if scores["ks"] is not None:
+                    ks_gauge.add_metric([entry["model_version"], feature], scores["ks"])
+        yield psi_gauge
+        yield ks_gauge
+        yield samples_gauge
+
+
+drift_monitor = DriftMonitor()
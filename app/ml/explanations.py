@@ -0,0 +1,61 @@
+"""Per-prediction feature contributions for tree-ensemble models"""
+import threading
+import weakref
+from typing import Dict, Any, List
+import numpy as np
+from app.ml.compression import CompactTreeEnsemble
+from app.ml.feature_codec import FEATURE_SCHEMA
+
+FEATURE_NAMES = [name for name, _, _ in FEATURE_SCHEMA]
+
+# Compact forms of sklearn models served uncompressed, built on first explanation
+_COMPILED: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_COMPILE_LOCK = threading.Lock()
+
+
+def compiled(model) -> CompactTreeEnsemble:
+    """Compact ensemble of ``model``, compiling sklearn models once"""
+    if isinstance(model, CompactTreeEnsemble):
+        return model
+    with _COMPILE_LOCK:
+        compact = _COMPILED.get(model)
+        if compact is None:
+            compact = _COMPILED[model] = CompactTreeEnsemble.from_sklearn(model)
+    return compact
+
+
+def feature_names(n_features: int) -> List[str]:
+    """Names of the model input columns"""
+    if n_features == len(FEATURE_NAMES):
+        return FEATURE_NAMES
+    return [f"feature_{i}" for i in range(n_features)]
+
+
+def explain(model, features: np.ndarray) -> Dict[str, Any]:
+    """Base value and per-row, per-feature contributions of a batch.
+    
+    Random forests are explained in probability space, gradient boosting
+    in log-odds; in both, base value plus a row's contributions is the
+    model output for that row.
+    """
+    compact = compiled(model)
+    base_value, contributions = compact.contributions(features)
+    return {
+        "output": "probability" if compact.kind == "random_forest" else "log_odds",
+        "feature_names": feature_names(compact.n_features_in_),
+        "base_value": base_value,
+        "contributions": contributions
+    }
+
+
+def explanation_rows(explanation: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One ``{output, base_value, contributions: {feature: value}}`` dict per row"""
+    names = explanation["feature_names"]
+    return [
+        {
+            "output": explanation["output"],
+            "base_value": explanation["base_value"],
+            "contributions": dict(zip(names, row))
+        }
+        for row in explanation["contributions"].tolist()
+    ]
@@ -0,0 +1,134 @@
+"""Versioned, reversible float32 encoding of customer features"""
+import hashlib
+import json
+from typing import Dict, Any
+import numpy as np
+import pandas as pd
+
+# Field order and vocabularies of the encoded vector. Changing either changes
+# CODEC_VERSION, so stored vectors always decode with the schema that wrote them.
+FEATURE_SCHEMA = [
+    ("age", "int", None),
+    ("tenure", "int", None),
+    ("monthly_charges", "float", None),
+    ("total_charges", "float", None),
+    ("contract_type", "category", ["Month-to-month", "One year", "Two year"]),
+    ("payment_method", "category", ["Electronic check", "Mailed check", "Bank transfer", "Credit card"]),
+    ("paperless_billing", "bool", None),
+    ("gender", "category", ["Male", "Female"]),
+    ("partner", "bool", None),
+    ("dependents", "bool", None),
+    ("phone_service", "bool", None),
+    ("multiple_lines", "bool", None),
+    ("internet_service", "category", ["DSL", "Fiber optic", "No"]),
+    ("online_security", "bool", None),
+    ("online_backup", "bool", None),
+    ("device_protection", "bool", None),
+    ("tech_support", "bool", None),
+    ("streaming_tv", "bool", None),
+    ("streaming_movies", "bool", None),
+]
+
+CODEC_VERSION = "fv1-" + hashlib.sha256(
+    json.dumps(FEATURE_SCHEMA, sort_keys=True).encode()
+).hexdigest()[:12]
+
+
+class FeatureVectorCodec:
+    """Encodes customer feature dicts as float32 vectors and back.
+
+    Numeric fields are stored as float32, booleans as 0/1 and categorical
+    fields as their index in the schema vocabulary. ``customer_id`` is not
+    part of the vector.
+    """
+
+    version = CODEC_VERSION
+    fields = [name for name, _, _ in FEATURE_SCHEMA]
+
+    def __init__(self):
+        self._codes = {
+            name: {value: index for index, value in enumerate(vocabulary)}
+            for name, kind, vocabulary in FEATURE_SCHEMA
+            if kind == "category"
+        }
+
+    def can_encode(self, features: Dict[str, Any]) -> bool:
+        """Whether every categorical value is in the schema vocabulary"""
+        return all(features.get(name) in codes for name, codes in self._codes.items())
+
+    def encode(self, features: Dict[str, Any]) -> np.ndarray:
+        """Encode one feature dict; raises ValueError for unknown categories"""
+        vector = np.empty(len(FEATURE_SCHEMA), dtype=np.float32)
+        for i, (name, kind, _) in enumerate(FEATURE_SCHEMA):
+            value = features[name]
+            if kind == "category":
+                if value not in self._codes[name]:
+                    raise ValueError(f"Unknown {name} value: {value}")
+                vector[i] = self._codes[name][value]
+            else:
+                vector[i] = float(value)
+        return vector
+
+    def decode(self, vector: np.ndarray) -> Dict[str, Any]:
+        """Decode one vector back into a readable feature dict"""
+        features = {}
+        for value, (name, kind, vocabulary) in zip(vector, FEATURE_SCHEMA):
+            if kind == "category":
+                features[name] = vocabulary[int(value)]
+            elif kind == "bool":
+                features[name] = bool(value)
+            elif kind == "int":
+                features[name] = int(round(float(value)))
+            else:
+                # Shortest float32 repr, so 70.35 decodes as 70.35
+                features[name] = float(str(np.float32(value)))
+        return features
+
+    def encode_frame(self, df: pd.DataFrame) -> np.ndarray:
+        """Encode a frame of customers at once; rows with unknown categories are all NaN"""
+        matrix = np.empty((len(df), len(FEATURE_SCHEMA)), dtype=np.float32)
+        unknown = np.zeros(len(df), dtype=bool)
+        for i, (name, kind, vocabulary) in enumerate(FEATURE_SCHEMA):
+            if kind == "category":
+                codes = pd.Categorical(df[name], categories=vocabulary).codes
+                unknown |= codes < 0
+                matrix[:, i] = codes
+            else:
+                matrix[:, i] = np.asarray(df[name], dtype=np.float32)
+        matrix[unknown] = np.nan
+        return matrix
+
+    def decode_columns(self, matrix: np.ndarray) -> Dict[str, np.ndarray]:
+        """Decode a matrix of vectors into one array of readable values per field"""
+        columns = {}
+        for i, (name, kind, vocabulary) in enumerate(FEATURE_SCHEMA):
+            values = matrix[:, i]
+            if kind == "category":
+                columns[name] = np.asarray(vocabulary, dtype=object)[values.astype(np.intp)]
+            elif kind == "bool":
+                columns[name] = values.astype(bool)
+            elif kind == "int":
+                columns[name] = np.round(values).astype(np.int64)
+            else:
+                columns[name] = values.astype(np.float64)
+        return columns
+
+    def to_bytes(self, vector: np.ndarray) -> bytes:
+        return np.asarray(vector, dtype="<f4").tobytes()
+
+    def from_bytes(self, payload: bytes) -> np.ndarray:
+        return np.frombuffer(payload, dtype="<f4")
+
+    def content_hash(self, payload: bytes) -> bytes:
+        """16-byte content hash of an encoded vector under this codec version"""
+        return hashlib.blake2b(self.version.encode() + payload, digest_size=16).digest()
+
+
+CODECS = {CODEC_VERSION: FeatureVectorCodec}
+
+
+def get_codec(version: str) -> FeatureVectorCodec:
+    """Codec able to decode vectors written with ``version``"""
+    if version not in CODECS:
+        raise ValueError(f"Unknown feature codec version: {version}")
+    return CODECS[version]()
@@ -1,26 +1,66 @@
 """Model manager for loading and serving models"""
 import os
-import mlflow
-import mlflow.sklearn
+import time
 import joblib
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import numpy as np
+import pandas as pd
+from sqlalchemy import select
 from app.config import settings
-from app.database import SessionLocal
+from app.database import SessionLocal, async_session
 from app.models import ModelVersion
 from app.feature_store.transformer import FeatureTransformer
+from app.ml.compression import compact_artifact_path
+from app.ml.explanations import explain
+from app.ml.drift import drift_reference_path, load_reference, sample_reference
+from app.ml.feature_codec import FEATURE_SCHEMA
+from app.ml.model_pool import model_pool
+from app.instrumentation import stage
+
+
+class ModelVersionNotFound(ValueError):
+    """Raised when a requested model version is not registered"""
 
 
 class ModelManager:
     """Manages model loading, versioning, and inference"""
     
-    def __init__(self):
+    def __init__(self, load: bool = True):
         self.current_model = None
         self.canary_model = None
         self.model_version = None
         self.canary_version = None
+        self.run_ids = {}  # model version -> MLflow run id
+        self.pinned_models = {}  # model version -> model, resolved by load_version
         self.feature_transformer = FeatureTransformer()
-        self._load_models()
+        if load:
+            with stage("model_load"):
+                self._load_models()
+    
+    @classmethod
+    async def create(cls) -> "ModelManager":
+        """Load active and canary models, looking them up on the async read pool.
+        
+        Used by request handlers so neither the registry query nor an
+        artifact load blocks the event loop; artifacts come from the
+        process-wide model pool and a miss loads in the default executor.
+        """
+        manager = cls(load=False)
+        with stage("model_load"):
+            async with async_session("read") as db:
+                active_model = await db.scalar(
+                    select(ModelVersion).where(ModelVersion.status == "active").limit(1)
+                )
+                canary_model = await db.scalar(
+                    select(ModelVersion).where(ModelVersion.status == "canary").limit(1)
+                )
+            if active_model:
+                manager.model_version = active_model.version
+                manager.current_model = await manager._get_pooled_model_async(active_model)
+            if canary_model:
+                manager.canary_version = canary_model.version
+                manager.canary_model = await manager._get_pooled_model_async(canary_model)
+        return manager
     
     def _load_models(self):
         """Load active and canary models"""
@@ -31,34 +71,95 @@ class ModelManager:
                 ModelVersion.status == "active"
             ).first()
             
-            if active_model:
-                self.model_version = active_model.version
-                try:
-                    self.current_model = self._load_model_from_mlflow(active_model.mlflow_run_id)
-                except Exception as e:
-                    # Fallback to local file
-                    print(f"Failed to load from MLflow: {e}. Trying local file...")
-                    self.current_model = self._load_model_from_file(active_model.version)
-            
             # Load canary model
             canary_model = db.query(ModelVersion).filter(
                 ModelVersion.status == "canary"
             ).first()
             
-            if canary_model:
-                self.canary_version = canary_model.version
-                try:
-                    self.canary_model = self._load_model_from_mlflow(canary_model.mlflow_run_id)
-                except Exception as e:
-                    # Fallback to local file
-                    print(f"Failed to load canary from MLflow: {e}. Trying local file...")
-                    self.canary_model = self._load_model_from_file(canary_model.version)
+            self._use_models(active_model, canary_model)
         finally:
             db.close()
     
+    def _use_models(self, active_model: Optional[ModelVersion], canary_model: Optional[ModelVersion]):
+        if active_model:
+            self.model_version = active_model.version
+            self.current_model = self._get_pooled_model(active_model)
+        
+        if canary_model:
+            self.canary_version = canary_model.version
+            self.canary_model = self._get_pooled_model(canary_model)
+    
+    async def load_version(self, version: str):
+        """Resolve a pinned version on the async read pool so ``get_model`` finds it.
+        
+        Raises ModelVersionNotFound for versions that are not registered.
+        """
+        if version in (self.model_version, self.canary_version) or version in self.pinned_models:
+            return
+        async with async_session("read") as db:
+            model_version = await db.scalar(select(ModelVersion).where(ModelVersion.version == version).limit(1))
+        if model_version is None:
+            raise ModelVersionNotFound(f"Model version {version} not found")
+        model = await self._get_pooled_model_async(model_version)
+        if model is None:
+            raise ValueError(f"Model version {version} could not be loaded")
+        self.pinned_models[version] = model
+    
+    def get_model(self, version: str):
+        """Model of a specific registered version, e.g. for requests pinned to it"""
+        if version == self.model_version and self.current_model is not None:
+            return self.current_model
+        if version == self.canary_version and self.canary_model is not None:
+            return self.canary_model
+        if version in self.pinned_models:
+            return self.pinned_models[version]
+        
+        db = SessionLocal()
+        try:
+            model_version = db.query(ModelVersion).filter(ModelVersion.version == version).first()
+            if model_version is None:
+                raise ModelVersionNotFound(f"Model version {version} not found")
+            model = self._get_pooled_model(model_version)
+        finally:
+            db.close()
+        if model is None:
+            raise ValueError(f"Model version {version} could not be loaded")
+        return model
+    
+    def _get_pooled_model(self, model_version: ModelVersion):
+        """Model of a registered version, loaded at most once per process"""
+        version, run_id = model_version.version, model_version.mlflow_run_id
+        self.run_ids[version] = run_id
+        return model_pool.get(version, run_id, lambda: self._load_model(version, run_id))
+    
+    async def _get_pooled_model_async(self, model_version: ModelVersion):
+        """``_get_pooled_model`` that waits for a load without blocking the event loop"""
+        version, run_id = model_version.version, model_version.mlflow_run_id
+        self.run_ids[version] = run_id
+        return await model_pool.get_async(version, run_id, lambda: self._load_model(version, run_id))
+    
+    def _load_model(self, version: str, run_id: str):
+        """Load a model artifact: compact artifact, then MLflow, then local file"""
+        try:
+            return self._load_compact_model(run_id) or self._load_model_from_mlflow(run_id)
+        except Exception as e:
+            # Fallback to local file
+            print(f"Failed to load {version} from MLflow: {e}. Trying local file...")
+            return self._load_model_from_file(version)
+    
+    def _load_compact_model(self, run_id: str):
+        """Load the compact serving artifact written after training, if any"""
+        if not settings.serve_compact_models or not run_id:
+            return None
+        model_path = compact_artifact_path(run_id)
+        if os.path.exists(model_path):
+            return joblib.load(model_path)
+        return None
+    
     def _load_model_from_mlflow(self, run_id: str):
         """Load model from MLflow"""
         try:
+            import mlflow.sklearn
             mlflow.set_tracking_uri(settings.mlflow_tracking_uri)
             model_uri = f"runs:/{run_id}/model"
             return mlflow.sklearn.load_model(model_uri)
@@ -72,18 +173,104 @@ class ModelManager:
             return joblib.load(model_path)
         return None
     
-    def predict(self, features: np.ndarray, use_canary: bool = False) -> tuple:
-        """Make prediction"""
+    def _select_model(self, use_canary: bool = False, model_version: Optional[str] = None):
+        if model_version is not None:
+            return self.get_model(model_version)
         model = self.canary_model if use_canary and self.canary_model else self.current_model
-        
         if model is None:
             raise ValueError("No model loaded")
+        return model
+    
+    def predict(self, features: np.ndarray, use_canary: bool = False,
+                model_version: Optional[str] = None) -> tuple:
+        """Make prediction"""
+        model = self._select_model(use_canary, model_version)
         
-        prediction = model.predict(features)[0]
-        probability = model.predict_proba(features)[0][1]
+        with stage("inference"):
+            prediction = model.predict(features)[0]
+            probability = model.predict_proba(features)[0][1]
         
         return float(prediction), float(probability)
     
+    def predict_batch(self, features: np.ndarray, use_canary: bool = False,
+                      model_version: Optional[str] = None) -> tuple:
+        """Make predictions for a feature matrix, returning (predictions, probabilities)"""
+        model = self._select_model(use_canary, model_version)
+        
+        with stage("inference"):
+            predictions = model.predict(features)
+            probabilities = model.predict_proba(features)[:, 1]
+        
+        return predictions, probabilities
+    
+    def explain(self, features: np.ndarray, use_canary: bool = False,
+                model_version: Optional[str] = None) -> Dict[str, Any]:
+        """Per-feature contributions to the predictions of the same model ``predict_batch`` uses"""
+        model = self._select_model(use_canary, model_version)
+        
+        with stage("explanation"):
+            return explain(model, features)
+    
+    def warm_up(self, batch_sizes: Optional[List[int]] = None, rounds: Optional[int] = None) -> Dict[str, Any]:
+        """Run synthetic batches through encoding and inference for every loaded model.
+        
+        Rows are drawn from the training data sketch saved with the model
+        (uniform over the schema when there is none), so first-call costs are
+        paid here rather than by the first requests.
+        """
+        batch_sizes = batch_sizes or settings.warmup_batch_sizes
+        rounds = rounds or settings.warmup_rounds
+        models = [
+            (version, model, use_canary)
+            for version, model, use_canary in (
+                (self.model_version, self.current_model, False),
+                (self.canary_version, self.canary_model, True),
+            )
+            if model is not None
+        ]
+        
+        report = {}
+        for version, model, use_canary in models:
+            rows = self._warmup_rows(version, max(batch_sizes))
+            timings = {}
+            for size in batch_sizes:
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    if size == 1:
+                        features = self.feature_transformer.transform(rows.iloc[0].to_dict())
+                        self.predict(features, use_canary)
+                    else:
+                        features = self.feature_transformer.transform_batch(rows.iloc[:size])
+                        self.predict_batch(features, use_canary)
+                timings[size] = time.perf_counter() - start
+            report[version] = timings
+        return report
+    
+    def _warmup_rows(self, version: str, n_rows: int) -> pd.DataFrame:
+        """Synthetic customers following the model's training data sketch"""
+        rng = np.random.default_rng(0)
+        run_id = self.run_ids.get(version)
+        reference = load_reference(drift_reference_path(run_id)) if run_id else None
+        columns = sample_reference(reference, n_rows) if reference else {}
+        
+        for name, kind, vocabulary in FEATURE_SCHEMA:
+            if kind == "category":
+                values = columns.get(name)
+                if values is None:
+                    values = rng.choice(np.asarray(vocabulary, dtype=object), size=n_rows)
+                columns[name] = values
+            elif kind == "bool":
+                columns[name] = rng.random(n_rows) < 0.5
+            elif name in columns:
+                values = np.maximum(columns[name], 0)
+                columns[name] = np.round(values).astype(int) if kind == "int" else values
+            else:
+                columns[name] = rng.uniform(0, 100, n_rows).astype(int if kind == "int" else float)
+        
+        df = pd.DataFrame(columns)
+        df.insert(0, "customer_id", [f"WARMUP_{i}" for i in range(n_rows)])
+        return df
+    
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about loaded models"""
         return {
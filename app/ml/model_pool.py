@@ -0,0 +1,181 @@
+"""Process-wide pool of loaded models, shared by all ModelManager instances"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from prometheus_client.core import GaugeMetricFamily
+from app.config import settings
+
+
+def model_memory_bytes(model: Any) -> int:
+    """Bytes held by the numpy arrays reachable from a model.
+    
+    Walks attributes, containers and pickled state (sklearn trees keep
+    their node arrays there), counting every array once.
+    """
+    seen = {}  # id -> object; holding the object keeps temporary states' ids unique
+    stack = [model]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen[id(obj)] = obj
+        if isinstance(obj, np.ndarray):
+            total += obj.nbytes
+            if obj.dtype == object:
+                stack.extend(obj.ravel())
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+        elif type(obj).__module__.startswith("sklearn") and hasattr(obj, "__getstate__"):
+            stack.append(obj.__getstate__())
+        elif hasattr(obj, "__dict__"):
+            stack.extend(vars(obj).values())
+    return total
+
+
+class PooledModel:
+    """A resident model and its bookkeeping"""
+    
+    def __init__(self, version: str, run_id: Optional[str], model: Any):
+        self.version = version
+        self.run_id = run_id
+        self.model = model
+        self.memory_bytes = model_memory_bytes(model)
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.hits = 0
+
+
+class ModelPool:
+    """LRU pool of model versions bounded by their measured memory.
+    
+    Loads are lazy and single-flight: concurrent requests for a version
+    that is not resident wait for one load instead of each loading it;
+    ``get_async`` does this without blocking the event loop. The
+    most recently loaded version is never evicted, so one model larger
+    than the budget can still be served.
+    """
+    
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes or settings.model_pool_max_bytes
+        self._entries: "OrderedDict[str, PooledModel]" = OrderedDict()
+        self._loading: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, version: str, run_id: Optional[str], loader: Callable[[], Any]) -> Any:
+        """Return the model for ``version``, calling ``loader`` at most once concurrently"""
+        model, future, owner = self._claim(version, run_id)
+        if future is None:
+            return model
+        if owner:
+            return self._load(version, run_id, loader, future)
+        return future.result()
+    
+    async def get_async(self, version: str, run_id: Optional[str], loader: Callable[[], Any]) -> Any:
+        """``get`` for the event loop: a miss loads in the default executor and is awaited.
+        
+        The executor completes the load even if the awaiting request is
+        cancelled, so other requests waiting for the version still get it.
+        """
+        model, future, owner = self._claim(version, run_id)
+        if future is None:
+            return model
+        if owner:
+            asyncio.get_running_loop().run_in_executor(None, self._load, version, run_id, loader, future)
+        return await asyncio.wrap_future(future)
+    
+    def _claim(self, version: str, run_id: Optional[str]) -> Tuple[Any, Optional[Future], bool]:
+        """(model, None, False) when resident; otherwise (None, the load's future, whether to load it)"""
+        with self._lock:
+            entry = self._entries.get(version)
+            # A version re-registered with another run is reloaded
+            if entry is not None and entry.run_id == run_id:
+                self._entries.move_to_end(version)
+                entry.hits += 1
+                entry.last_used = time.time()
+                return entry.model, None, False
+            future = self._loading.get(version)
+            if future is not None:
+                return None, future, False
+            future = self._loading[version] = Future()
+            return None, future, True
+    
+    def _load(self, version: str, run_id: Optional[str], loader: Callable[[], Any], future: Future) -> Any:
+        try:
+            model = loader()
+        except BaseException as e:
+            with self._lock:
+                del self._loading[version]
+            future.set_exception(e)
+            raise
+        
+        with self._lock:
+            if model is not None:
+                self._entries[version] = PooledModel(version, run_id, model)
+                self._evict()
+            del self._loading[version]
+        future.set_result(model)
+        return model
+    
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.memory_bytes for entry in self._entries.values())
+    
+    def stats(self) -> List[Dict[str, Any]]:
+        """Resident versions, least recently used first"""
+        with self._lock:
+            return [
+                {
+                    "version": entry.version,
+                    "run_id": entry.run_id,
+                    "memory_bytes": entry.memory_bytes,
+                    "loaded_at": entry.loaded_at,
+                    "last_used": entry.last_used,
+                    "hits": entry.hits
+                }
+                for entry in self._entries.values()
+            ]
+    
+    def evict(self, version: str) -> bool:
+        with self._lock:
+            return self._entries.pop(version, None) is not None
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def _evict(self):
+        total = sum(entry.memory_bytes for entry in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            total -= entry.memory_bytes
+            print(f"Evicted model {entry.version} from pool ({entry.memory_bytes} bytes)")
+
+
+class ModelPoolCollector:
+    """Prometheus collector for pool size and per-version memory"""
+    
+    def __init__(self, pool: ModelPool):
+        self.pool = pool
+    
+    def collect(self):
+        stats = self.pool.stats()
+        size = GaugeMetricFamily("model_pool_models", "Model versions resident in the pool")
+        size.add_metric([], len(stats))
+        memory = GaugeMetricFamily(
+            "model_pool_memory_bytes", "Measured memory of each resident model version",
+            labels=["model_version"]
+        )
+        for entry in stats:
+            memory.add_metric([entry["version"]], entry["memory_bytes"])
+        yield size
+        yield memory
+
+
+model_pool = ModelPool()
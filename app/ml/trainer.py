@@ -11,6 +11,9 @@ from sklearn.metrics import (
 )
 from app.config import settings
 from app.feature_store.transformer import FeatureTransformer
+from app.feature_store.offline import OfflineFeatureStore, FEATURE_COLUMNS
+from app.ml.compression import compress_model, compact_artifact_path
+from app.ml.drift import build_reference, save_reference, drift_reference_path
 from app.database import SessionLocal
 from app.models import ModelVersion, ModelMetrics
 from datetime import datetime
@@ -89,6 +92,13 @@ class ModelTrainer:
             import joblib
             joblib.dump(model, model_path)
             
+            # Reference feature distributions for drift detection
+            self._save_drift_reference(df.drop('churn', axis=1), run_id)
+            
+            # Compact serving artifact
+            if settings.compress_models:
+                self._compress_model(model, X_test, run_id)
+            
             # Register model version
             self._register_model_version(run_id, model_type, {
                 "accuracy": float(accuracy),
@@ -100,6 +110,43 @@ class ModelTrainer:
             
             return run_id
     
+    def train_from_store(self, labels: pd.DataFrame, model_type: str = "random_forest",
+                         store: OfflineFeatureStore = None,
+                         timestamp_column: str = "label_timestamp") -> str:
+        """Train on labels joined point-in-time to the offline feature store.
+        
+        ``labels`` holds ``customer_id``, ``churn`` and the label timestamp;
+        each label gets the features its customer had at that time.
+        """
+        store = store or OfflineFeatureStore()
+        joined = store.point_in_time_join(labels, FEATURE_COLUMNS, timestamp_column=timestamp_column)
+        if joined.empty:
+            raise ValueError("No labels have features in the offline store")
+        return self.train(joined[["customer_id"] + FEATURE_COLUMNS + ["churn"]], model_type)
+    
+    def _save_drift_reference(self, df: pd.DataFrame, run_id: str):
+        """Save per-feature reference histograms with the model artifacts"""
+        reference_path = drift_reference_path(run_id)
+        save_reference(build_reference(df), reference_path)
+        mlflow.log_artifact(reference_path, "drift")
+    
+    def _compress_model(self, model, X_validation: np.ndarray, run_id: str) -> dict:
+        """Write the compact serving artifact and log the compression report"""
+        report = compress_model(model, X_validation, output_path=compact_artifact_path(run_id))
+        
+        mlflow.log_metric("compression_size_reduction", report["size_reduction"])
+        mlflow.log_metric("compression_agreement_rate", report["agreement_rate"])
+        mlflow.log_metric("compression_max_probability_delta", report["max_probability_delta"])
+        mlflow.log_param("compression_accepted", report["accepted"])
+        
+        print(
+            f"Compressed model: {report['original_bytes']} -> {report['compact_bytes']} bytes "
+            f"({report['size_reduction']:.1%} smaller), "
+            f"agreement {report['agreement_rate']:.4%}, "
+            f"{'accepted' if report['accepted'] else 'rejected'}"
+        )
+        return report
+    
     def _register_model_version(self, run_id: str, model_type: str, metrics: dict):
         """Register model version in database"""
         db = SessionLocal()
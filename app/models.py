@@ -1,5 +1,5 @@
 """SQLAlchemy database models"""
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, JSON, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, JSON, Text, Index, LargeBinary
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -8,14 +8,42 @@ class Prediction(Base):
     """Prediction records"""
     __tablename__ = "predictions"
     
-    id = Column(Integer, primary_key=True, index=True)
-    customer_id = Column(String, index=True)
+    # On PostgreSQL the table is range-partitioned by month on timestamp and
+    # the database primary key is (id, timestamp); see migration 003
+    id = Column(Integer, primary_key=True)
+    customer_id = Column(String)
     prediction = Column(Float)
     probability = Column(Float)
     model_version = Column(String)
-    features = Column(JSON)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    features = Column(JSON)  # Raw features, unless stored as a vector
+    feature_hash = Column(LargeBinary(16), nullable=True)  # FeatureVector.content_hash
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     is_churn = Column(Boolean, nullable=True)  # Ground truth (if available)
+    labeled_at = Column(DateTime(timezone=True), nullable=True)  # When is_churn was set
+    routed = Column(Boolean, nullable=True)  # Split at random between active and canary (not pinned or batch)
+    
+    # History pages are keyset-paginated on (timestamp, id); on PostgreSQL the
+    # indexes carry the returned columns except is_churn, which labelling
+    # changes later (see migration 007)
+    __table_args__ = (
+        Index("ix_predictions_labeled_at_id", "labeled_at", "id"),
+        Index("ix_predictions_model_version_timestamp_id", "model_version", "timestamp", "id",
+              postgresql_include=["customer_id", "prediction", "probability"]),
+        Index("ix_predictions_customer_id_timestamp_id", "customer_id", "timestamp", "id",
+              postgresql_include=["model_version", "prediction", "probability"]),
+        Index("ix_predictions_timestamp_id", "timestamp", "id",
+              postgresql_include=["customer_id", "model_version", "prediction", "probability"]),
+    )
+
+
+class FeatureVector(Base):
+    """Deduplicated float32 feature vectors referenced by predictions"""
+    __tablename__ = "feature_vectors"
+    
+    content_hash = Column(LargeBinary(16), primary_key=True)
+    codec_version = Column(String, nullable=False)
+    vector = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
 class ModelMetrics(Base):
@@ -44,3 +72,75 @@ class ModelVersion(Base):
     performance_metrics = Column(JSON)
 
 
+
+
+class ModelPerformance(Base):
+    """Running realized-performance counts per model version"""
+    __tablename__ = "model_performance"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    model_version = Column(String, unique=True, index=True)
+    true_positives = Column(Integer, default=0)
+    false_positives = Column(Integer, default=0)
+    true_negatives = Column(Integer, default=0)
+    false_negatives = Column(Integer, default=0)
+    squared_error_sum = Column(Float, default=0.0)
+    calibration_counts = Column(JSON)  # Rows per probability bin
+    calibration_probability_sums = Column(JSON)  # Sum of predicted probability per bin
+    calibration_positives = Column(JSON)  # Actual churners per bin
+    score_histogram_positive = Column(JSON)  # Score histogram of churners (for AUC)
+    score_histogram_negative = Column(JSON)  # Score histogram of non-churners (for AUC)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class MonitorWatermark(Base):
+    """Progress marker of incremental monitors over labelled predictions"""
+    __tablename__ = "monitor_watermarks"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True)
+    labeled_at = Column(DateTime(timezone=True), nullable=True)
+    prediction_id = Column(Integer, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class BatchJob(Base):
+    """Asynchronous batch scoring job and its progress"""
+    __tablename__ = "batch_jobs"
+    
+    id = Column(String(32), primary_key=True)
+    status = Column(String, nullable=False, default="queued")  # queued, running, succeeded, failed
+    source_path = Column(String, nullable=False)  # CSV or Parquet input
+    model_version = Column(String, nullable=True)  # Pinned version, or the active one per chunk
+    chunk_size = Column(Integer, nullable=False)
+    total_rows = Column(Integer, nullable=True)  # Known once a worker opened the input
+    processed_rows = Column(Integer, default=0)
+    rejected_rows = Column(Integer, default=0)
+    chunks_done = Column(Integer, default=0)  # Chunks with results written; the resume point
+    error = Column(Text, nullable=True)
+    worker_id = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        Index("ix_batch_jobs_status_created_at", "status", "created_at"),
+    )
+
+
+class CustomerScore(Base):
+    """Precomputed score of a customer under a model version, written by bulk scoring"""
+    __tablename__ = "customer_scores"
+    
+    model_version = Column(String, primary_key=True)
+    customer_id = Column(String, primary_key=True)
+    prediction = Column(Float, nullable=False)
+    probability = Column(Float, nullable=False)
+    feature_hash = Column(LargeBinary(16), nullable=False)  # Content hash of the features scored
+    scored_at = Column(DateTime(timezone=True), nullable=False)
+    
+    __table_args__ = (
+        # Top-K per version reads this index backwards instead of sorting the table
+        Index("ix_customer_scores_model_version_probability", "model_version", "probability"),
+    )
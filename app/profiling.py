@@ -0,0 +1,138 @@
+"""On-demand profiling of a live API worker"""
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_stacks(samples: Counter) -> str:
+    """Render stack samples in collapsed ("a;b;c 42") flame graph format"""
+    return "\n".join(f"{stack} {count}" for stack, count in samples.most_common())
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler for every thread of this process.
+    
+    A background thread snapshots ``sys._current_frames()`` every
+    ``interval`` seconds; nothing is hooked into the interpreter, so the
+    sampled threads only pay for the GIL hand-offs.
+    """
+    
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._lock = threading.Lock()
+    
+    def sample(self, seconds: float, interval: Optional[float] = None) -> Dict:
+        """Sample for ``seconds`` (blocking); returns collapsed stacks and counts"""
+        interval = interval or self.interval
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A sampling profile is already running in this worker")
+        try:
+            samples = Counter()
+            own_thread = threading.get_ident()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            deadline = time.perf_counter() + seconds
+            n_samples = 0
+            while time.perf_counter() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_label(frame))
+                        frame = frame.f_back
+                    stack.append(names.get(thread_id, str(thread_id)))
+                    samples[";".join(reversed(stack))] += 1
+                n_samples += 1
+                time.sleep(interval)
+            return {"samples": n_samples, "collapsed": collapse_stacks(samples)}
+        finally:
+            self._lock.release()
+
+
+class RequestProfiler:
+    """cProfile of the next K requests to one route template.
+    
+    When disarmed, ``begin`` is a single attribute check. Profiles cover
+    the event loop thread while a matching request is in flight, so work
+    interleaved from concurrent requests is included; only one request is
+    profiled at a time and overlapping matches are skipped.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.route: Optional[str] = None
+        self.remaining = 0
+        self.profiled = 0
+        self._active = False
+        self._stats: Optional[pstats.Stats] = None
+    
+    def arm(self, route: str, count: int):
+        with self._lock:
+            if self.remaining > 0:
+                raise RuntimeError(f"Already profiling requests to {self.route}")
+            self.route = route
+            self.remaining = count
+            self.profiled = 0
+            self._stats = None
+    
+    def begin(self, route: str) -> Optional[cProfile.Profile]:
+        """Start profiling this request if the profiler is armed for its route"""
+        if not self.remaining or route != self.route:
+            return None
+        with self._lock:
+            if self._active or self.remaining <= 0:
+                return None
+            self._active = True
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+    
+    def end(self, profile: cProfile.Profile):
+        profile.disable()
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self.remaining = max(self.remaining - 1, 0)
+            self.profiled += 1
+            self._active = False
+    
+    @property
+    def done(self) -> bool:
+        return self.remaining <= 0
+    
+    def collect(self) -> Optional[pstats.Stats]:
+        """Disarm and return the merged stats of the requests profiled so far"""
+        with self._lock:
+            self.remaining = 0
+            self.route = None
+            return self._stats
+
+
+def stats_to_bytes(stats: pstats.Stats) -> bytes:
+    """Serialize stats in the format written by ``pstats.Stats.dump_stats``"""
+    return marshal.dumps(stats.stats)
+
+
+def stats_to_text(stats: pstats.Stats, limit: int = 50) -> str:
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
+
+
+sampling_profiler = SamplingProfiler()
+request_profiler = RequestProfiler()
@@ -1,5 +1,5 @@
 """Pydantic schemas for request/response validation"""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -31,11 +31,57 @@ class CustomerFeatures(BaseModel):
 class PredictionRequest(BaseModel):
     """Request for single prediction"""
     customer: CustomerFeatures
+    model_version: Optional[str] = Field(None, description="Pin the request to this model version")
 
 
 class BatchPredictionRequest(BaseModel):
     """Request for batch predictions"""
     customers: List[CustomerFeatures]
+    model_version: Optional[str] = Field(None, description="Pin the request to this model version")
+
+
+class BatchJobRequest(BaseModel):
+    """Batch scoring job over inline customers or a CSV/Parquet file on the server"""
+    customers: Optional[List[CustomerFeatures]] = None
+    path: Optional[str] = Field(None, description="Input file, relative to BATCH_JOB_INPUT_ROOT")
+    model_version: Optional[str] = Field(None, description="Pin the job to this model version")
+    chunk_size: Optional[int] = Field(None, ge=1, le=100000)
+    
+    @model_validator(mode="after")
+    def check_source(self):
+        if (self.customers is None) == (self.path is None):
+            raise ValueError("Provide exactly one of customers or path")
+        return self
+
+
+class BatchJobResponse(BaseModel):
+    """Batch scoring job state and progress"""
+    id: str
+    status: str
+    model_version: Optional[str] = None
+    chunk_size: int
+    total_rows: Optional[int] = None
+    processed_rows: int
+    rejected_rows: int
+    chunks_done: int
+    progress: float
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class CustomerIdPredictionRequest(BaseModel):
+    """Prediction request for customers whose features are in the online feature store"""
+    customer_ids: List[str] = Field(..., min_length=1)
+    model_version: Optional[str] = Field(None, description="Pin the request to this model version")
+
+
+class Explanation(BaseModel):
+    """Per-feature contributions to one prediction; base_value plus their sum is the model output"""
+    output: str = Field(..., description="probability (random forest) or log_odds (gradient boosting)")
+    base_value: float
+    contributions: Dict[str, float]
 
 
 class PredictionResponse(BaseModel):
@@ -45,6 +91,7 @@ class PredictionResponse(BaseModel):
     probability: float = Field(..., ge=0, le=1)
     model_version: str
     timestamp: datetime
+    explanation: Optional[Explanation] = None
 
 
 class BatchPredictionResponse(BaseModel):
@@ -54,6 +101,45 @@ class BatchPredictionResponse(BaseModel):
     model_version: str
 
 
+class CustomerIdPredictionResponse(BaseModel):
+    """Predictions for customer ids, plus the ids the feature store does not know"""
+    predictions: List[PredictionResponse]
+    total: int
+    model_version: str
+    missing_customer_ids: List[str]
+
+
+class StoredScore(BaseModel):
+    """Precomputed score of one customer"""
+    customer_id: str
+    prediction: float
+    probability: float
+    scored_at: datetime
+
+
+class TopScoresResponse(BaseModel):
+    """Highest-risk customers of a model version from the precomputed scores"""
+    model_version: str
+    customers: List[StoredScore]
+
+
+class PredictionRecord(BaseModel):
+    """A served prediction"""
+    id: int
+    customer_id: Optional[str]
+    model_version: Optional[str]
+    prediction: float
+    probability: float
+    timestamp: datetime
+    is_churn: Optional[bool] = None
+
+
+class PredictionHistoryResponse(BaseModel):
+    """One page of prediction history, newest first"""
+    predictions: List[PredictionRecord]
+    next_cursor: Optional[str] = None
+
+
 class ModelInfo(BaseModel):
     """Model information"""
     version: str
@@ -64,10 +150,89 @@ class ModelInfo(BaseModel):
     performance_metrics: Optional[Dict[str, Any]] = None
 
 
+class PooledModelInfo(BaseModel):
+    """A model version resident in the worker's model pool"""
+    version: str
+    run_id: Optional[str] = None
+    memory_bytes: int
+    loaded_at: datetime
+    last_used: datetime
+    hits: int
+
+
+class ModelPoolResponse(BaseModel):
+    """Model pool contents of the worker"""
+    models: List[PooledModelInfo]
+    total_memory_bytes: int
+    max_memory_bytes: int
+
+
 class MetricsResponse(BaseModel):
     """Metrics response"""
     model_version: str
     metrics: Dict[str, float]
+    realized_metrics: Optional[Dict[str, float]] = None
+    timestamp: datetime
+
+
+class LabelIngestionResponse(BaseModel):
+    """Label ingestion report"""
+    labels_received: int
+    labels_staged: int
+    labels_rejected: int
+    labels_matched: int
+    match_rate: float
+    predictions_updated: int
+    duration_seconds: float
+    labels_per_second: float
+
+
+class FeatureDrift(BaseModel):
+    """Drift scores of one feature"""
+    psi: float
+    ks: Optional[float] = None
+
+
+class DriftResponse(BaseModel):
+    """Live feature drift of one model version"""
+    model_version: str
+    sample_count: float
+    reference_samples: int
+    features: Dict[str, FeatureDrift]
+    timestamp: datetime
+
+
+class CanaryVersionStats(BaseModel):
+    """Serving aggregates of one model version in the canary analysis"""
+    predictions: int
+    mean_score: Optional[float] = None
+    latency_p50: Optional[float] = None
+    latency_p95: Optional[float] = None
+    latency_p99: Optional[float] = None
+    labelled: int
+    brier_score: Optional[float] = None
+    error_rate: Optional[float] = None
+
+
+class CanaryTest(BaseModel):
+    """Sequential test of the canary's Brier loss minus the active model's"""
+    loss_difference: float
+    p_value: float
+    lower: float
+    upper: float
+    alpha: float
+
+
+class CanaryAnalysisResponse(BaseModel):
+    """Live canary comparison and promote/rollback recommendation"""
+    active_version: Optional[str] = None
+    canary_version: Optional[str] = None
+    recommendation: str  # promote, rollback, continue, none
+    reason: str
+    versions: Dict[str, CanaryVersionStats]
+    score_psi: Optional[float] = None
+    test: Optional[CanaryTest] = None
+    action: Optional[str] = None  # promoted or rolled_back when acted on automatically
     timestamp: datetime
 
 
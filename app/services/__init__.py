@@ -1,7 +1,9 @@
 """Business logic services"""
 from app.services.prediction_service import PredictionService
 from app.services.metrics_service import MetricsService
+from app.services.performance_monitor import PerformanceMonitor
+from app.services.label_service import LabelIngestionService
 
-__all__ = ["PredictionService", "MetricsService"]
+__all__ = ["PredictionService", "MetricsService", "PerformanceMonitor", "LabelIngestionService"]
 
 
@@ -0,0 +1,303 @@
+"""Asynchronous batch scoring jobs, processed in chunks by background workers"""
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Iterator, List, Optional
+import pandas as pd
+from pydantic import ValidationError
+from sqlalchemy import and_, func, or_, select, update
+from app.admission import admission_controller, DeadlineExceeded, Overloaded
+from app.config import settings
+from app.database import async_session
+from app.models import BatchJob
+from app.schemas import CustomerFeatures
+
+RESULT_COLUMNS = ["customer_id", "prediction", "probability", "model_version"]
+
+
+def job_directory(job_id: str) -> str:
+    return os.path.join(settings.batch_jobs_path, job_id)
+
+
+def result_path(job_id: str, chunk: int) -> str:
+    return os.path.join(job_directory(job_id), f"results-{chunk:06d}.parquet")
+
+
+def resolve_input_path(path: str) -> str:
+    """Absolute path of a job input file; only files under ``batch_job_input_root`` are readable"""
+    root = os.path.realpath(settings.batch_job_input_root)
+    resolved = os.path.realpath(path if os.path.isabs(path) else os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"Job input must be under {settings.batch_job_input_root}")
+    if not resolved.endswith((".csv", ".parquet")):
+        raise ValueError("Job input must be a .csv or .parquet file")
+    if not os.path.isfile(resolved):
+        raise ValueError(f"Job input {path} not found")
+    return resolved
+
+
+def count_rows(path: str) -> int:
+    """Rows of a job input, from the Parquet footer or by counting CSV lines"""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    with open(path, "rb") as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+def read_chunks(path: str, chunk_size: int, skip_chunks: int = 0) -> Iterator[pd.DataFrame]:
+    """Chunks of a job input, starting after the ``skip_chunks`` already scored.
+    
+    Customer ids are read as strings, so numeric ids are not rejected as ints.
+    """
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size)
+        for i, batch in enumerate(batches):
+            if i < skip_chunks:
+                continue
+            table = pa.Table.from_batches([batch])
+            column = table.schema.get_field_index("customer_id")
+            if column >= 0 and not pa.types.is_string(table.schema.field(column).type):
+                table = table.set_column(column, "customer_id", table.column(column).cast(pa.string()))
+            yield table.to_pandas()
+    else:
+        skip = range(1, skip_chunks * chunk_size + 1) if skip_chunks else None
+        yield from pd.read_csv(path, chunksize=chunk_size, skiprows=skip, dtype={"customer_id": str})
+
+
+def job_to_dict(job: BatchJob) -> Dict[str, Any]:
+    progress = job.processed_rows + job.rejected_rows
+    return {
+        "id": job.id,
+        "status": job.status,
+        "model_version": job.model_version,
+        "chunk_size": job.chunk_size,
+        "total_rows": job.total_rows,
+        "processed_rows": job.processed_rows or 0,
+        "rejected_rows": job.rejected_rows or 0,
+        "chunks_done": job.chunks_done or 0,
+        "progress": min(progress / job.total_rows, 1.0) if job.total_rows else (
+            1.0 if job.status == "succeeded" else 0.0
+        ),
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at
+    }
+
+
+class BatchJobService:
+    """Submission, status and results of batch scoring jobs"""
+    
+    async def submit(self, customers: Optional[List[CustomerFeatures]] = None, path: Optional[str] = None,
+                     model_version: Optional[str] = None, chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """Record a job for inline customers or an input file; workers pick it up from the table"""
+        job_id = uuid.uuid4().hex
+        loop = asyncio.get_running_loop()
+        if customers is not None:
+            source_path = os.path.join(job_directory(job_id), "input.parquet")
+            await loop.run_in_executor(None, self._write_input, customers, source_path)
+        else:
+            source_path = resolve_input_path(path)
+        
+        job = BatchJob(
+            id=job_id,
+            status="queued",
+            source_path=source_path,
+            model_version=model_version,
+            chunk_size=chunk_size or settings.batch_job_chunk_size,
+            total_rows=len(customers) if customers is not None else None,
+            processed_rows=0,
+            rejected_rows=0,
+            chunks_done=0,
+            created_at=datetime.now(timezone.utc)
+        )
+        async with async_session("write") as db:
+            db.add(job)
+            await db.commit()
+            return job_to_dict(job)
+    
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        async with async_session("read") as db:
+            job = await db.get(BatchJob, job_id)
+            return job_to_dict(job) if job is not None else None
+    
+    async def resume(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Queue a failed job again; it continues after its last completed chunk"""
+        async with async_session("write") as db:
+            job = await db.get(BatchJob, job_id, with_for_update=True)
+            if job is None:
+                return None
+            if job.status != "failed":
+                raise ValueError(f"Only failed jobs can be resumed; job {job_id} is {job.status}")
+            job.status, job.error, job.finished_at, job.worker_id = "queued", None, None, None
+            await db.commit()
+            return job_to_dict(job)
+    
+    def iter_results_csv(self, job: Dict[str, Any]) -> Iterator[bytes]:
+        """Completed result chunks as one CSV stream, a chunk at a time"""
+        yield (",".join(RESULT_COLUMNS) + "\n").encode()
+        for chunk in range(job["chunks_done"]):
+            path = result_path(job["id"], chunk)
+            if os.path.exists(path):
+                yield pd.read_parquet(path).to_csv(header=False, index=False).encode()
+    
+    @staticmethod
+    def _write_input(customers: List[CustomerFeatures], path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pd.DataFrame([customer.model_dump() for customer in customers]).to_parquet(path, index=False)
+
+
+class BatchJobWorker:
+    """Claims queued jobs, or running ones whose worker stopped heartbeating, and scores them.
+    
+    Results are written one Parquet file per chunk before the chunk counts
+    as done, so a job interrupted by a restart resumes at its first missing
+    chunk; that chunk's predictions may then be logged twice.
+    """
+    
+    def __init__(self, prediction_service=None, worker_id: Optional[str] = None):
+        self.prediction_service = prediction_service
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    
+    async def run_forever(self):
+        while True:
+            try:
+                job_id = await self.run_once()
+            except Exception as e:
+                print(f"Batch job worker failed: {e}")
+                job_id = None
+            if job_id is None:
+                await asyncio.sleep(settings.batch_job_poll_seconds)
+    
+    async def run_once(self) -> Optional[str]:
+        """Claim and process one job; returns its id, or None when there was nothing to do"""
+        job = await self.claim()
+        if job is None:
+            return None
+        await self.process(job)
+        return job["id"]
+    
+    async def claim(self) -> Optional[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        claimable = or_(
+            BatchJob.status == "queued",
+            and_(BatchJob.status == "running",
+                 BatchJob.heartbeat_at < now - timedelta(seconds=settings.batch_job_stale_seconds))
+        )
+        async with async_session("write") as db:
+            candidates = (await db.execute(
+                select(BatchJob.id).where(claimable).order_by(BatchJob.created_at).limit(10)
+            )).scalars().all()
+            for job_id in candidates:
+                # Conditional update: of several workers racing for a job, one wins
+                result = await db.execute(
+                    update(BatchJob)
+                    .where(BatchJob.id == job_id, claimable)
+                    .values(status="running", worker_id=self.worker_id, heartbeat_at=now,
+                            started_at=func.coalesce(BatchJob.started_at, now))
+                )
+                await db.commit()
+                if result.rowcount == 1:
+                    job = await db.get(BatchJob, job_id, populate_existing=True)
+                    return dict(job_to_dict(job), source_path=job.source_path)
+        return None
+    
+    async def process(self, job: Dict[str, Any]):
+        from app.services.prediction_service import PredictionService
+        
+        loop = asyncio.get_running_loop()
+        try:
+            service = self.prediction_service or await PredictionService.create()
+            if job["total_rows"] is None:
+                total_rows = await loop.run_in_executor(None, count_rows, job["source_path"])
+                if not await self._update(job["id"], total_rows=total_rows):
+                    return
+            
+            chunks = read_chunks(job["source_path"], job["chunk_size"], job["chunks_done"])
+            chunk_index = job["chunks_done"]
+            while True:
+                chunk = await loop.run_in_executor(None, next, chunks, None)
+                if chunk is None:
+                    break
+                customers, rejected, error = self._validate(chunk, chunk_index * job["chunk_size"])
+                if error is not None:
+                    if not customers:
+                        raise ValueError(f"All {rejected} rows of chunk {chunk_index} are invalid, e.g. {error}")
+                    print(f"Batch job {job['id']} chunk {chunk_index}: {rejected} invalid rows, e.g. {error}")
+                results = await self._score(service, customers, job["model_version"])
+                await loop.run_in_executor(None, self._write_results, job["id"], chunk_index, results)
+                chunk_index += 1
+                if not await self._update(
+                    job["id"],
+                    chunks_done=chunk_index,
+                    processed_rows=BatchJob.processed_rows + len(customers),
+                    rejected_rows=BatchJob.rejected_rows + rejected
+                ):
+                    return
+            await self._update(job["id"], status="succeeded", finished_at=datetime.now(timezone.utc))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Batch job {job['id']} failed: {e}")
+            await self._update(job["id"], status="failed", error=str(e), finished_at=datetime.now(timezone.utc))
+    
+    async def _score(self, service, customers: List[CustomerFeatures], model_version: Optional[str]) -> pd.DataFrame:
+        """Score one chunk in the batch admission lane, waiting while it is overloaded"""
+        if not customers:
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+        while True:
+            try:
+                async with admission_controller.admit("batch", len(customers)):
+                    result = await service.predict_batch_compact(customers, model_version)
+                break
+            except Overloaded as e:
+                await asyncio.sleep(max(e.retry_after, settings.batch_job_poll_seconds))
+            except DeadlineExceeded:
+                await asyncio.sleep(settings.batch_job_poll_seconds)
+        return pd.DataFrame({
+            "customer_id": result["customer_ids"],
+            "prediction": result["predictions"],
+            "probability": result["probabilities"],
+            "model_version": result["model_version"]
+        })
+    
+    @staticmethod
+    def _validate(chunk: pd.DataFrame, first_row: int = 0) -> tuple:
+        """Chunk rows as CustomerFeatures, how many rows were invalid, and why the first one was"""
+        customers = []
+        rejected = 0
+        error = None
+        for i, record in enumerate(chunk.to_dict("records")):
+            try:
+                customers.append(CustomerFeatures(**record))
+            except (ValidationError, TypeError) as e:
+                rejected += 1
+                if error is None:
+                    reasons = e.errors() if isinstance(e, ValidationError) else []
+                    error = f"row {first_row + i + 1}: " + ("; ".join(
+                        f"{'.'.join(map(str, reason['loc']))}: {reason['msg']}" for reason in reasons[:3]
+                    ) or str(e))
+        return customers, rejected, error
+    
+    @staticmethod
+    def _write_results(job_id: str, chunk: int, results: pd.DataFrame):
+        path = result_path(job_id, chunk)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        results.to_parquet(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+    
+    async def _update(self, job_id: str, **values) -> bool:
+        """Update a job this worker still owns, refreshing its heartbeat"""
+        async with async_session("write") as db:
+            result = await db.execute(
+                update(BatchJob)
+                .where(BatchJob.id == job_id, BatchJob.worker_id == self.worker_id)
+                .values(heartbeat_at=datetime.now(timezone.utc), **values)
+            )
+            await db.commit()
+        return result.rowcount == 1
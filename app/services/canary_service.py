@@ -0,0 +1,131 @@
+"""Canary analysis, promotion and rollback"""
+from typing import Dict, Any, Optional, Tuple
+from sqlalchemy import select, update, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.config import settings
+from app.database import async_session, get_async_engine
+from app.models import ModelVersion
+from app.ml.canary import canary_analyzer
+
+# Arbitrary application-wide key of the session-level lock held by the acting worker
+LEADER_LOCK_KEY = 7312046
+
+
+class CanaryService:
+    """Applies the live canary analysis to the model registry"""
+    
+    def __init__(self):
+        self._leader: Optional[AsyncConnection] = None
+    
+    async def deployed_versions(self) -> Tuple[Optional[str], Optional[str]]:
+        """Versions currently registered as active and canary"""
+        async with async_session("read") as db:
+            active = await db.scalar(
+                select(ModelVersion.version).where(ModelVersion.status == "active").limit(1)
+            )
+            canary = await db.scalar(
+                select(ModelVersion.version).where(ModelVersion.status == "canary").limit(1)
+            )
+        return active, canary
+    
+    async def analyze(self) -> Dict[str, Any]:
+        """Recommendation for the deployed canary from this worker's aggregates"""
+        active, canary = await self.deployed_versions()
+        return canary_analyzer.analyze(active, canary)
+    
+    async def run(self) -> Dict[str, Any]:
+        """Analyze, and promote or roll back the canary when ``canary_auto_action`` is on"""
+        report = await self.analyze()
+        report["action"] = None
+        if settings.canary_auto_action and await self.lead():
+            if report["recommendation"] == "promote" and await self.promote(report["canary_version"]):
+                report["action"] = "promoted"
+            elif report["recommendation"] == "rollback" and await self.rollback(report["canary_version"]):
+                report["action"] = "rolled_back"
+        return report
+    
+    async def lead(self) -> bool:
+        """Whether this worker is the one that acts on its recommendations.
+        
+        Each worker runs its own sequential test, so if every worker acted,
+        N workers would make about N times the false promotions and
+        rollbacks ``canary_alpha`` allows. Only the worker holding a
+        session-level advisory lock acts; it keeps the lock on a connection
+        of its own until it stops or that connection drops. SQLite serves a
+        single worker, which always leads.
+        """
+        async_engine = get_async_engine("write")
+        if async_engine.dialect.name != "postgresql":
+            return True
+        if self._leader is not None:
+            try:
+                await self._leader.execute(text("SELECT 1"))
+                await self._leader.commit()
+                return True
+            except Exception:
+                await self.resign()
+        
+        connection = await async_engine.connect()
+        try:
+            acquired = await connection.scalar(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": LEADER_LOCK_KEY}
+            )
+            await connection.commit()
+        except Exception:
+            await connection.close()
+            raise
+        if not acquired:
+            await connection.close()
+            return False
+        self._leader = connection
+        return True
+    
+    async def resign(self):
+        """Release the leader lock, if held, before the connection goes back to the pool"""
+        if self._leader is None:
+            return
+        connection, self._leader = self._leader, None
+        try:
+            await connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": LEADER_LOCK_KEY})
+            await connection.commit()
+        except Exception:
+            # A broken connection has lost the lock with its session; never reuse it
+            await connection.invalidate()
+        await connection.close()
+    
+    async def promote(self, model_version: str) -> bool:
+        """Make the canary the active version; False when it is no longer the canary.
+        
+        The status change is conditional, so of several workers acting on
+        the same recommendation only the first one promotes.
+        """
+        async with async_session("write") as db:
+            result = await db.execute(
+                update(ModelVersion)
+                .where(ModelVersion.version == model_version, ModelVersion.status == "canary")
+                .values(status="active", traffic_percent=100)
+            )
+            if result.rowcount != 1:
+                await db.rollback()
+                return False
+            await db.execute(
+                update(ModelVersion)
+                .where(ModelVersion.status.in_(["active", "canary"]), ModelVersion.version != model_version)
+                .values(status="deprecated")
+            )
+            await db.commit()
+        print(f"Canary model {model_version} promoted to active")
+        return True
+    
+    async def rollback(self, model_version: str) -> bool:
+        """Take the canary out of rotation; False when it is no longer the canary"""
+        async with async_session("write") as db:
+            result = await db.execute(
+                update(ModelVersion)
+                .where(ModelVersion.version == model_version, ModelVersion.status == "canary")
+                .values(status="deprecated", traffic_percent=0)
+            )
+            await db.commit()
+        if result.rowcount == 1:
+            print(f"Canary model {model_version} rolled back")
+        return result.rowcount == 1
@@ -0,0 +1,132 @@
+"""Compact, deduplicated storage of logged prediction features"""
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Iterable
+from sqlalchemy import delete, exists, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from app.config import settings
+from app.ml.feature_codec import FeatureVectorCodec, get_codec
+from app.models import FeatureVector, Prediction
+
+# Hashes known to be stored already (and when that was confirmed), to skip
+# redundant inserts
+_KNOWN_HASHES: "OrderedDict[bytes, float]" = OrderedDict()
+_KNOWN_HASHES_LIMIT = 65536
+
+
+def _remember(digest: bytes):
+    _KNOWN_HASHES[digest] = time.monotonic()
+    _KNOWN_HASHES.move_to_end(digest)
+    if len(_KNOWN_HASHES) > _KNOWN_HASHES_LIMIT:
+        _KNOWN_HASHES.popitem(last=False)
+
+
+def _is_known(digest: bytes) -> bool:
+    """Whether ``digest`` was confirmed stored within ``feature_vector_cache_seconds``.
+
+    Confirmations expire so a vector removed by ``delete_orphan_vectors``
+    is written again: a prediction committed within the TTL still references
+    it, and retention never drops partitions that recent.
+    """
+    confirmed = _KNOWN_HASHES.get(digest)
+    return confirmed is not None and time.monotonic() - confirmed < settings.feature_vector_cache_seconds
+
+
+class FeatureLog:
+    """Turns raw feature dicts into the columns stored on a prediction.
+
+    With ``prediction_feature_storage = "vector"`` features are stored once
+    per distinct payload in ``feature_vectors`` (float32 bytes keyed by a
+    content hash) and predictions only reference the hash. Payloads the codec
+    cannot represent, e.g. unknown categories, fall back to JSON.
+    """
+
+    def __init__(self, mode: str = None):
+        self.mode = mode or settings.prediction_feature_storage
+        self.codec = FeatureVectorCodec()
+
+    def columns(self, db, features: Dict[str, Any]) -> Dict[str, Any]:
+        """Column values for one prediction row"""
+        return self.columns_batch(db, [features])[0]
+
+    def columns_batch(self, db, features: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Column values for several prediction rows, storing new vectors in ``db``"""
+        if self.mode != "vector":
+            return [{"features": f} for f in features]
+
+        columns = []
+        new_vectors = {}
+        for f in features:
+            if not self.codec.can_encode(f):
+                columns.append({"features": f})
+                continue
+            payload = self.codec.to_bytes(self.codec.encode(f))
+            digest = self.codec.content_hash(payload)
+            if not _is_known(digest):
+                new_vectors[digest] = payload
+            columns.append({"features": None, "feature_hash": digest})
+
+        if new_vectors:
+            self._insert_vectors(db, new_vectors)
+        return columns
+
+    def after_commit(self, columns: Iterable[Dict[str, Any]]):
+        """Cache hashes once the transaction storing them has committed"""
+        for c in columns:
+            if c.get("feature_hash") is not None:
+                _remember(c["feature_hash"])
+
+    def _insert_vectors(self, db, vectors: Dict[bytes, bytes]):
+        rows = [
+            {"content_hash": digest, "codec_version": self.codec.version, "vector": payload}
+            for digest, payload in vectors.items()
+        ]
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            stmt = postgresql.insert(FeatureVector).on_conflict_do_nothing(index_elements=["content_hash"])
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(FeatureVector).on_conflict_do_nothing(index_elements=["content_hash"])
+        else:
+            existing = {
+                row.content_hash for row in db.query(FeatureVector.content_hash).filter(
+                    FeatureVector.content_hash.in_(list(vectors))
+                )
+            }
+            rows = [row for row in rows if row["content_hash"] not in existing]
+            stmt = insert(FeatureVector)
+        if rows:
+            db.execute(stmt, rows)
+
+
+def delete_orphan_vectors(conn) -> int:
+    """Delete stored vectors that no prediction references any more, e.g. after retention"""
+    vectors = FeatureVector.__table__
+    predictions = Prediction.__table__
+    stmt = delete(vectors).where(~exists().where(predictions.c.feature_hash == vectors.c.content_hash))
+    return conn.execute(stmt).rowcount
+
+
+def load_features(db, hashes: Iterable[bytes]) -> Dict[bytes, Dict[str, Any]]:
+    """Decode stored feature vectors by content hash"""
+    hashes = list({h for h in hashes if h is not None})
+    if not hashes:
+        return {}
+    decoded = {}
+    for row in db.query(FeatureVector).filter(FeatureVector.content_hash.in_(hashes)):
+        codec = get_codec(row.codec_version)
+        decoded[row.content_hash] = codec.decode(codec.from_bytes(row.vector))
+    return decoded
+
+
+def read_prediction_features(db, predictions: List[Prediction]) -> List[Dict[str, Any]]:
+    """Readable features of logged predictions, whichever way they were stored"""
+    vectors = load_features(db, (p.feature_hash for p in predictions))
+    features = []
+    for p in predictions:
+        if p.features is not None:
+            features.append(p.features)
+        elif p.feature_hash in vectors:
+            features.append({"customer_id": p.customer_id, **vectors[p.feature_hash]})
+        else:
+            features.append(None)
+    return features
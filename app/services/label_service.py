@@ -0,0 +1,225 @@
+"""Bulk ground-truth label ingestion"""
+import io
+import os
+import time
+from typing import Dict, Any, Iterator, Optional
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+from sqlalchemy import (
+    MetaData, Table, Column, Index, String, DateTime, Boolean,
+    select, update, exists, and_, func, text
+)
+from app.config import settings
+from app.database import engine
+from app.models import Prediction
+
+TRUE_VALUES = {"1", "true", "t", "yes", "y"}
+FALSE_VALUES = {"0", "false", "f", "no", "n"}
+# Held shared by label-applying transactions until they commit; the
+# performance monitor takes it exclusively before reading new labels
+LABEL_COMMIT_LOCK_KEY = 7312027
+
+# Session-local staging table, kept out of Base.metadata so it is never
+# created by create_all or Alembic
+staging_metadata = MetaData()
+label_staging = Table(
+    "label_staging",
+    staging_metadata,
+    Column("customer_id", String, nullable=False),
+    Column("label_timestamp", DateTime(timezone=True), nullable=False),
+    Column("window_start", DateTime(timezone=True), nullable=False),
+    Column("label", Boolean, nullable=False),
+    prefixes=["TEMPORARY"]
+)
+Index("ix_label_staging_customer", label_staging.c.customer_id, label_staging.c.label_timestamp)
+
+
+class LabelIngestionService:
+    """Applies label files to predictions with set-based updates.
+
+    Labels are streamed into a temporary staging table and joined to
+    ``predictions`` in a single UPDATE. A label for ``customer_id`` at time T
+    applies to that customer's predictions made within
+    ``label_match_window_days`` before T; when several labels qualify the
+    earliest one wins. Only unlabelled predictions are updated, which makes
+    re-running an import a no-op.
+    """
+
+    def __init__(self, customer_id_column: str = "customer_id",
+                 timestamp_column: str = "timestamp", label_column: str = "label",
+                 chunk_size: Optional[int] = None):
+        self.customer_id_column = customer_id_column
+        self.timestamp_column = timestamp_column
+        self.label_column = label_column
+        self.chunk_size = chunk_size or settings.label_ingestion_chunk_size
+        self.match_window = timedelta(days=settings.label_match_window_days)
+
+    def ingest_file(self, path: str, file_format: Optional[str] = None) -> Dict[str, Any]:
+        """Ingest a CSV or Parquet label file"""
+        file_format = file_format or os.path.splitext(path)[1].lstrip(".").lower()
+        if file_format == "csv":
+            chunks = pd.read_csv(
+                path,
+                usecols=[self.customer_id_column, self.timestamp_column, self.label_column],
+                dtype={self.customer_id_column: str, self.label_column: str},
+                chunksize=self.chunk_size
+            )
+        elif file_format in ("parquet", "pq"):
+            chunks = self._read_parquet(path)
+        else:
+            raise ValueError(f"Unsupported label file format: {file_format}")
+        return self.ingest_chunks(chunks)
+
+    def ingest_chunks(self, chunks: Iterator[pd.DataFrame]) -> Dict[str, Any]:
+        """Stage label chunks and apply them in one transaction"""
+        start_time = time.perf_counter()
+        received = 0
+        staged = 0
+
+        with engine.begin() as conn:
+            # Drop first in case a failed import left the table on a pooled connection
+            staging_metadata.drop_all(conn)
+            staging_metadata.create_all(conn)
+
+            for chunk in chunks:
+                received += len(chunk)
+                records = self._prepare_chunk(chunk)
+                staged += len(records)
+                if len(records):
+                    self._stage(conn, records)
+
+            matched = conn.execute(self._matched_labels_query()).scalar() or 0
+            window_start, window_end = conn.execute(
+                select(func.min(label_staging.c.window_start), func.max(label_staging.c.label_timestamp))
+            ).one()
+            updated = 0
+            if window_start is not None:
+                if conn.dialect.name == "postgresql":
+                    conn.execute(text("SELECT pg_advisory_xact_lock_shared(:key)"), {"key": LABEL_COMMIT_LOCK_KEY})
+                statement = self._apply_labels_statement(window_start, window_end, conn.dialect.name)
+                updated = conn.execute(statement).rowcount
+            staging_metadata.drop_all(conn)
+
+        duration = time.perf_counter() - start_time
+        return {
+            "labels_received": received,
+            "labels_staged": staged,
+            "labels_rejected": received - staged,
+            "labels_matched": matched,
+            "match_rate": matched / staged if staged else 0.0,
+            "predictions_updated": updated,
+            "duration_seconds": duration,
+            "labels_per_second": received / duration if duration > 0 else 0.0
+        }
+
+    def _read_parquet(self, path: str) -> Iterator[pd.DataFrame]:
+        """Stream a Parquet file in record batches"""
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        columns = [self.customer_id_column, self.timestamp_column, self.label_column]
+        for batch in parquet_file.iter_batches(batch_size=self.chunk_size, columns=columns):
+            yield batch.to_pandas()
+
+    def _prepare_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Normalize one chunk into staging rows, dropping invalid labels"""
+        labels = chunk[self.label_column].astype(str).str.strip().str.lower()
+        label = pd.Series(pd.NA, index=chunk.index, dtype="boolean")
+        label[labels.isin(TRUE_VALUES)] = True
+        label[labels.isin(FALSE_VALUES)] = False
+
+        records = pd.DataFrame({
+            "customer_id": chunk[self.customer_id_column].astype(str),
+            "label_timestamp": pd.to_datetime(chunk[self.timestamp_column], utc=True, errors="coerce"),
+            "label": label
+        }).dropna()
+        records = records.drop_duplicates(subset=["customer_id", "label_timestamp"], keep="last")
+        records["window_start"] = records["label_timestamp"] - self.match_window
+        records["label"] = records["label"].astype(bool)
+        return records[["customer_id", "label_timestamp", "window_start", "label"]]
+
+    def _stage(self, conn, records: pd.DataFrame):
+        """Bulk load staging rows, using COPY on PostgreSQL"""
+        if conn.dialect.name == "postgresql":
+            buffer = io.StringIO()
+            records.to_csv(buffer, index=False, header=False, date_format="%Y-%m-%d %H:%M:%S.%f%z")
+            buffer.seek(0)
+            cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                cursor.copy_expert(
+                    "COPY label_staging (customer_id, label_timestamp, window_start, label) "
+                    "FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+            finally:
+                cursor.close()
+        else:
+            rows = [
+                {
+                    "customer_id": row.customer_id,
+                    "label_timestamp": row.label_timestamp.to_pydatetime(),
+                    "window_start": row.window_start.to_pydatetime(),
+                    "label": bool(row.label)
+                }
+                for row in records.itertuples(index=False)
+            ]
+            conn.execute(label_staging.insert(), rows)
+
+    def _match_condition(self, staging):
+        predictions = Prediction.__table__
+        return and_(
+            predictions.c.customer_id == staging.c.customer_id,
+            predictions.c.timestamp >= staging.c.window_start,
+            predictions.c.timestamp <= staging.c.label_timestamp
+        )
+
+    def _matched_labels_query(self):
+        """Count staged labels that match at least one prediction"""
+        return select(func.count()).select_from(label_staging).where(
+            exists().where(self._match_condition(label_staging))
+        )
+
+    def _apply_labels_statement(self, window_start: datetime, window_end: datetime, dialect: str):
+        """Set-based ``UPDATE ... FROM`` of unlabelled predictions, driven by the staging table.
+
+        Both the join and the updated rows are bounded by the staged labels'
+        overall time window, so only the partitions it covers are scanned and
+        the (customer_id, timestamp) index drives the join.
+
+        On PostgreSQL ``labeled_at`` is the database clock once the commit
+        lock is held, so the monitor never finds a row committed behind its
+        watermark.
+        """
+        predictions = Prediction.__table__
+        staging = label_staging.alias("s")
+        in_window = predictions.c.timestamp.between(window_start, window_end)
+
+        # Earliest qualifying label per prediction
+        ranked = (
+            select(
+                predictions.c.id,
+                predictions.c.timestamp,
+                staging.c.label,
+                func.row_number().over(
+                    partition_by=(predictions.c.id, predictions.c.timestamp),
+                    order_by=staging.c.label_timestamp
+                ).label("label_rank")
+            )
+            .select_from(staging.join(predictions, self._match_condition(staging)))
+            .where(predictions.c.is_churn.is_(None), in_window)
+            .subquery("ranked")
+        )
+        earliest = select(ranked.c.id, ranked.c.timestamp, ranked.c.label).where(ranked.c.label_rank == 1).subquery("m")
+        return (
+            update(predictions)
+            .where(
+                predictions.c.id == earliest.c.id,
+                predictions.c.timestamp == earliest.c.timestamp,
+                predictions.c.is_churn.is_(None),
+                in_window
+            )
+            .values(
+                is_churn=earliest.c.label,
+                labeled_at=func.clock_timestamp() if dialect == "postgresql" else datetime.now(timezone.utc)
+            )
+        )
@@ -1,47 +1,50 @@
 """Service for retrieving model metrics"""
 from typing import Dict, Any, List
 from datetime import datetime
-from app.database import SessionLocal
-from app.models import ModelMetrics, ModelVersion
+from sqlalchemy import select
+from app.database import async_session
+from app.models import ModelMetrics, ModelVersion, ModelPerformance
 from app.schemas import MetricsResponse
+from app.services.performance_monitor import realized_metrics
 
 
 class MetricsService:
-    """Service for model metrics"""
+    """Service for model metrics, served from the read-only connection pool"""
     
-    def get_latest_metrics(self, model_version: str = None) -> MetricsResponse:
+    async def get_latest_metrics(self, model_version: str = None) -> MetricsResponse:
         """Get latest metrics for a model version"""
-        db = SessionLocal()
-        try:
+        async with async_session("read") as db:
             if model_version is None:
                 # Get latest active model
-                model = db.query(ModelVersion).filter(
-                    ModelVersion.status == "active"
-                ).first()
-                if not model:
+                model_version = await db.scalar(
+                    select(ModelVersion.version).where(ModelVersion.status == "active").limit(1)
+                )
+                if not model_version:
                     raise ValueError("No active model found")
-                model_version = model.version
             
             # Get metrics
-            metrics_records = db.query(ModelMetrics).filter(
-                ModelMetrics.model_version == model_version
-            ).all()
+            metrics_records = await db.scalars(
+                select(ModelMetrics).where(ModelMetrics.model_version == model_version)
+            )
             
             metrics = {m.metric_name: m.metric_value for m in metrics_records}
             
+            # Realized metrics are kept up to date by the performance monitor
+            performance = await db.scalar(
+                select(ModelPerformance).where(ModelPerformance.model_version == model_version).limit(1)
+            )
+            
             return MetricsResponse(
                 model_version=model_version,
                 metrics=metrics,
+                realized_metrics=realized_metrics(performance) if performance else None,
                 timestamp=datetime.now()
             )
-        finally:
-            db.close()
     
-    def get_all_model_versions(self) -> List[Dict[str, Any]]:
+    async def get_all_model_versions(self) -> List[Dict[str, Any]]:
         """Get all model versions"""
-        db = SessionLocal()
-        try:
-            models = db.query(ModelVersion).order_by(ModelVersion.created_at.desc()).all()
+        async with async_session("read") as db:
+            models = await db.scalars(select(ModelVersion).order_by(ModelVersion.created_at.desc()))
             return [
                 {
                     "version": m.version,
@@ -53,7 +56,5 @@ class MetricsService:
                 }
                 for m in models
             ]
-        finally:
-            db.close()
 
 
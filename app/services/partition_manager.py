@@ -0,0 +1,157 @@
+"""Time-range partition maintenance for the predictions table"""
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from app.config import settings
+from app.database import engine
+from app.services.feature_log import delete_orphan_vectors
+
+PARENT_TABLE = "predictions"
+DEFAULT_PARTITION = "predictions_default"
+# Arbitrary application-wide key for pg_try_advisory_xact_lock
+ADVISORY_LOCK_KEY = 7312029
+
+
+def month_start(value: datetime) -> datetime:
+    """First instant of the month containing ``value`` (UTC)"""
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """Shift a month start by a number of months"""
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(start: datetime) -> str:
+    """Name of the monthly partition starting at ``start``"""
+    return f"{PARENT_TABLE}_p{start:%Y%m}"
+
+
+class PredictionPartitionManager:
+    """Creates future monthly partitions and drops expired ones.
+
+    Only acts when ``predictions`` is a partitioned PostgreSQL table (see
+    migration 003); on other databases every operation is a no-op. Old data
+    is removed by dropping whole partitions, never by DELETE; feature
+    vectors only the dropped predictions referenced are deleted with them.
+    """
+
+    def __init__(self, months_ahead: Optional[int] = None, retention_days: Optional[int] = None):
+        self.months_ahead = (
+            settings.prediction_partition_months_ahead if months_ahead is None else months_ahead
+        )
+        self.retention_days = (
+            settings.prediction_retention_days if retention_days is None else retention_days
+        )
+
+    def is_partitioned(self, conn) -> bool:
+        """Whether the predictions table is range-partitioned"""
+        if conn.dialect.name != "postgresql":
+            return False
+        return bool(conn.execute(text(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = :name AND pg_table_is_visible(c.oid)"
+        ), {"name": PARENT_TABLE}).scalar())
+
+    def list_partitions(self, conn) -> List[Dict[str, Any]]:
+        """Monthly partitions with their bounds, oldest first"""
+        rows = conn.execute(text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :name AND pg_table_is_visible(p.oid) "
+            "ORDER BY c.relname"
+        ), {"name": PARENT_TABLE}).all()
+
+        partitions = []
+        for name, bound in rows:
+            if name == DEFAULT_PARTITION or not name.startswith(f"{PARENT_TABLE}_p"):
+                continue
+            start = datetime.strptime(name[len(PARENT_TABLE) + 2:], "%Y%m").replace(tzinfo=timezone.utc)
+            partitions.append({"name": name, "start": start, "end": add_months(start, 1), "bound": bound})
+        return partitions
+
+    def ensure_partitions(self, conn, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Create partitions from the current month to ``months_ahead`` months out.
+
+        Returns the created partitions with the number of rows each took
+        over from the default partition.
+        """
+        current = month_start(now or datetime.now(timezone.utc))
+        existing = {p["name"] for p in self.list_partitions(conn)}
+        created = {}
+        for offset in range(self.months_ahead + 1):
+            start = add_months(current, offset)
+            name = partition_name(start)
+            if name in existing:
+                continue
+            created[name] = self.create_partition(conn, start)
+        return created
+
+    def create_partition(self, conn, start: datetime) -> int:
+        """Create the partition of the month starting at ``start``; returns the rows moved into it.
+
+        PostgreSQL refuses to create a partition while the default partition
+        holds rows in its range, so such rows are moved over: the default
+        partition is detached, the new partition created and filled from it,
+        and the default attached again, all in the caller's transaction.
+        """
+        name = partition_name(start)
+        end = add_months(start, 1)
+        in_range = "timestamp >= :start AND timestamp < :end"
+        bounds = {"start": start, "end": end}
+        create = text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+
+        stranded = conn.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})"), bounds
+        ).scalar()
+        if not stranded:
+            conn.execute(create)
+            return 0
+
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+        conn.execute(create)
+        moved = conn.execute(
+            text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds
+        ).rowcount
+        conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+        return moved
+
+    def drop_expired_partitions(self, conn, now: Optional[datetime] = None) -> List[str]:
+        """Drop partitions whose whole range is older than the retention period"""
+        if not self.retention_days:
+            return []
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=self.retention_days)
+        dropped = []
+        for partition in self.list_partitions(conn):
+            if partition["end"] <= cutoff:
+                conn.execute(text(f"DROP TABLE IF EXISTS {partition['name']}"))
+                dropped.append(partition["name"])
+        return dropped
+
+    def run_maintenance(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Create upcoming partitions and apply retention, once across all workers"""
+        with engine.begin() as conn:
+            if not self.is_partitioned(conn):
+                return {"partitioned": False, "created": [], "dropped": []}
+
+            locked = conn.execute(
+                text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY}
+            ).scalar()
+            if not locked:
+                return {"partitioned": True, "created": [], "dropped": [], "skipped": True}
+
+            created = self.ensure_partitions(conn, now)
+            dropped = self.drop_expired_partitions(conn, now)
+            orphans = delete_orphan_vectors(conn) if dropped else 0
+            return {
+                "partitioned": True, "created": list(created), "dropped": dropped,
+                "rows_moved": sum(created.values()), "orphan_vectors_deleted": orphans
+            }
@@ -0,0 +1,271 @@
+"""Incremental realized-performance monitor over ground-truth labels"""
+from typing import Dict, Optional
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from sqlalchemy import and_, or_, insert, text
+from sqlalchemy.dialects import postgresql, sqlite
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Prediction, ModelPerformance, MonitorWatermark
+from app.services.label_service import LABEL_COMMIT_LOCK_KEY
+from app.ml.canary import canary_analyzer
+from app.live_metrics import live_metrics
+
+WATERMARK_NAME = "performance_monitor"
+
+
+def _bin_index(probabilities: np.ndarray, n_bins: int) -> np.ndarray:
+    """Map probabilities in [0, 1] onto equal-width bins"""
+    return np.clip((probabilities * n_bins).astype(int), 0, n_bins - 1)
+
+
+def _add_counts(stored: Optional[list], bins: np.ndarray, n_bins: int,
+                weights: Optional[np.ndarray] = None) -> list:
+    """Add a batch histogram to a stored JSON histogram"""
+    counts = np.bincount(bins, weights=weights, minlength=n_bins)
+    if stored:
+        counts = counts + np.asarray(stored)
+    return counts.tolist()
+
+
+def binned_auc(positive_histogram: list, negative_histogram: list) -> Optional[float]:
+    """Approximate ROC AUC from score histograms of positives and negatives.
+
+    Pairs falling in the same bin count as ties, so the error is bounded by
+    the share of pairs sharing a bin.
+    """
+    positives = np.asarray(positive_histogram, dtype=float)
+    negatives = np.asarray(negative_histogram, dtype=float)
+    total_pairs = positives.sum() * negatives.sum()
+    if total_pairs == 0:
+        return None
+    negatives_below = np.concatenate([[0.0], np.cumsum(negatives)[:-1]])
+    wins = np.sum(positives * negatives_below) + 0.5 * np.sum(positives * negatives)
+    return float(wins / total_pairs)
+
+
+def realized_metrics(performance: ModelPerformance) -> Dict[str, float]:
+    """Derive realized metrics from running counts in O(bins)"""
+    tp = performance.true_positives or 0
+    fp = performance.false_positives or 0
+    tn = performance.true_negatives or 0
+    fn = performance.false_negatives or 0
+    total = tp + fp + tn + fn
+    if total == 0:
+        return {}
+
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+    metrics = {
+        "labelled_count": float(total),
+        "accuracy": (tp + tn) / total,
+        "precision": precision,
+        "recall": recall,
+        "f1_score": f1,
+        "churn_rate": (tp + fn) / total,
+        "brier_score": (performance.squared_error_sum or 0.0) / total
+    }
+
+    if performance.calibration_counts:
+        probability_sums = np.asarray(performance.calibration_probability_sums)
+        positives = np.asarray(performance.calibration_positives)
+        metrics["expected_calibration_error"] = float(
+            np.abs(probability_sums - positives).sum() / total
+        )
+
+    auc = binned_auc(
+        performance.score_histogram_positive or [],
+        performance.score_histogram_negative or []
+    )
+    if auc is not None:
+        metrics["roc_auc"] = auc
+
+    return metrics
+
+
+class PerformanceMonitor:
+    """Folds newly labelled predictions into per-model-version running counts.
+
+    Progress is tracked by a (labeled_at, id) watermark that is advanced in
+    the same transaction as the counts, so every labelled row is counted
+    exactly once even with several workers refreshing concurrently.
+
+    On PostgreSQL each batch first waits for label imports that are
+    applying labels to commit. Imports stamp ``labeled_at`` only after
+    that lock, so no row can later commit with a ``labeled_at`` behind the
+    watermark, however long the import runs.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None):
+        self.batch_size = batch_size or settings.performance_monitor_batch_size
+        self.calibration_bins = settings.performance_monitor_calibration_bins
+        self.score_bins = settings.performance_monitor_score_bins
+
+    def refresh(self) -> int:
+        """Process all newly labelled predictions and publish the realized metrics
+        of every version; returns the number of rows folded in
+        """
+        total = 0
+        while True:
+            processed = self._process_batch()
+            total += processed
+            if processed < self.batch_size:
+                break
+        self.publish_realized()
+        return total
+
+    def publish_realized(self):
+        """Copy every version's realized metrics from the shared counts into this worker's live metrics.
+
+        Each batch is folded in by whichever worker gets to it first, so
+        every worker reads the counts back on each refresh, including the
+        first one after a restart.
+        """
+        db = SessionLocal()
+        try:
+            performances = db.query(ModelPerformance).all()
+        finally:
+            db.close()
+        for performance in performances:
+            metrics = realized_metrics(performance)
+            if metrics:
+                live_metrics.record_realized(performance.model_version, metrics)
+
+    def get_realized_metrics(self, model_version: str) -> Optional[Dict[str, float]]:
+        """Current realized metrics for a model version"""
+        db = SessionLocal()
+        try:
+            performance = db.query(ModelPerformance).filter(
+                ModelPerformance.model_version == model_version
+            ).first()
+            return realized_metrics(performance) if performance else None
+        finally:
+            db.close()
+
+    def _process_batch(self) -> int:
+        """Fold one batch of labelled rows past the watermark into the counts"""
+        db = SessionLocal()
+        try:
+            if db.get_bind().dialect.name == "postgresql":
+                db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": LABEL_COMMIT_LOCK_KEY})
+            watermark = self._get_watermark(db)
+            cutoff = datetime.now(timezone.utc) - timedelta(
+                seconds=settings.performance_monitor_settle_seconds
+            )
+
+            query = db.query(
+                Prediction.id,
+                Prediction.model_version,
+                Prediction.prediction,
+                Prediction.probability,
+                Prediction.is_churn,
+                Prediction.labeled_at,
+                Prediction.routed
+            ).filter(
+                Prediction.is_churn.isnot(None),
+                Prediction.labeled_at.isnot(None),
+                Prediction.labeled_at <= cutoff
+            )
+            if watermark.labeled_at is not None:
+                query = query.filter(or_(
+                    Prediction.labeled_at > watermark.labeled_at,
+                    and_(
+                        Prediction.labeled_at == watermark.labeled_at,
+                        Prediction.id > watermark.prediction_id
+                    )
+                ))
+            rows = query.order_by(Prediction.labeled_at, Prediction.id).limit(self.batch_size).all()
+
+            if not rows:
+                db.commit()
+                return 0
+
+            versions = np.array([row.model_version or "unknown" for row in rows])
+            predicted = np.array([(row.prediction or 0.0) >= 0.5 for row in rows])
+            probabilities = np.array([row.probability or 0.0 for row in rows])
+            actual = np.array([bool(row.is_churn) for row in rows])
+            routed = np.array([bool(row.routed) for row in rows])
+
+            for version in np.unique(versions):
+                mask = versions == version
+                performance = self._get_performance(db, str(version))
+                self._accumulate(performance, predicted[mask], probabilities[mask], actual[mask])
+
+            watermark.labeled_at = rows[-1].labeled_at
+            watermark.prediction_id = rows[-1].id
+            db.commit()
+
+            # Only once committed, so a retried batch is never counted twice; only
+            # routed outcomes, like the predictions the analyzer compares
+            for version in np.unique(versions[routed]):
+                mask = (versions == version) & routed
+                canary_analyzer.observe_outcomes(str(version), probabilities[mask], actual[mask])
+            return len(rows)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _accumulate(self, performance: ModelPerformance, predicted: np.ndarray,
+                    probabilities: np.ndarray, actual: np.ndarray):
+        """Add one version's batch to its running counts"""
+        performance.true_positives = (performance.true_positives or 0) + int(np.sum(predicted & actual))
+        performance.false_positives = (performance.false_positives or 0) + int(np.sum(predicted & ~actual))
+        performance.true_negatives = (performance.true_negatives or 0) + int(np.sum(~predicted & ~actual))
+        performance.false_negatives = (performance.false_negatives or 0) + int(np.sum(~predicted & actual))
+        performance.squared_error_sum = (performance.squared_error_sum or 0.0) + float(
+            np.sum((probabilities - actual) ** 2)
+        )
+
+        n_bins = len(performance.calibration_counts or []) or self.calibration_bins
+        bins = _bin_index(probabilities, n_bins)
+        performance.calibration_counts = _add_counts(performance.calibration_counts, bins, n_bins)
+        performance.calibration_probability_sums = _add_counts(
+            performance.calibration_probability_sums, bins, n_bins, weights=probabilities
+        )
+        performance.calibration_positives = _add_counts(
+            performance.calibration_positives, bins, n_bins, weights=actual.astype(float)
+        )
+
+        n_bins = len(performance.score_histogram_positive or []) or self.score_bins
+        bins = _bin_index(probabilities, n_bins)
+        performance.score_histogram_positive = _add_counts(
+            performance.score_histogram_positive, bins[actual], n_bins
+        )
+        performance.score_histogram_negative = _add_counts(
+            performance.score_histogram_negative, bins[~actual], n_bins
+        )
+
+    def _get_watermark(self, db) -> MonitorWatermark:
+        """Lock the monitor watermark row, creating it first if needed"""
+        self._ensure_watermark(db)
+        return db.query(MonitorWatermark).filter(
+            MonitorWatermark.name == WATERMARK_NAME
+        ).with_for_update().one()
+
+    def _ensure_watermark(self, db):
+        """Insert the watermark row unless it exists, without racing other workers"""
+        values = {"name": WATERMARK_NAME, "prediction_id": 0}
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            stmt = postgresql.insert(MonitorWatermark).on_conflict_do_nothing(index_elements=["name"])
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(MonitorWatermark).on_conflict_do_nothing(index_elements=["name"])
+        else:
+            if db.query(MonitorWatermark.id).filter(MonitorWatermark.name == WATERMARK_NAME).first():
+                return
+            stmt = insert(MonitorWatermark)
+        db.execute(stmt.values(**values))
+
+    def _get_performance(self, db, model_version: str) -> ModelPerformance:
+        """Get (or create) the running counts of a model version"""
+        performance = db.query(ModelPerformance).filter(
+            ModelPerformance.model_version == model_version
+        ).first()
+        if performance is None:
+            performance = ModelPerformance(model_version=model_version)
+            db.add(performance)
+        return performance
@@ -0,0 +1,191 @@
+"""Streaming export of logged predictions to Parquet or CSV"""
+import io
+import os
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Sequence
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Prediction
+
+EXPORT_COLUMNS = ["id", "customer_id", "model_version", "prediction", "probability",
+                  "timestamp", "is_churn", "labeled_at"]
+EXPORT_FORMATS = ("parquet", "csv")
+# partition_by name -> Hive-style directory key
+PARTITION_KEYS = {"day": "date", "model_version": "model_version"}
+# Directory value of a null partition key, which Hive and pyarrow read back as null
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def _arrow_schema(columns: Sequence[str] = EXPORT_COLUMNS):
+    import pyarrow as pa
+    types = {
+        "id": pa.int64(),
+        "customer_id": pa.string(),
+        "model_version": pa.string(),
+        "prediction": pa.float64(),
+        "probability": pa.float64(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+        "is_churn": pa.bool_(),
+        "labeled_at": pa.timestamp("us", tz="UTC")
+    }
+    return pa.schema([(column, types[column]) for column in columns])
+
+
+class _ByteSink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last ``drain``.
+    
+    ``tell`` keeps counting across drains, so a Parquet footer written to it
+    still points at the right row group offsets.
+    """
+    
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class PredictionExporter:
+    """Predictions read with a server-side cursor and written a chunk at a time.
+    
+    Rows are fetched ``export_chunk_size`` at a time (``yield_per``, a named
+    cursor on PostgreSQL) in (timestamp, id) order, and each chunk is written
+    out before the next is fetched, so memory stays at one chunk however
+    many predictions match.
+    """
+    
+    def __init__(self, chunk_size: Optional[int] = None):
+        self.chunk_size = chunk_size or settings.export_chunk_size
+    
+    def iter_chunks(self, db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    model_version: Optional[str] = None) -> Iterator[pd.DataFrame]:
+        """Predictions in ``[start, end)`` as DataFrames of at most ``chunk_size`` rows"""
+        stmt = select(*(getattr(Prediction, column) for column in EXPORT_COLUMNS))
+        if model_version is not None:
+            stmt = stmt.where(Prediction.model_version == model_version)
+        if start is not None:
+            stmt = stmt.where(Prediction.timestamp >= start)
+        if end is not None:
+            stmt = stmt.where(Prediction.timestamp < end)
+        stmt = stmt.order_by(Prediction.timestamp, Prediction.id).execution_options(yield_per=self.chunk_size)
+        
+        for rows in db.execute(stmt).partitions():
+            frame = pd.DataFrame(rows, columns=EXPORT_COLUMNS)
+            for column in ("timestamp", "labeled_at"):
+                frame[column] = pd.to_datetime(frame[column], utc=True)
+            yield frame
+    
+    def write(self, path: str, file_format: str = "parquet", partition_by: Sequence[str] = (),
+              start: Optional[datetime] = None, end: Optional[datetime] = None,
+              model_version: Optional[str] = None) -> Dict[str, int]:
+        """Export to one file at ``path``, or with ``partition_by`` to a directory of
+        ``date=YYYY-MM-DD/model_version=<version>/part-NNNNNN.<format>`` files, one per chunk.
+        
+        Partition keys are only in the directory names, as in any Hive layout,
+        so the directory reads back as one dataset. Returns the number of rows
+        and files written.
+        """
+        self._check_format(file_format)
+        unknown = set(partition_by) - set(PARTITION_KEYS)
+        if unknown:
+            raise ValueError(f"Cannot partition by {', '.join(sorted(unknown))}; use day and/or model_version")
+        if os.path.exists(path):
+            raise ValueError(f"{path} already exists")
+        
+        rows = files = 0
+        db = SessionLocal()
+        try:
+            chunks = self.iter_chunks(db, start, end, model_version)
+            if partition_by:
+                keys = [PARTITION_KEYS[name] for name in partition_by]
+                columns = [column for column in EXPORT_COLUMNS if column not in keys]
+                for i, frame in enumerate(chunks):
+                    partitions = {
+                        "date": frame["timestamp"].dt.strftime("%Y-%m-%d"),
+                        "model_version": frame["model_version"]
+                    }
+                    groups = frame.groupby([partitions[key] for key in keys], sort=False, dropna=False)
+                    for values, group in groups:
+                        values = values if isinstance(values, tuple) else (values,)
+                        directory = os.path.join(path, *(
+                            f"{key}={NULL_PARTITION if pd.isna(value) else value}"
+                            for key, value in zip(keys, values)
+                        ))
+                        os.makedirs(directory, exist_ok=True)
+                        part = os.path.join(directory, f"part-{i:06d}.{file_format}")
+                        self._write_file(group[columns], part, file_format)
+                        files += 1
+                    rows += len(frame)
+            else:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                with open(path, "wb") as f:
+                    for frame in self._write_chunks(chunks, file_format, f):
+                        rows += len(frame)
+                files = 1
+        finally:
+            db.close()
+        return {"rows": rows, "files": files}
+    
+    def stream(self, file_format: str = "parquet", start: Optional[datetime] = None,
+               end: Optional[datetime] = None, model_version: Optional[str] = None) -> Iterator[bytes]:
+        """The export as one file's bytes, produced a chunk at a time"""
+        self._check_format(file_format)
+        sink = _ByteSink()
+        db = SessionLocal()
+        try:
+            for _ in self._write_chunks(self.iter_chunks(db, start, end, model_version), file_format, sink):
+                yield sink.drain()
+        finally:
+            db.close()
+        yield sink.drain()
+    
+    def _write_chunks(self, chunks: Iterator[pd.DataFrame], file_format: str, f) -> Iterator[pd.DataFrame]:
+        """Write chunks to the binary file ``f`` as one CSV or Parquet file (a row group per
+        chunk), yielding each chunk once it is written; the Parquet footer follows the last one.
+        """
+        if file_format == "csv":
+            f.write((",".join(EXPORT_COLUMNS) + "\n").encode())
+            for frame in chunks:
+                f.write(frame.to_csv(header=False, index=False).encode())
+                yield frame
+            return
+        
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = _arrow_schema()
+        with pq.ParquetWriter(f, schema) as writer:
+            for frame in chunks:
+                writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+                yield frame
+    
+    @staticmethod
+    def _write_file(frame: pd.DataFrame, path: str, file_format: str):
+        if file_format == "csv":
+            frame.to_csv(path, index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            schema = _arrow_schema(list(frame.columns))
+            pq.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False), path)
+    
+    @staticmethod
+    def _check_format(file_format: str):
+        if file_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format {file_format}; use parquet or csv")
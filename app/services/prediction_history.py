@@ -0,0 +1,79 @@
+"""Keyset-paginated history of served predictions"""
+import base64
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+from sqlalchemy import select, func, tuple_
+from app.database import async_session
+from app.models import Prediction
+
+HISTORY_COLUMNS = (
+    Prediction.id,
+    Prediction.customer_id,
+    Prediction.model_version,
+    Prediction.prediction,
+    Prediction.probability,
+    Prediction.timestamp,
+    Prediction.is_churn
+)
+
+
+def _timestamp_key(value, dialect: str):
+    """A timestamp as pages compare it. SQLite keeps timestamps as text, with
+    or without fractional seconds depending on the writer, so there it is
+    compared in a normalized form.
+    """
+    if dialect == "sqlite":
+        return func.strftime("%Y-%m-%d %H:%M:%f", value)
+    return value
+
+
+def encode_cursor(timestamp: datetime, prediction_id: int) -> str:
+    """Opaque cursor pointing just past the (timestamp, id) of the last row of a page"""
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{prediction_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        timestamp, prediction_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(prediction_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+class PredictionHistoryService:
+    """Past predictions, newest first, one page at a time.
+    
+    Pages continue from the (timestamp, id) of the previous page's last row
+    instead of an OFFSET, so every page is a range read on one of the
+    (..., timestamp, id) indexes and costs the same at any depth.
+    """
+    
+    async def page(self, customer_id: Optional[str] = None, model_version: Optional[str] = None,
+                   start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   cursor: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+        """One page of predictions in ``[start, end)``, plus the cursor of the next page (None on the last)"""
+        after = decode_cursor(cursor) if cursor else None
+        async with async_session("read") as db:
+            dialect = db.get_bind().dialect.name
+            timestamp = _timestamp_key(Prediction.timestamp, dialect)
+            
+            stmt = select(*HISTORY_COLUMNS).order_by(timestamp.desc(), Prediction.id.desc()).limit(limit + 1)
+            if customer_id is not None:
+                stmt = stmt.where(Prediction.customer_id == customer_id)
+            if model_version is not None:
+                stmt = stmt.where(Prediction.model_version == model_version)
+            if start is not None:
+                stmt = stmt.where(timestamp >= _timestamp_key(start, dialect))
+            if end is not None:
+                stmt = stmt.where(timestamp < _timestamp_key(end, dialect))
+            if after is not None:
+                boundary = tuple_(_timestamp_key(after[0], dialect), after[1])
+                stmt = stmt.where(tuple_(timestamp, Prediction.id) < boundary)
+            rows = (await db.execute(stmt)).all()
+        
+        predictions = [dict(row._mapping) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = predictions[-1]
+            next_cursor = encode_cursor(last["timestamp"], last["id"])
+        return {"predictions": predictions, "next_cursor": next_cursor}
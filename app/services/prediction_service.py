@@ -1,73 +1,129 @@
 """Prediction service for handling inference requests"""
 import random
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Optional
 from datetime import datetime
+import numpy as np
+from sqlalchemy import insert
 from app.ml.model_manager import ModelManager
-from app.schemas import CustomerFeatures, PredictionResponse
-from app.database import SessionLocal
+from app.schemas import CustomerFeatures, PredictionResponse, Explanation
+from app.database import async_session
 from app.models import Prediction
+from app.services.feature_log import FeatureLog
+from app.services.score_store import ScoreStore, feature_hashes
+from app.ml.drift import drift_monitor, NUMERIC_FEATURES, CATEGORICAL_FEATURES
+from app.ml.explanations import explanation_rows
+from app.ml.canary import canary_analyzer
+from app.feature_store.online import online_store
+from app.instrumentation import stage, annotate
+from app.live_metrics import live_metrics
+from app.admission import check_deadline
 from app.config import settings
 
+DRIFT_FEATURES = NUMERIC_FEATURES + CATEGORICAL_FEATURES
+
+# Built once so its compiled form is cached and reused (and prepared by asyncpg)
+PREDICTION_INSERT = insert(Prediction)
+
 
 class PredictionService:
     """Service for making predictions"""
     
-    def __init__(self):
-        self.model_manager = ModelManager()
+    def __init__(self, model_manager: Optional[ModelManager] = None):
+        self.model_manager = model_manager or ModelManager()
+        self.feature_log = FeatureLog()
+        self.score_store = ScoreStore()
     
-    def predict_single(self, customer: CustomerFeatures) -> PredictionResponse:
-        """Make single prediction"""
-        # Transform features
+    @classmethod
+    async def create(cls) -> "PredictionService":
+        """Service whose models are looked up without blocking the event loop"""
+        return cls(await ModelManager.create())
+    
+    async def predict_single(self, customer: CustomerFeatures, model_version: Optional[str] = None,
+                             explain: bool = False) -> PredictionResponse:
+        """Make single prediction, optionally pinned to a model version and explained"""
         customer_dict = customer.dict()
-        features = self.model_manager.feature_transformer.transform(customer_dict)
         
-        # Determine if should use canary
-        use_canary = (
-            self.model_manager.canary_model is not None and
-            random.randint(1, 100) <= settings.canary_traffic_percent
-        )
+        # Determine if should use canary (pinned requests skip routing)
+        with stage("routing"):
+            pinned = model_version is not None
+            use_canary = (
+                not pinned and
+                self.model_manager.canary_model is not None and
+                random.randint(1, 100) <= settings.canary_traffic_percent
+            )
+            if pinned:
+                # Unknown versions raise here, before they can become metric labels
+                await self.model_manager.load_version(model_version)
+            else:
+                model_version = (
+                    self.model_manager.canary_version if use_canary
+                    else self.model_manager.model_version
+                )
+        annotate(model_version=model_version, batch_size=1)
         
-        # Make prediction
-        prediction, probability = self.model_manager.predict(features, use_canary)
+        stored = None
+        if self._read_through(explain):
+            hits, predictions, probabilities = await self._stored_scores(
+                model_version, [customer.customer_id], self._raw_vectors([customer_dict])
+            )
+            stored = (float(predictions[0]), float(probabilities[0])) if hits[0] else None
         
-        model_version = (
-            self.model_manager.canary_version if use_canary
-            else self.model_manager.model_version
-        )
+        explanation = None
+        if stored is not None:
+            prediction, probability = stored
+        else:
+            # Transform features
+            with stage("encoding"):
+                features = self.model_manager.feature_transformer.transform(customer_dict)
+            
+            # Make prediction, unless the request expired on the way here
+            check_deadline()
+            started = time.perf_counter()
+            prediction, probability = self.model_manager.predict(
+                features, use_canary, model_version if pinned else None
+            )
+            if not pinned:
+                # Only routed traffic is split at random, so only it feeds the canary comparison
+                canary_analyzer.observe(model_version, [probability], [time.perf_counter() - started])
+            if explain:
+                explanation = Explanation(**explanation_rows(
+                    self.model_manager.explain(features, use_canary, model_version if pinned else None)
+                )[0])
+        
+        # Track live feature distributions
+        with stage("drift"):
+            drift_monitor.observe(
+                model_version,
+                self.model_manager.run_ids.get(model_version),
+                {name: [customer_dict[name]] for name in DRIFT_FEATURES}
+            )
         
         # Store prediction
-        self._store_prediction(customer.customer_id, prediction, probability, model_version, customer_dict)
+        with stage("persistence"):
+            await self._store_predictions([
+                (customer.customer_id, prediction, probability, model_version, customer_dict)
+            ], routed=not pinned)
         
         return PredictionResponse(
             customer_id=customer.customer_id,
             prediction=prediction,
             probability=probability,
             model_version=model_version,
-            timestamp=datetime.now()
+            timestamp=datetime.now(),
+            explanation=explanation
         )
     
-    def predict_batch(self, customers: List[CustomerFeatures]) -> List[PredictionResponse]:
-        """Make batch predictions"""
-        import pandas as pd
-        
-        # Convert to DataFrame
-        customer_dicts = [c.dict() for c in customers]
-        df = pd.DataFrame(customer_dicts)
-        
-        # Transform features
-        features = self.model_manager.feature_transformer.transform_batch(df)
-        
-        # Make predictions
-        model = self.model_manager.current_model
-        if model is None:
-            raise ValueError("No model loaded")
-        
-        predictions = model.predict(features)
-        probabilities = model.predict_proba(features)[:, 1]
+    async def predict_batch(self, customers: List[CustomerFeatures], model_version: Optional[str] = None,
+                            explain: bool = False) -> List[PredictionResponse]:
+        """Make batch predictions with the active model, or a pinned version"""
+        model_version, predictions, probabilities, explanation = await self._score_batch(
+            customers, model_version, explain
+        )
+        explanations = explanation_rows(explanation) if explanation else [None] * len(customers)
         
         # Create responses
         responses = []
-        model_version = self.model_manager.model_version
         
         for i, customer in enumerate(customers):
             response = PredictionResponse(
@@ -75,36 +131,224 @@ class PredictionService:
                 prediction=float(predictions[i]),
                 probability=float(probabilities[i]),
                 model_version=model_version,
-                timestamp=datetime.now()
+                timestamp=datetime.now(),
+                explanation=explanations[i]
             )
             responses.append(response)
+        
+        return responses
+    
+    async def predict_batch_compact(self, customers: List[CustomerFeatures], model_version: Optional[str] = None,
+                                    explain: bool = False) -> Dict[str, Any]:
+        """Batch predictions as one shared timestamp and model version plus parallel arrays.
+        
+        Explanations, when requested, are one ``base_value`` plus a
+        (customers x features) ``contributions`` matrix.
+        """
+        model_version, predictions, probabilities, explanation = await self._score_batch(
+            customers, model_version, explain
+        )
+        response = {
+            "model_version": model_version,
+            "timestamp": datetime.now(),
+            "total": len(customers),
+            "customer_ids": [customer.customer_id for customer in customers],
+            "predictions": predictions.astype(float, copy=False),
+            "probabilities": probabilities
+        }
+        if explanation:
+            response["explanations"] = explanation
+        return response
+    
+    async def predict_customers(self, customer_ids: List[str],
+                                model_version: Optional[str] = None) -> Dict[str, Any]:
+        """Score customers by id with their vectors from the online feature store.
+        
+        Vectors are stored already encoded, so only the lookup runs before
+        inference. Returns the compact representation plus the ids the store
+        does not know; raises ``FeatureStoreUnavailable`` without a snapshot.
+        """
+        pinned = model_version
+        if pinned:
+            # Unknown versions raise here, before they can become metric labels
+            with stage("routing"):
+                await self.model_manager.load_version(pinned)
+        model_version = pinned or self.model_manager.model_version
+        annotate(model_version=model_version, batch_size=len(customer_ids))
+        
+        with stage("encoding"):
+            found = online_store.lookup(customer_ids)
+        
+        predictions = probabilities = np.empty(0)
+        if found.customer_ids:
+            live = np.ones(len(found.customer_ids), dtype=bool)
+            if self._read_through():
+                hits, predictions, probabilities = await self._stored_scores(
+                    model_version, found.customer_ids, found.raw
+                )
+                live = ~hits
+            if live.any():
+                check_deadline()
+                scored = self.model_manager.predict_batch(found.vectors[live], model_version=pinned)
+                predictions, probabilities = self._merge_scores(live, scored, predictions, probabilities)
             
-            # Store prediction
-            self._store_prediction(
-                customer.customer_id,
-                float(predictions[i]),
-                float(probabilities[i]),
-                model_version,
-                customer_dicts[i]
+            with stage("drift"):
+                columns = self.feature_log.codec.decode_columns(found.raw)
+                drift_monitor.observe(
+                    model_version, self.model_manager.run_ids.get(model_version),
+                    {name: columns[name] for name in DRIFT_FEATURES}
+                )
+            
+            with stage("persistence"):
+                await self._store_predictions([
+                    (customer_id, float(predictions[i]), float(probabilities[i]), model_version,
+                     self.feature_log.codec.decode(found.raw[i]))
+                    for i, customer_id in enumerate(found.customer_ids)
+                ])
+        
+        return {
+            "model_version": model_version,
+            "timestamp": datetime.now(),
+            "total": len(found.customer_ids),
+            "customer_ids": found.customer_ids,
+            "predictions": predictions.astype(float, copy=False),
+            "probabilities": probabilities,
+            "missing_customer_ids": found.missing
+        }
+    
+    async def _score_batch(self, customers: List[CustomerFeatures], model_version: Optional[str] = None,
+                           explain: bool = False) -> tuple:
+        """Encode, score, track and store a batch.
+        
+        Returns (model_version, predictions, probabilities, explanation),
+        the explanation being None unless requested.
+        """
+        import pandas as pd
+        
+        pinned = model_version
+        if pinned:
+            # Unknown versions raise here, before they can become metric labels
+            with stage("routing"):
+                await self.model_manager.load_version(pinned)
+        model_version = pinned or self.model_manager.model_version
+        annotate(model_version=model_version, batch_size=len(customers))
+        
+        with stage("encoding"):
+            customer_dicts = [c.dict() for c in customers]
+            df = pd.DataFrame(customer_dicts)
+        
+        # Customers with an up-to-date precomputed score skip inference
+        live = np.ones(len(customers), dtype=bool)
+        predictions = probabilities = None
+        if self._read_through(explain):
+            hits, predictions, probabilities = await self._stored_scores(
+                model_version, [c.customer_id for c in customers], self.feature_log.codec.encode_frame(df)
             )
+            live = ~hits
         
-        return responses
+        explanation = None
+        if live.any():
+            # Transform features
+            with stage("encoding"):
+                features = self.model_manager.feature_transformer.transform_batch(
+                    df if live.all() else df[live].reset_index(drop=True)
+                )
+            
+            # Make predictions, unless the request expired on the way here
+            check_deadline()
+            scored = self.model_manager.predict_batch(features, model_version=pinned)
+            predictions, probabilities = self._merge_scores(live, scored, predictions, probabilities)
+            explanation = self.model_manager.explain(features, model_version=pinned) if explain else None
+        
+        # Track live feature distributions
+        with stage("drift"):
+            drift_monitor.observe(model_version, self.model_manager.run_ids.get(model_version), df)
+        
+        # Store predictions
+        with stage("persistence"):
+            await self._store_predictions([
+                (customer.customer_id, float(predictions[i]), float(probabilities[i]), model_version, customer_dicts[i])
+                for i, customer in enumerate(customers)
+            ])
+        
+        return model_version, predictions, probabilities, explanation
     
-    def _store_prediction(self, customer_id: str, prediction: float, probability: float,
-                         model_version: str, features: Dict[str, Any]):
-        """Store prediction in database"""
-        db = SessionLocal()
-        try:
-            pred_record = Prediction(
-                customer_id=customer_id,
-                prediction=prediction,
-                probability=probability,
-                model_version=model_version,
-                features=features
+    async def precompute_scores(self, customers: List[CustomerFeatures],
+                                model_version: Optional[str] = None) -> Dict[str, Any]:
+        """Score customers in bulk and keep the scores in ``customer_scores`` for read-through serving.
+        
+        Returns the compact batch representation plus how many scores were
+        stored; customers whose features the codec cannot encode get no
+        stored score and are always scored live.
+        """
+        import pandas as pd
+        
+        response = await self.predict_batch_compact(customers, model_version)
+        raw = self.feature_log.codec.encode_frame(pd.DataFrame([c.dict() for c in customers]))
+        response["stored"] = await self.score_store.write(
+            response["model_version"], response["customer_ids"], response["predictions"],
+            response["probabilities"], feature_hashes(self.feature_log.codec, raw)
+        )
+        return response
+    
+    def _read_through(self, explain: bool = False) -> bool:
+        """Whether requests are answered from precomputed scores; explanations always need inference"""
+        return settings.score_serving_mode == "read_through" and not explain
+    
+    async def _stored_scores(self, model_version: str, customer_ids: List[str], raw: np.ndarray) -> tuple:
+        """(hit mask, predictions, probabilities) of customers whose stored features hash matches ``raw``"""
+        with stage("score_lookup"):
+            return await self.score_store.lookup(
+                model_version, customer_ids, feature_hashes(self.feature_log.codec, raw)
             )
-            db.add(pred_record)
-            db.commit()
-        finally:
-            db.close()
+    
+    def _raw_vectors(self, customer_dicts: List[Dict[str, Any]]) -> np.ndarray:
+        """Codec vectors of feature dicts, NaN rows where a value is outside the codec vocabularies"""
+        codec = self.feature_log.codec
+        return np.array([
+            codec.encode(d) if codec.can_encode(d) else np.full(len(codec.fields), np.nan, dtype=np.float32)
+            for d in customer_dicts
+        ])
+    
+    @staticmethod
+    def _merge_scores(live: np.ndarray, scored: tuple, predictions: Optional[np.ndarray],
+                      probabilities: Optional[np.ndarray]) -> tuple:
+        """Live (predictions, probabilities) of the ``live`` rows merged into the stored ones"""
+        if predictions is None or live.all():
+            return scored
+        predictions, probabilities = predictions.copy(), probabilities.copy()
+        predictions[live], probabilities[live] = scored
+        return predictions, probabilities
+    
+    async def _store_predictions(self, rows: List[tuple], routed: bool = False):
+        """Store (customer_id, prediction, probability, model_version, features) rows in one transaction.
+        
+        ``routed`` marks predictions whose version was chosen by the random
+        canary split; only their outcomes feed the canary comparison.
+        """
+        if not rows:
+            return
+        features = [row[4] for row in rows]
+        async with async_session("write") as db:
+            feature_columns = await db.run_sync(self.feature_log.columns_batch, features)
+            await db.execute(PREDICTION_INSERT, [
+                {
+                    "customer_id": customer_id,
+                    "prediction": prediction,
+                    "probability": probability,
+                    "model_version": model_version,
+                    "routed": routed,
+                    **columns
+                }
+                for (customer_id, prediction, probability, model_version, _), columns in zip(rows, feature_columns)
+            ])
+            await db.commit()
+        self.feature_log.after_commit(feature_columns)
+        
+        probabilities = {}
+        for _, _, probability, model_version, _ in rows:
+            probabilities.setdefault(model_version, []).append(probability)
+        for model_version, values in probabilities.items():
+            live_metrics.record_predictions(model_version, values)
 
 
@@ -0,0 +1,126 @@
+"""Precomputed customer scores for read-through serving and top-K risk lists"""
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import numpy as np
+from prometheus_client import Counter
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from app.config import settings
+from app.database import async_session
+from app.ml.feature_codec import FeatureVectorCodec
+from app.models import CustomerScore, ModelVersion
+
+SCORE_LOOKUPS = Counter(
+    'score_store_lookups_total',
+    'Customers looked up in the precomputed score store',
+    ['result']  # hit, stale (features changed since scoring), miss
+)
+
+
+def feature_hashes(codec: FeatureVectorCodec, raw: np.ndarray) -> List[Optional[bytes]]:
+    """Content hash of each codec vector; None for rows the codec could not encode (NaN)"""
+    return [
+        None if np.isnan(row).any() else codec.content_hash(codec.to_bytes(row))
+        for row in np.atleast_2d(raw)
+    ]
+
+
+class ScoreStore:
+    """Scores per (model_version, customer_id), each with the hash of the features it was computed from.
+    
+    A stored score answers a request only when the request's features hash
+    to the same value, so customers whose features changed since the bulk
+    run are scored live.
+    """
+    
+    def __init__(self, chunk_size: Optional[int] = None):
+        self.chunk_size = chunk_size or settings.score_store_chunk_size
+    
+    async def write(self, model_version: str, customer_ids: Sequence[str], predictions: Sequence[float],
+                    probabilities: Sequence[float], hashes: Sequence[Optional[bytes]]) -> int:
+        """Insert or replace scores; customers without a features hash are skipped"""
+        scored_at = datetime.now(timezone.utc)
+        rows = [
+            {
+                "model_version": model_version,
+                "customer_id": str(customer_id),
+                "prediction": float(prediction),
+                "probability": float(probability),
+                "feature_hash": digest,
+                "scored_at": scored_at
+            }
+            for customer_id, prediction, probability, digest in zip(customer_ids, predictions, probabilities, hashes)
+            if digest is not None
+        ]
+        async with async_session("write") as db:
+            dialect = db.get_bind().dialect.name
+            module = postgresql if dialect == "postgresql" else sqlite
+            stmt = module.insert(CustomerScore)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["model_version", "customer_id"],
+                set_={name: stmt.excluded[name] for name in ("prediction", "probability", "feature_hash", "scored_at")}
+            )
+            for start in range(0, len(rows), self.chunk_size):
+                await db.execute(stmt, rows[start:start + self.chunk_size])
+            await db.commit()
+        return len(rows)
+    
+    async def lookup(self, model_version: str, customer_ids: Sequence[str],
+                     hashes: Sequence[Optional[bytes]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Stored scores of the customers whose features hash matches.
+        
+        Returns (hit mask, predictions, probabilities) in request order;
+        predictions and probabilities are NaN where the mask is False.
+        """
+        hits = np.zeros(len(customer_ids), dtype=bool)
+        predictions = np.full(len(customer_ids), np.nan)
+        probabilities = np.full(len(customer_ids), np.nan)
+        keys = list({str(customer_id) for customer_id, digest in zip(customer_ids, hashes) if digest is not None})
+        stored = {}
+        if keys:
+            async with async_session("read") as db:
+                for start in range(0, len(keys), self.chunk_size):
+                    result = await db.execute(
+                        select(CustomerScore.customer_id, CustomerScore.prediction,
+                               CustomerScore.probability, CustomerScore.feature_hash)
+                        .where(CustomerScore.model_version == model_version,
+                               CustomerScore.customer_id.in_(keys[start:start + self.chunk_size]))
+                    )
+                    stored.update((row.customer_id, row) for row in result)
+        
+        stale = 0
+        for i, (customer_id, digest) in enumerate(zip(customer_ids, hashes)):
+            row = stored.get(str(customer_id))
+            if row is None:
+                continue
+            if row.feature_hash != digest:
+                stale += 1
+                continue
+            hits[i] = True
+            predictions[i] = row.prediction
+            probabilities[i] = row.probability
+        SCORE_LOOKUPS.labels(result="hit").inc(int(hits.sum()))
+        SCORE_LOOKUPS.labels(result="stale").inc(stale)
+        SCORE_LOOKUPS.labels(result="miss").inc(len(customer_ids) - int(hits.sum()) - stale)
+        return hits, predictions, probabilities
+    
+    async def top(self, k: int, model_version: Optional[str] = None) -> Dict[str, Any]:
+        """The ``k`` highest-risk customers of a version (default: the active one), read off its index"""
+        async with async_session("read") as db:
+            if model_version is None:
+                model_version = await db.scalar(
+                    select(ModelVersion.version).where(ModelVersion.status == "active").limit(1)
+                )
+                if not model_version:
+                    raise ValueError("No active model found")
+            result = await db.execute(
+                select(CustomerScore.customer_id, CustomerScore.prediction,
+                       CustomerScore.probability, CustomerScore.scored_at)
+                .where(CustomerScore.model_version == model_version)
+                .order_by(CustomerScore.probability.desc())
+                .limit(k)
+            )
+            return {
+                "model_version": model_version,
+                "customers": [dict(row._mapping) for row in result]
+            }
@@ -0,0 +1,61 @@
+"""Startup timing and readiness of an API worker"""
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from prometheus_client import Gauge
+
+# Taken when app.main starts importing (it imports this module first)
+IMPORT_STARTED = time.perf_counter()
+
+IMPORT_SECONDS = Gauge('app_import_seconds', 'Time to import the application modules')
+STARTUP_STAGE_SECONDS = Gauge('app_startup_stage_seconds', 'Duration of each startup stage', ['stage'])
+TIME_TO_READY = Gauge('app_time_to_ready_seconds', 'Time from the start of the import to ready')
+READY = Gauge('app_ready', 'Whether the worker has finished startup (1) or not (0)')
+MODEL_WARMUP_SECONDS = Gauge(
+    'model_warmup_seconds', 'Warm-up time per model version and batch size', ['model_version', 'batch_size']
+)
+
+
+class StartupTracker:
+    """Records import time, lifespan stages and when the worker became ready"""
+    
+    def __init__(self, started: float):
+        self.started = started
+        self.import_seconds: Optional[float] = None
+        self.stages: Dict[str, float] = {}
+        self.ready = False
+        self.time_to_ready: Optional[float] = None
+    
+    def imports_done(self):
+        self.import_seconds = time.perf_counter() - self.started
+        IMPORT_SECONDS.set(self.import_seconds)
+        print(f"Application imported in {self.import_seconds:.3f}s")
+    
+    @contextmanager
+    def stage(self, name: str):
+        """Time one startup stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = time.perf_counter() - start
+            STARTUP_STAGE_SECONDS.labels(stage=name).set(self.stages[name])
+            print(f"Startup stage {name} took {self.stages[name]:.3f}s")
+    
+    def mark_ready(self):
+        self.ready = True
+        self.time_to_ready = time.perf_counter() - self.started
+        READY.set(1)
+        TIME_TO_READY.set(self.time_to_ready)
+        print(f"Worker ready {self.time_to_ready:.3f}s after import start")
+    
+    def status(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "import_seconds": self.import_seconds,
+            "stages": dict(self.stages),
+            "time_to_ready_seconds": self.time_to_ready
+        }
+
+
+startup = StartupTracker(IMPORT_STARTED)
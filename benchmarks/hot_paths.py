@@ -0,0 +1,140 @@
+"""Benchmark cases for the serving hot paths.
+
+Runs fully offline: the caller points ``DATABASE_URL`` at SQLite and
+``MODEL_REGISTRY_PATH`` at a scratch directory before importing this
+module, and ``prepare_environment`` trains a model and registers it as
+the active version without going through MLflow.
+"""
+import asyncio
+import os
+from typing import Callable, Dict, Any
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from app.config import settings
+from app.database import Base, engine, SessionLocal, dispose_async_engines
+from app.models import ModelVersion
+from app.schemas import CustomerFeatures
+from app.feature_store.transformer import FeatureTransformer
+from app.ml.compression import compress_model, compact_artifact_path
+from app.ml.model_manager import ModelManager
+from app.services.prediction_service import PredictionService
+from scripts.generate_data import generate_customer_data
+
+BENCHMARK_VERSION = "benchmark"
+# Distinct customers generated; larger inputs repeat them with new ids
+GENERATED_ROWS = 10000
+
+# Event loop running the async service methods, so their connections are reused
+_loop = asyncio.new_event_loop()
+
+
+def customer_frame(n_rows: int) -> pd.DataFrame:
+    """Synthetic customers without the churn label"""
+    base = generate_customer_data(n_samples=min(n_rows, GENERATED_ROWS)).drop("churn", axis=1)
+    repeats = -(-n_rows // len(base))
+    df = pd.concat([base] * repeats, ignore_index=True).iloc[:n_rows]
+    df["customer_id"] = [f"BENCH_{i:07d}" for i in range(n_rows)]
+    return df
+
+
+def prepare_environment(model_kind: str = "compact", n_train: int = 5000):
+    """Create the schema, train a model like ModelTrainer does and make it active"""
+    Base.metadata.create_all(bind=engine)
+    settings.serve_compact_models = model_kind == "compact"
+    
+    df = generate_customer_data(n_samples=n_train)
+    transformer = FeatureTransformer()
+    transformer.fit(df.drop("churn", axis=1))
+    X = transformer.transform_batch(df.drop("churn", axis=1))
+    model = RandomForestClassifier(n_estimators=100, max_depth=10, random_state=42)
+    model.fit(X, df["churn"].values)
+    
+    os.makedirs(settings.model_registry_path, exist_ok=True)
+    joblib.dump(model, os.path.join(settings.model_registry_path, f"model_{BENCHMARK_VERSION}.joblib"))
+    if model_kind == "compact":
+        compress_model(model, X, output_path=compact_artifact_path(BENCHMARK_VERSION))
+    
+    db = SessionLocal()
+    try:
+        db.query(ModelVersion).filter(ModelVersion.status == "active").update({"status": "deprecated"})
+        db.query(ModelVersion).filter(ModelVersion.version == BENCHMARK_VERSION).delete()
+        db.add(ModelVersion(
+            version=BENCHMARK_VERSION,
+            model_type="random_forest",
+            status="active",
+            traffic_percent=100,
+            mlflow_run_id=BENCHMARK_VERSION
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def build_cases(max_rows: int) -> Dict[str, Callable[[int], Callable[[], Any]]]:
+    """Case name -> factory(batch_size) returning the callable to time.
+    
+    Batch APIs are called once with ``batch_size`` rows; single-row APIs
+    are called ``batch_size`` times in a loop. Async service methods run
+    on one event loop so its connection pool is reused across calls.
+    """
+    run = _loop.run_until_complete
+    df = customer_frame(max_rows)
+    records = df.to_dict("records")
+    service = PredictionService()
+    manager = service.model_manager
+    X = manager.feature_transformer.transform_batch(df)
+    customers = [CustomerFeatures(**record) for record in records]
+    version = manager.model_version
+    
+    def transform(n):
+        rows = records[:n]
+        return lambda: [manager.feature_transformer.transform(row) for row in rows]
+    
+    def transform_batch(n):
+        frame = df.iloc[:n]
+        return lambda: manager.feature_transformer.transform_batch(frame)
+    
+    def predict(n):
+        rows = [X[i:i + 1] for i in range(n)]
+        return lambda: [manager.predict(row) for row in rows]
+    
+    def predict_batch(n):
+        matrix = np.ascontiguousarray(X[:n])
+        return lambda: manager.predict_batch(matrix)
+    
+    def explain(n):
+        matrix = np.ascontiguousarray(X[:n])
+        return lambda: manager.explain(matrix)
+    
+    def service_predict_batch(n):
+        batch = customers[:n]
+        return lambda: run(service.predict_batch(batch))
+    
+    async def store_each(rows):
+        for row in rows:
+            await service._store_predictions([(row["customer_id"], 0.0, 0.5, version, row)])
+    
+    def store_prediction(n):
+        rows = records[:n]
+        return lambda: run(store_each(rows))
+    
+    def load_models(n):
+        return lambda: [ModelManager() for _ in range(n)]
+    
+    return {
+        "feature_transformer.transform": transform,
+        "feature_transformer.transform_batch": transform_batch,
+        "model_manager.predict": predict,
+        "model_manager.predict_batch": predict_batch,
+        "model_manager.explain": explain,
+        "model_manager.load": load_models,
+        "prediction_service.predict_batch": service_predict_batch,
+        "prediction_service._store_prediction": store_prediction,
+    }
+
+
+def close_environment():
+    """Close the async database connections opened by the cases"""
+    _loop.run_until_complete(dispose_async_engines())
@@ -0,0 +1,250 @@
+"""Open-loop load replay against a running API with latency SLO checks.
+
+Requests are sent at scheduled arrival times whether or not earlier
+requests have completed. Every request records two latencies:
+
+- ``service``: from the moment it was actually sent to its response;
+- ``corrected``: from its *scheduled* arrival time to its response.
+
+When the app (or the client) falls behind, queueing delay shows up in the
+corrected latency instead of silently thinning the load, which is the
+coordinated-omission correction. SLOs are evaluated on corrected latency.
+"""
+import asyncio
+import json
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+import httpx
+
+PERCENTILES = {"p50": 50, "p95": 95, "p99": 99, "p999": 99.9}
+
+# Log-spaced histogram buckets from 0.1 ms to ~100 s, 10 per decade
+HISTOGRAM_BOUNDS_MS = [round(10 ** (exponent / 10), 4) for exponent in range(-10, 51)]
+
+ENDPOINTS = {
+    "predict": ("POST", "/api/v1/predict"),
+    "batch": ("POST", "/api/v1/predict/batch"),
+    "metrics": ("GET", "/api/v1/metrics"),
+}
+
+SLO_PATTERN = re.compile(r"^\s*(p50|p95|p99|p999|error_rate|throughput)\s*(<=|>=|<|>)\s*([\d.]+)\s*(ms|s|%)?\s*$")
+
+
+@dataclass
+class RequestSpec:
+    """One request to replay"""
+    kind: str
+    method: str
+    path: str
+    body: Optional[Any] = None
+
+
+@dataclass
+class Sample:
+    kind: str
+    status: int
+    service_ms: float
+    corrected_ms: float
+
+
+@dataclass
+class LoadResult:
+    samples: List[Sample] = field(default_factory=list)
+    duration_seconds: float = 0.0
+    max_send_lag_ms: float = 0.0
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """"predict=0.8,batch=0.15,metrics=0.05" -> normalized weights"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {name}. Use one of {', '.join(ENDPOINTS)}")
+        weights[name] = float(weight or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Mix weights must add up to a positive number")
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def synthetic_requests(n_requests: int, mix: Dict[str, float], batch_size: int = 100,
+                       n_customers: int = 1000, seed: int = 42) -> List[RequestSpec]:
+    """Requests built from synthetic customers of ``generate_customer_data``"""
+    from scripts.generate_data import generate_customer_data
+    
+    df = generate_customer_data(n_samples=n_customers).drop("churn", axis=1)
+    customers = json.loads(df.to_json(orient="records"))
+    rng = np.random.default_rng(seed)
+    kinds = rng.choice(list(mix), size=n_requests, p=list(mix.values()))
+    
+    requests = []
+    for kind in kinds:
+        method, path = ENDPOINTS[kind]
+        if kind == "predict":
+            body = {"customer": customers[rng.integers(len(customers))]}
+        elif kind == "batch":
+            picks = rng.integers(len(customers), size=batch_size)
+            body = {"customers": [customers[i] for i in picks]}
+        else:
+            body = None
+        requests.append(RequestSpec(kind, method, path, body))
+    return requests
+
+
+def load_request_file(path: str) -> List[Tuple[Optional[float], RequestSpec]]:
+    """Read a JSONL request file.
+    
+    Each line needs ``path`` and may have ``method`` (default POST with a
+    body, GET without), ``body``, ``kind`` (report label, default: path)
+    and ``at`` (offset in seconds from the start, for timed replay).
+    """
+    entries = []
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "path" not in record:
+                raise ValueError(f"{path}:{number}: request line has no 'path'")
+            body = record.get("body")
+            spec = RequestSpec(
+                kind=record.get("kind", record["path"]),
+                method=record.get("method", "POST" if body is not None else "GET").upper(),
+                path=record["path"],
+                body=body
+            )
+            entries.append((record.get("at"), spec))
+    return entries
+
+
+def arrival_offsets(n_requests: int, rate: float, process: str = "poisson", seed: int = 42) -> np.ndarray:
+    """Scheduled send offsets (seconds) for an open-loop arrival rate"""
+    if process == "constant":
+        return np.arange(n_requests) / rate
+    gaps = np.random.default_rng(seed).exponential(1 / rate, size=n_requests)
+    return np.cumsum(gaps) - gaps[0]
+
+
+async def run_load(base_url: str, schedule: List[Tuple[float, RequestSpec]], max_connections: int = 100,
+                   timeout: float = 30.0, transport: Optional[httpx.AsyncBaseTransport] = None) -> LoadResult:
+    """Send every request at its scheduled offset and collect latencies"""
+    result = LoadResult()
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    
+    async def send(client: httpx.AsyncClient, spec: RequestSpec, intended: float):
+        sent = time.perf_counter()
+        try:
+            response = await client.request(spec.method, spec.path, json=spec.body)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        done = time.perf_counter()
+        result.samples.append(Sample(spec.kind, status, (done - sent) * 1000, (done - intended) * 1000))
+    
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits, transport=transport) as client:
+        tasks = []
+        start = time.perf_counter() + 0.05
+        for offset, spec in schedule:
+            intended = start + offset
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            result.max_send_lag_ms = max(result.max_send_lag_ms, (time.perf_counter() - intended) * 1000)
+            tasks.append(asyncio.create_task(send(client, spec, intended)))
+        await asyncio.gather(*tasks)
+        result.duration_seconds = time.perf_counter() - start
+    return result
+
+
+def histogram(latencies_ms: np.ndarray) -> List[Dict[str, Any]]:
+    """Non-empty log-spaced latency buckets (upper bound in ms, count)"""
+    counts = np.bincount(
+        np.searchsorted(HISTOGRAM_BOUNDS_MS, latencies_ms, side="left"),
+        minlength=len(HISTOGRAM_BOUNDS_MS) + 1
+    )
+    bounds = HISTOGRAM_BOUNDS_MS + ["+Inf"]
+    return [
+        {"le_ms": bound, "count": int(count)}
+        for bound, count in zip(bounds, counts)
+        if count
+    ]
+
+
+def summarize(samples: List[Sample], duration_seconds: float) -> Dict[str, Any]:
+    """Throughput, error rate, percentiles and histograms for a set of samples"""
+    if not samples:
+        return {"requests": 0, "errors": 0, "error_rate": 0.0, "throughput": 0.0}
+    service = np.array([s.service_ms for s in samples])
+    corrected = np.array([s.corrected_ms for s in samples])
+    errors = sum(1 for s in samples if not 200 <= s.status < 400)
+    summary = {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples),
+        "throughput": len(samples) / duration_seconds if duration_seconds > 0 else 0.0,
+        "status_codes": dict(Counter(str(s.status) for s in samples)),
+    }
+    for name, q in PERCENTILES.items():
+        summary[f"{name}_ms"] = float(np.percentile(corrected, q))
+        summary[f"service_{name}_ms"] = float(np.percentile(service, q))
+    summary["max_ms"] = float(corrected.max())
+    summary["histogram"] = histogram(corrected)
+    summary["service_histogram"] = histogram(service)
+    return summary
+
+
+def build_report(result: LoadResult) -> Dict[str, Any]:
+    by_kind: Dict[str, List[Sample]] = {}
+    for sample in result.samples:
+        by_kind.setdefault(sample.kind, []).append(sample)
+    return {
+        "duration_seconds": result.duration_seconds,
+        "max_send_lag_ms": result.max_send_lag_ms,
+        "overall": summarize(result.samples, result.duration_seconds),
+        "endpoints": {kind: summarize(samples, result.duration_seconds) for kind, samples in by_kind.items()}
+    }
+
+
+def parse_slo(expression: str) -> Tuple[str, str, float]:
+    """"p99<=250ms" -> ("p99_ms", "<=", 250.0); error rates accept "1%" """
+    match = SLO_PATTERN.match(expression)
+    if not match:
+        raise ValueError(f"Invalid SLO: {expression!r} (e.g. p99<=250ms, error_rate<=1%, throughput>=100)")
+    metric, op, value, unit = match.groups()
+    value = float(value)
+    if metric in PERCENTILES:
+        metric = f"{metric}_ms"
+        value = value * 1000 if unit == "s" else value
+    elif unit == "%":
+        value /= 100
+    return metric, op, value
+
+
+def check_slos(report: Dict[str, Any], slos: List[str]) -> List[Dict[str, Any]]:
+    """Evaluate SLO expressions against a report.
+    
+    ``"p99<=250ms"`` applies to all requests, ``"batch:p99<=2s"`` only to
+    one endpoint kind.
+    """
+    compare = {
+        "<=": lambda a, b: a <= b, "<": lambda a, b: a < b,
+        ">=": lambda a, b: a >= b, ">": lambda a, b: a > b,
+    }
+    checks = []
+    for expression in slos:
+        kind, _, condition = expression.rpartition(":")
+        metric, op, target = parse_slo(condition)
+        summary = report["endpoints"].get(kind, {}) if kind else report["overall"]
+        actual = summary.get(metric)
+        checks.append({
+            "slo": expression,
+            "actual": actual,
+            "passed": actual is not None and compare[op](actual, target)
+        })
+    return checks
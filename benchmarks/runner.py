@@ -0,0 +1,119 @@
+"""Timing, result files and baseline comparison for benchmarks"""
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional
+
+DEFAULT_SIZES = [1, 10, 100, 1000, 10000, 100000]
+
+
+def measure(run: Callable[[], Any], min_time: float = 0.5, min_repeats: int = 3,
+            max_repeats: int = 50) -> List[float]:
+    """Wall-clock timings of ``run``; one call is enough if it takes over ``min_time``"""
+    timings = []
+    while len(timings) < max_repeats:
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+        if timings[0] >= min_time:
+            break
+        if len(timings) >= min_repeats and sum(timings) >= min_time:
+            break
+    return timings
+
+
+def summarize(name: str, batch_size: int, timings: List[float]) -> Dict[str, Any]:
+    median = statistics.median(timings)
+    return {
+        "name": name,
+        "batch_size": batch_size,
+        "repeats": len(timings),
+        "median_seconds": median,
+        "min_seconds": min(timings),
+        "mean_seconds": statistics.fmean(timings),
+        "rows_per_second": batch_size / median if median > 0 else None
+    }
+
+
+def run_cases(cases: Dict[str, Callable[[int], Callable[[], Any]]], sizes: List[int],
+              max_seconds: float = 60.0, log: Optional[Callable[[str], None]] = print) -> List[Dict[str, Any]]:
+    """Run every case at every size.
+    
+    ``cases`` maps a name to a factory that prepares inputs for one size and
+    returns the zero-argument callable to time. Larger sizes of a case are
+    skipped once the projected time of a single call exceeds ``max_seconds``.
+    """
+    results = []
+    for name, prepare in cases.items():
+        previous = None
+        for size in sorted(sizes):
+            if previous and previous[1] * size / previous[0] > max_seconds:
+                if log:
+                    log(f"{name:<40} {size:>7}  skipped (projected > {max_seconds:.0f}s)")
+                continue
+            run = prepare(size)
+            result = summarize(name, size, measure(run))
+            results.append(result)
+            previous = (size, result["median_seconds"])
+            if log:
+                log(
+                    f"{name:<40} {size:>7}  {result['median_seconds'] * 1000:>10.3f} ms"
+                    f"  {result['rows_per_second']:>12,.0f} rows/s  ({result['repeats']} runs)"
+                )
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def save_results(results: List[Dict[str, Any]], path: str, extra: Optional[Dict[str, Any]] = None):
+    payload = {
+        "meta": {
+            "created_at": datetime.now().isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            **(extra or {})
+        },
+        "results": results
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+
+
+def load_results(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+            threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """Median-time ratio against the baseline for every case/size present in both.
+    
+    A ratio above ``1 + threshold`` is flagged as a regression.
+    """
+    reference = {(r["name"], r["batch_size"]): r for r in baseline}
+    rows = []
+    for result in results:
+        base = reference.get((result["name"], result["batch_size"]))
+        if base is None or base["median_seconds"] <= 0:
+            continue
+        ratio = result["median_seconds"] / base["median_seconds"]
+        rows.append({
+            "name": result["name"],
+            "batch_size": result["batch_size"],
+            "baseline_seconds": base["median_seconds"],
+            "current_seconds": result["median_seconds"],
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold
+        })
+    return rows
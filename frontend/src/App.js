@@ -42,7 +42,7 @@ function App() {
   const [error, setError] = useState(null);
   const [prediction, setPrediction] = useState(null);
   const [models, setModels] = useState([]);
-  const [metrics, setMetrics] = useState(null);
+  const [live, setLive] = useState(null);
   const [customerData, setCustomerData] = useState({
     customer_id: 'CUST_00001',
     age: 45,
@@ -68,7 +68,12 @@ function App() {
 
   useEffect(() => {
     loadModels();
-    loadMetrics();
+
+    // Live aggregates are pushed by the API; EventSource reconnects on its own
+    const source = new EventSource(`${API_URL}/api/v1/metrics/stream`);
+    source.addEventListener('metrics', (event) => setLive(JSON.parse(event.data)));
+    source.onerror = (err) => console.error('Live metrics stream interrupted:', err);
+    return () => source.close();
   }, []);
 
   const loadModels = async () => {
@@ -80,15 +85,6 @@ function App() {
     }
   };
 
-  const loadMetrics = async () => {
-    try {
-      const response = await axios.get(`${API_URL}/api/v1/metrics`);
-      setMetrics(response.data);
-    } catch (err) {
-      console.error('Failed to load metrics:', err);
-    }
-  };
-
   const handlePredict = async () => {
     setLoading(true);
     setError(null);
@@ -111,13 +107,26 @@ function App() {
     }));
   };
 
-  const metricsData = metrics?.metrics
-    ? Object.entries(metrics.metrics).map(([name, value]) => ({
+  const versions = live ? Object.keys(live.realized_metrics) : [];
+  const realizedData = versions.length
+    ? ['accuracy', 'precision', 'recall', 'f1_score', 'roc_auc'].map((name) => ({
         name,
-        value: (value * 100).toFixed(2),
+        ...Object.fromEntries(
+          versions.map((version) => [version, ((live.realized_metrics[version][name] || 0) * 100).toFixed(2)])
+        ),
       }))
     : [];
 
+  const scoreData = live
+    ? live.score_histogram.map((count, i) => ({
+        name: `${(i * 100) / live.score_histogram.length}%`,
+        count,
+      }))
+    : [];
+
+  const milliseconds = (seconds) => (seconds == null ? '-' : `${(seconds * 1000).toFixed(1)} ms`);
+  const barColors = ['#8884d8', '#82ca9d', '#ffc658', '#ff8042'];
+
   return (
     <Container maxWidth="lg" sx={{ mt: 4, mb: 4 }}>
       <Typography variant="h3" component="h1" gutterBottom>
@@ -324,25 +333,112 @@ function App() {
       )}
 
       {tab === 2 && (
-        <Paper sx={{ p: 3 }}>
-          <Typography variant="h5" gutterBottom>
-            Model Performance Metrics
-          </Typography>
-          {metrics && (
-            <Box sx={{ mt: 2, height: 400 }}>
-              <ResponsiveContainer width="100%" height="100%">
-                <BarChart data={metricsData}>
-                  <CartesianGrid strokeDasharray="3 3" />
-                  <XAxis dataKey="name" />
-                  <YAxis />
-                  <Tooltip />
-                  <Legend />
-                  <Bar dataKey="value" fill="#8884d8" />
-                </BarChart>
-              </ResponsiveContainer>
-            </Box>
-          )}
-        </Paper>
+        <Grid container spacing={3}>
+          <Grid item xs={12}>
+            <Paper sx={{ p: 3 }}>
+              <Typography variant="h5" gutterBottom>
+                Live Traffic
+              </Typography>
+              {live && (
+                <Grid container spacing={2}>
+                  {[
+                    ['Requests / s', live.request_rate.toFixed(2)],
+                    ['Error rate', `${(live.error_rate * 100).toFixed(2)}%`],
+                    ['p50 latency', milliseconds(live.latency.p50)],
+                    ['p95 latency', milliseconds(live.latency.p95)],
+                    ['p99 latency', milliseconds(live.latency.p99)],
+                  ].map(([label, value]) => (
+                    <Grid item xs={6} md key={label}>
+                      <Card>
+                        <CardContent>
+                          <Typography variant="body2" color="text.secondary">
+                            {label}
+                          </Typography>
+                          <Typography variant="h6">{value}</Typography>
+                        </CardContent>
+                      </Card>
+                    </Grid>
+                  ))}
+                </Grid>
+              )}
+              {live && (
+                <Typography variant="body2" color="text.secondary" sx={{ mt: 1 }}>
+                  Last {live.window_seconds}s, updated {new Date(`${live.timestamp}Z`).toLocaleTimeString()}
+                </Typography>
+              )}
+            </Paper>
+          </Grid>
+
+          <Grid item xs={12} md={6}>
+            <Paper sx={{ p: 3 }}>
+              <Typography variant="h5" gutterBottom>
+                Score Distribution
+              </Typography>
+              <Box sx={{ mt: 2, height: 300 }}>
+                <ResponsiveContainer width="100%" height="100%">
+                  <BarChart data={scoreData}>
+                    <CartesianGrid strokeDasharray="3 3" />
+                    <XAxis dataKey="name" />
+                    <YAxis />
+                    <Tooltip />
+                    <Bar dataKey="count" fill="#8884d8" />
+                  </BarChart>
+                </ResponsiveContainer>
+              </Box>
+            </Paper>
+          </Grid>
+
+          <Grid item xs={12} md={6}>
+            <Paper sx={{ p: 3 }}>
+              <Typography variant="h5" gutterBottom>
+                Traffic Split
+              </Typography>
+              <TableContainer>
+                <Table>
+                  <TableHead>
+                    <TableRow>
+                      <TableCell>Version</TableCell>
+                      <TableCell>Predictions</TableCell>
+                      <TableCell>Share</TableCell>
+                    </TableRow>
+                  </TableHead>
+                  <TableBody>
+                    {live &&
+                      Object.entries(live.versions).map(([version, split]) => (
+                        <TableRow key={version}>
+                          <TableCell>{version}</TableCell>
+                          <TableCell>{split.predictions}</TableCell>
+                          <TableCell>{(split.share * 100).toFixed(1)}%</TableCell>
+                        </TableRow>
+                      ))}
+                  </TableBody>
+                </Table>
+              </TableContainer>
+            </Paper>
+          </Grid>
+
+          <Grid item xs={12}>
+            <Paper sx={{ p: 3 }}>
+              <Typography variant="h5" gutterBottom>
+                Realized Performance
+              </Typography>
+              <Box sx={{ mt: 2, height: 400 }}>
+                <ResponsiveContainer width="100%" height="100%">
+                  <BarChart data={realizedData}>
+                    <CartesianGrid strokeDasharray="3 3" />
+                    <XAxis dataKey="name" />
+                    <YAxis />
+                    <Tooltip />
+                    <Legend />
+                    {versions.map((version, i) => (
+                      <Bar key={version} dataKey={version} fill={barColors[i % barColors.length]} />
+                    ))}
+                  </BarChart>
+                </ResponsiveContainer>
+              </Box>
+            </Paper>
+          </Grid>
+        </Grid>
       )}
     </Container>
   );
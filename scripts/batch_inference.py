@@ -1,4 +1,5 @@
 """Batch inference script"""
+import asyncio
 import sys
 import pandas as pd
 from pathlib import Path
@@ -6,19 +7,63 @@ from typing import List
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from app.database import dispose_async_engines
 from app.services.prediction_service import PredictionService
 from app.schemas import CustomerFeatures
+from app.feature_store.offline import OfflineFeatureStore
+
+
+async def predict(customers: List[CustomerFeatures], store_scores: bool = False) -> pd.DataFrame:
+    """Score customers, closing the async database connections afterwards"""
+    try:
+        service = PredictionService()
+        if store_scores:
+            response = await service.precompute_scores(customers)
+            print(f"Stored {response['stored']} scores for {response['model_version']}")
+            return pd.DataFrame({
+                'customer_id': response['customer_ids'],
+                'prediction': response['predictions'],
+                'probability': response['probabilities'],
+                'model_version': response['model_version']
+            })
+        predictions = await service.predict_batch(customers)
+        return pd.DataFrame([
+            {
+                'customer_id': p.customer_id,
+                'prediction': p.prediction,
+                'probability': p.probability,
+                'model_version': p.model_version
+            }
+            for p in predictions
+        ])
+    finally:
+        await dispose_async_engines()
 
 
 def main():
     """Run batch inference"""
-    # Load data
-    data_path = Path("data/raw/customer_data.csv")
-    if not data_path.exists():
-        print("Data file not found!")
-        return
+    import argparse
     
-    df = pd.read_csv(data_path)
+    parser = argparse.ArgumentParser(description="Score customers with the active model")
+    parser.add_argument("--source", choices=["csv", "store"], default="csv",
+                        help="Raw customer CSV, or the latest features in the offline feature store")
+    parser.add_argument("--as-of", default=None, help="With --source store: score features as of this time")
+    parser.add_argument("--store-scores", action="store_true",
+                        help="Also keep the scores in customer_scores for read-through serving and top-K")
+    args = parser.parse_args()
+    
+    # Load data
+    if args.source == "store":
+        df = OfflineFeatureStore().latest(as_of=args.as_of)
+        if df.empty:
+            print("No features in the offline feature store!")
+            return
+    else:
+        data_path = Path("data/raw/customer_data.csv")
+        if not data_path.exists():
+            print("Data file not found!")
+            return
+        df = pd.read_csv(data_path)
     
     # Convert to CustomerFeatures
     customers = []
@@ -49,19 +94,9 @@ def main():
     
     # Run batch prediction
     print(f"Running batch inference on {len(customers)} customers...")
-    service = PredictionService()
-    predictions = service.predict_batch(customers)
+    results = asyncio.run(predict(customers, args.store_scores))
     
     # Save results
-    results = pd.DataFrame([
-        {
-            'customer_id': p.customer_id,
-            'prediction': p.prediction,
-            'probability': p.probability,
-            'model_version': p.model_version
-        }
-        for p in predictions
-    ])
     
     output_path = Path("data/predictions/batch_predictions.csv")
     output_path.parent.mkdir(parents=True, exist_ok=True)
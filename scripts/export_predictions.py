@@ -0,0 +1,48 @@
+"""Export logged predictions to Parquet or CSV for offline analysis"""
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.prediction_export import PredictionExporter, PARTITION_KEYS
+
+
+def main():
+    """Stream predictions to a file, or to a directory partitioned by day and/or model version"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Export predictions with a server-side cursor")
+    parser.add_argument("output", help="Output file, or directory when partitioning")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet",
+                        help="File format (default: parquet)")
+    parser.add_argument("--start", type=datetime.fromisoformat,
+                        help="Only predictions at or after this time (ISO 8601)")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="Only predictions before this time (ISO 8601)")
+    parser.add_argument("--model-version", help="Only predictions of this model version")
+    parser.add_argument("--partition-by", nargs="+", choices=list(PARTITION_KEYS), default=[],
+                        help="Write one directory level per key: day and/or model_version")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Rows fetched and written at a time")
+    
+    args = parser.parse_args()
+    
+    exporter = PredictionExporter(chunk_size=args.chunk_size)
+    print(f"Exporting predictions to {args.output}...")
+    try:
+        report = exporter.write(
+            args.output,
+            file_format=args.format,
+            partition_by=args.partition_by,
+            start=args.start,
+            end=args.end,
+            model_version=args.model_version
+        )
+    except ValueError as e:
+        print(f"Export failed: {e}")
+        sys.exit(1)
+    
+    print(f"Wrote {report['rows']} predictions to {report['files']} file(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Bulk-apply ground-truth churn labels to logged predictions"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.label_service import LabelIngestionService
+
+
+def main():
+    """Ingest a label file"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Ingest ground-truth labels from CSV or Parquet")
+    parser.add_argument("path", help="Label file (.csv or .parquet)")
+    parser.add_argument("--format", choices=["csv", "parquet"], help="File format (default: from extension)")
+    parser.add_argument("--customer-id-column", default="customer_id", help="Customer id column name")
+    parser.add_argument("--timestamp-column", default="timestamp", help="Label timestamp column name")
+    parser.add_argument("--label-column", default="label", help="Churn label column name")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Rows read per chunk")
+    
+    args = parser.parse_args()
+    
+    if not Path(args.path).exists():
+        print(f"Label file {args.path} not found!")
+        return
+    
+    service = LabelIngestionService(
+        customer_id_column=args.customer_id_column,
+        timestamp_column=args.timestamp_column,
+        label_column=args.label_column,
+        chunk_size=args.chunk_size
+    )
+    print(f"Ingesting labels from {args.path}...")
+    report = service.ingest_file(args.path, args.format)
+    
+    print(f"Labels received: {report['labels_received']} ({report['labels_rejected']} rejected)")
+    print(f"Match rate: {report['match_rate']:.2%} ({report['labels_matched']} of {report['labels_staged']})")
+    print(f"Predictions updated: {report['predictions_updated']}")
+    print(f"Ingestion rate: {report['labels_per_second']:.0f} labels/s in {report['duration_seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
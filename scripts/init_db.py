@@ -4,16 +4,19 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.database import Base, engine
-from app.models import Prediction, ModelMetrics, ModelVersion
+from alembic import command
+from alembic.config import Config
+
+ROOT = Path(__file__).parent.parent
+
 
 def init_db():
-    """Initialize database tables"""
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    """Create or upgrade database tables with the Alembic migrations"""
+    print("Running database migrations...")
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    command.upgrade(config, "head")
     print("Database initialized successfully!")
 
 if __name__ == "__main__":
     init_db()
-
-
@@ -0,0 +1,32 @@
+"""Bulk-load customer features into a new online feature store snapshot"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.feature_store.online import build_snapshot, read_features, online_store_path
+
+
+def main():
+    """Build a snapshot from a feature file and make it the served one"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Load customer features into the online feature store")
+    parser.add_argument("path", help="Feature file (.csv or .parquet) with customer_id and the 19 feature columns")
+    parser.add_argument("--store", default=None, help="Online store directory (default: <FEATURE_STORE_PATH>/online)")
+    
+    args = parser.parse_args()
+    
+    if not Path(args.path).exists():
+        print(f"Feature file {args.path} not found!")
+        return
+    
+    print(f"Loading features from {args.path}...")
+    meta = build_snapshot(read_features(args.path), args.store)
+    
+    print(f"Snapshot {meta['snapshot']} written to {args.store or online_store_path()}")
+    print(f"Customers: {meta['rows']} ({meta['rejected']} rejected)")
+
+
+if __name__ == "__main__":
+    main()
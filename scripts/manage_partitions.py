@@ -0,0 +1,50 @@
+"""Maintain time-range partitions of the predictions table"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import engine
+from app.services.partition_manager import PredictionPartitionManager
+
+
+def list_partitions(manager: PredictionPartitionManager):
+    """Print existing monthly partitions"""
+    with engine.connect() as conn:
+        if not manager.is_partitioned(conn):
+            print("Predictions table is not partitioned (run alembic upgrade on PostgreSQL)")
+            return
+        for partition in manager.list_partitions(conn):
+            print(f"{partition['name']}: {partition['start']:%Y-%m-%d} to {partition['end']:%Y-%m-%d}")
+
+
+def run_maintenance(manager: PredictionPartitionManager):
+    """Create upcoming partitions and drop expired ones"""
+    result = manager.run_maintenance()
+    if not result["partitioned"]:
+        print("Predictions table is not partitioned (run alembic upgrade on PostgreSQL)")
+        return
+    if result.get("skipped"):
+        print("Maintenance already running in another process")
+        return
+    print(f"Created partitions: {', '.join(result['created']) or 'none'}")
+    if result["rows_moved"]:
+        print(f"Moved {result['rows_moved']} rows from the default partition into new partitions")
+    print(f"Dropped partitions: {', '.join(result['dropped']) or 'none'}")
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Manage prediction table partitions")
+    parser.add_argument("action", choices=["list", "maintain"], help="Action to perform")
+    parser.add_argument("--months-ahead", type=int, default=None, help="Months of future partitions to keep ready")
+    parser.add_argument("--retention-days", type=int, default=None, help="Drop partitions older than this (0 keeps all)")
+    
+    args = parser.parse_args()
+    manager = PredictionPartitionManager(args.months_ahead, args.retention_days)
+    
+    if args.action == "list":
+        list_partitions(manager)
+    elif args.action == "maintain":
+        run_maintenance(manager)
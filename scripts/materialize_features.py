@@ -0,0 +1,34 @@
+"""Materialize customer features into the offline feature store"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.feature_store.offline import OfflineFeatureStore
+from app.feature_store.online import read_features
+
+
+def main():
+    """Append a feature file to the date-partitioned Parquet store"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Materialize customer features as date-partitioned Parquet")
+    parser.add_argument("path", help="Feature file (.csv or .parquet) with customer_id and the feature columns")
+    parser.add_argument("--as-of", default=None,
+                        help="Observation time of rows without a feature_timestamp column (default: now)")
+    parser.add_argument("--store", default=None, help="Offline store directory (default: <FEATURE_STORE_PATH>/offline)")
+    
+    args = parser.parse_args()
+    
+    if not Path(args.path).exists():
+        print(f"Feature file {args.path} not found!")
+        return
+    
+    store = OfflineFeatureStore(args.store)
+    rows = store.materialize(read_features(args.path), as_of=args.as_of)
+    print(f"Materialized {rows} feature rows into {store.root}")
+    print(f"Partitions: {', '.join(store.partitions())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Reconstruct readable features of logged predictions"""
+import sys
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app.models import Prediction
+from app.services.feature_log import read_prediction_features
+
+
+def main():
+    """Write logged predictions with decoded features to CSV"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Decode logged prediction features for analysis")
+    parser.add_argument("--model-version", help="Only predictions of this model version")
+    parser.add_argument("--customer-id", help="Only predictions of this customer")
+    parser.add_argument("--limit", type=int, default=10000, help="Maximum number of predictions (default: 10000)")
+    parser.add_argument("--output", default="data/predictions/prediction_features.csv", help="Output CSV path")
+    
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        query = db.query(Prediction)
+        if args.model_version:
+            query = query.filter(Prediction.model_version == args.model_version)
+        if args.customer_id:
+            query = query.filter(Prediction.customer_id == args.customer_id)
+        predictions = query.order_by(Prediction.timestamp.desc()).limit(args.limit).all()
+        features = read_prediction_features(db, predictions)
+    finally:
+        db.close()
+    
+    rows = [
+        {
+            **(f or {}),
+            "customer_id": p.customer_id,
+            "prediction": p.prediction,
+            "probability": p.probability,
+            "model_version": p.model_version,
+            "timestamp": p.timestamp,
+            "is_churn": p.is_churn
+        }
+        for p, f in zip(predictions, features)
+    ]
+    
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(rows).to_csv(output_path, index=False)
+    print(f"Wrote {len(rows)} predictions to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Run the hot-path microbenchmarks and compare them against a baseline"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def main():
+    """Run benchmarks offline against SQLite and a local model file"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Benchmark the serving hot paths")
+    parser.add_argument("--sizes", default="1,10,100,1000,10000,100000", help="Comma-separated batch sizes")
+    parser.add_argument("--cases", default=None, help="Comma-separated case names (default: all)")
+    parser.add_argument("--model", choices=["compact", "sklearn"], default="compact", help="Serving artifact")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write results")
+    parser.add_argument("--baseline", default=None, help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown vs baseline before failing (0.2 = 20%%)")
+    parser.add_argument("--max-seconds", type=float, default=60.0,
+                        help="Skip larger sizes of a case once one call is projected to exceed this")
+    parser.add_argument("--workdir", default=None, help="Scratch directory (default: a temporary one)")
+    
+    args = parser.parse_args()
+    if args.baseline and os.path.abspath(args.baseline) == os.path.abspath(args.output):
+        parser.error("--output must differ from --baseline, or the baseline is overwritten before the comparison")
+    
+    # Point the app at throwaway storage before its settings are imported
+    workdir = args.workdir or tempfile.mkdtemp(prefix="churn-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["MODEL_REGISTRY_PATH"] = os.path.join(workdir, "models")
+    os.environ["MLFLOW_TRACKING_URI"] = f"file://{os.path.join(workdir, 'mlruns')}"
+    
+    from benchmarks.runner import run_cases, save_results, load_results, compare
+    from benchmarks.hot_paths import prepare_environment, build_cases, close_environment
+    
+    sizes = [int(s) for s in args.sizes.split(",")]
+    baseline = load_results(args.baseline) if args.baseline else None
+    print(f"Preparing {args.model} model in {workdir}...")
+    prepare_environment(args.model)
+    cases = build_cases(max(sizes))
+    if args.cases:
+        selected = args.cases.split(",")
+        unknown = set(selected) - set(cases)
+        if unknown:
+            print(f"Unknown cases: {', '.join(sorted(unknown))}. Available: {', '.join(cases)}")
+            sys.exit(2)
+        cases = {name: cases[name] for name in selected}
+    
+    try:
+        results = run_cases(cases, sizes, max_seconds=args.max_seconds)
+    finally:
+        close_environment()
+    save_results(results, args.output, {"model": args.model, "sizes": sizes})
+    print(f"Results written to {args.output}")
+    
+    if baseline is not None:
+        rows = compare(results, baseline, args.threshold)
+        regressions = [row for row in rows if row["regression"]]
+        for row in rows:
+            marker = "REGRESSION" if row["regression"] else "ok"
+            print(
+                f"{row['name']:<40} {row['batch_size']:>7}  "
+                f"{row['baseline_seconds'] * 1000:>10.3f} -> {row['current_seconds'] * 1000:>10.3f} ms  "
+                f"x{row['ratio']:.2f}  {marker}"
+            )
+        if regressions:
+            print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
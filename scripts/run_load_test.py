@@ -0,0 +1,139 @@
+"""Replay open-loop load against the API and check latency SLOs"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.load import (
+    parse_mix, synthetic_requests, load_request_file, arrival_offsets,
+    run_load, build_report, check_slos
+)
+
+
+def start_app(port: int, workers: int, timeout: float = 120.0) -> subprocess.Popen:
+    """Start uvicorn on localhost and wait until it reports ready.
+    
+    Readiness (200 from /api/v1/health/ready) means models are loaded and
+    warmed up, so the measured load does not include cold-start requests.
+    With several workers this only tells that the answering worker is ready.
+    """
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=str(Path(__file__).parent.parent),
+        env=dict(os.environ)
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API exited with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/v1/health/ready", timeout=1.0).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError(f"API did not become ready within {timeout:.0f}s")
+
+
+def print_report(report: dict):
+    header = f"{'endpoint':<24}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'p999':>9}  (ms, corrected)"
+    print(header)
+    rows = list(report["endpoints"].items()) + [("overall", report["overall"])]
+    for kind, summary in rows:
+        if not summary["requests"]:
+            continue
+        print(
+            f"{kind:<24}{summary['requests']:>9}{summary['errors']:>8}{summary['throughput']:>9.1f}"
+            f"{summary['p50_ms']:>9.1f}{summary['p95_ms']:>9.1f}{summary['p99_ms']:>9.1f}{summary['p999_ms']:>9.1f}"
+        )
+    overall = report["overall"]
+    if overall["requests"]:
+        print(
+            f"Service-time p99 {overall['service_p99_ms']:.1f} ms vs corrected p99 {overall['p99_ms']:.1f} ms; "
+            f"max client send lag {report['max_send_lag_ms']:.1f} ms"
+        )
+
+
+def main():
+    """Run a load test"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Open-loop load replay with latency SLO checks")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Base URL of a running API")
+    parser.add_argument("--start-app", action="store_true", help="Start a local uvicorn for the run")
+    parser.add_argument("--port", type=int, default=8765, help="Port for --start-app")
+    parser.add_argument("--workers", type=int, default=1, help="Uvicorn workers for --start-app")
+    parser.add_argument("--requests-file", help="JSONL requests to replay (path, method, body, at)")
+    parser.add_argument("--rate", type=float, default=None, help="Arrival rate in requests/s")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of synthetic load")
+    parser.add_argument("--arrival", choices=["poisson", "constant"], default="poisson", help="Arrival process")
+    parser.add_argument("--mix", default="predict=0.8,batch=0.15,metrics=0.05",
+                        help="Synthetic endpoint mix (predict, batch, metrics)")
+    parser.add_argument("--batch-size", type=int, default=100, help="Customers per synthetic batch request")
+    parser.add_argument("--max-connections", type=int, default=200, help="Client connection limit")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--slo", action="append", default=[],
+                        help="SLO such as p99<=250ms, error_rate<=1%%, throughput>=50 or batch:p99<=2s (repeatable)")
+    parser.add_argument("--output", default=None, help="Write the full report (with histograms) as JSON")
+    
+    args = parser.parse_args()
+    
+    if args.requests_file:
+        entries = load_request_file(args.requests_file)
+        if not entries:
+            print(f"No requests in {args.requests_file}")
+            sys.exit(1)
+        if args.rate is None and all(at is not None for at, _ in entries):
+            offsets = [float(at) for at, _ in entries]
+        else:
+            offsets = arrival_offsets(len(entries), args.rate or 10.0, args.arrival)
+        schedule = sorted(zip(offsets, [spec for _, spec in entries]), key=lambda item: item[0])
+    else:
+        rate = args.rate or 10.0
+        n_requests = max(1, int(rate * args.duration))
+        specs = synthetic_requests(n_requests, parse_mix(args.mix), args.batch_size)
+        schedule = list(zip(arrival_offsets(n_requests, rate, args.arrival), specs))
+    
+    process = None
+    url = args.url
+    if args.start_app:
+        print(f"Starting API on port {args.port} with {args.workers} worker(s)...")
+        process = start_app(args.port, args.workers)
+        url = f"http://127.0.0.1:{args.port}"
+    
+    try:
+        print(f"Sending {len(schedule)} requests to {url} over {schedule[-1][0]:.1f}s...")
+        result = asyncio.run(run_load(url, schedule, args.max_connections, args.timeout))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    
+    report = build_report(result)
+    print_report(report)
+    
+    checks = check_slos(report, args.slo)
+    report["slos"] = checks
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    
+    for check in checks:
+        actual = "n/a" if check["actual"] is None else f"{check['actual']:.4g}"
+        print(f"SLO {check['slo']:<24} actual {actual:<12} {'PASS' if check['passed'] else 'FAIL'}")
+    if not all(check["passed"] for check in checks):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
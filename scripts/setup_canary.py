@@ -82,11 +82,38 @@ def promote_canary(model_version: str):
         db.close()
 
 
+def rollback_canary(model_version: str):
+    """Take a canary model out of rotation"""
+    db = SessionLocal()
+    try:
+        canary = db.query(ModelVersion).filter(
+            ModelVersion.version == model_version,
+            ModelVersion.status == "canary"
+        ).first()
+        
+        if not canary:
+            print(f"Canary model {model_version} not found!")
+            return False
+        
+        canary.status = "deprecated"
+        canary.traffic_percent = 0
+        db.commit()
+        
+        print(f"Canary model {model_version} rolled back")
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"Error rolling back canary: {e}")
+        return False
+    finally:
+        db.close()
+
+
 if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description="Manage canary deployments")
-    parser.add_argument("action", choices=["setup", "promote"], help="Action to perform")
+    parser.add_argument("action", choices=["setup", "promote", "rollback"], help="Action to perform")
     parser.add_argument("--version", required=True, help="Model version")
     parser.add_argument("--traffic", type=int, default=10, help="Traffic percentage for canary (default: 10)")
     
@@ -96,5 +123,7 @@ if __name__ == "__main__":
         setup_canary(args.version, args.traffic)
     elif args.action == "promote":
         promote_canary(args.version)
+    elif args.action == "rollback":
+        rollback_canary(args.version)
 
 
@@ -11,6 +11,25 @@ from app.ml.trainer import ModelTrainer
 
 def main():
     """Main training function"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Train a churn model")
+    parser.add_argument("--labels", default=None,
+                        help="Label file (customer_id, label_timestamp, churn) joined point-in-time "
+                             "to the offline feature store instead of reading the raw CSV")
+    parser.add_argument("--model-type", default="random_forest", choices=["random_forest", "gradient_boosting"])
+    args = parser.parse_args()
+    
+    trainer = ModelTrainer()
+    if args.labels:
+        from app.feature_store.online import read_features
+        labels = read_features(args.labels)
+        print(f"Joining {len(labels)} labels to the offline feature store...")
+        print("Training model...")
+        run_id = trainer.train_from_store(labels, model_type=args.model_type)
+        print(f"Model trained! MLflow run ID: {run_id}")
+        return
+    
     # Load data
     data_path = Path("data/raw/customer_data.csv")
     if not data_path.exists():
@@ -24,9 +43,8 @@ def main():
     print(f"Churn rate: {df['churn'].mean():.2%}")
     
     # Train model
-    trainer = ModelTrainer()
     print("Training model...")
-    run_id = trainer.train(df, model_type="random_forest")
+    run_id = trainer.train(df, model_type=args.model_type)
     print(f"Model trained! MLflow run ID: {run_id}")
     print(f"View in MLflow UI: http://localhost:5000")
 
@@ -1,10 +1,14 @@
 """Pytest configuration and fixtures"""
+import anyio
+import joblib
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
-from app.database import Base, engine, SessionLocal
+from app.database import Base, engine, SessionLocal, dispose_async_engines
 import pandas as pd
 from app.ml.trainer import ModelTrainer
+from app.config import settings
+from app.models import ModelVersion
 
 
 @pytest.fixture(scope="function")
@@ -21,8 +25,20 @@ def db_session():
 
 @pytest.fixture(scope="function")
 def client(db_session):
-    """Create a test client"""
-    return TestClient(app)
+    """Create a test client.
+    
+    All requests of a test share one event loop, whose async connection
+    pools are closed afterwards; a loop per request would leave a pool
+    open for every request.
+    """
+    client = TestClient(app)
+    with anyio.from_thread.start_blocking_portal(**client.async_backend) as portal:
+        client.portal = portal
+        try:
+            yield client
+        finally:
+            portal.call(dispose_async_engines)
+            client.portal = None
 
 
 @pytest.fixture
@@ -59,3 +75,38 @@ def sample_training_data():
     return generate_customer_data(n_samples=100)
 
 
+@pytest.fixture
+def register_model(db_session, tmp_path, monkeypatch):
+    """Factory that trains a small forest, saves its compact artifact and registers the version.
+    
+    Artifacts go to a temporary registry path and the process-wide model
+    pool starts empty, so versions never leak between tests.
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    from scripts.generate_data import generate_customer_data
+    from app.feature_store.transformer import FeatureTransformer
+    from app.ml.compression import compact_artifact_path
+    from app.ml.drift import build_reference, save_reference, drift_reference_path
+    from app.ml.model_pool import model_pool
+    
+    monkeypatch.setattr(settings, "model_registry_path", str(tmp_path))
+    model_pool.clear()
+    df = generate_customer_data(n_samples=300)
+    features = df.drop("churn", axis=1)
+    X = FeatureTransformer().transform_batch(features)
+    
+    def register(version, status="active", traffic_percent=100, run_id=None, seed=0, drift_reference=False):
+        run_id = run_id or f"run_{version}"
+        model = RandomForestClassifier(n_estimators=5, max_depth=4, random_state=seed).fit(X, df["churn"])
+        joblib.dump(model, compact_artifact_path(run_id))
+        if drift_reference:
+            save_reference(build_reference(features), drift_reference_path(run_id))
+        db_session.add(ModelVersion(
+            version=version, model_type="random_forest", status=status,
+            traffic_percent=traffic_percent, mlflow_run_id=run_id
+        ))
+        db_session.commit()
+        return model
+    
+    return register
+
@@ -0,0 +1,91 @@
+"""Unit tests for admission control"""
+import asyncio
+import time
+import pytest
+from app.admission import (
+    AdmissionController, DeadlineExceeded, Lane, Overloaded, admission_controller, check_deadline
+)
+from app.models import Prediction
+
+
+def test_lane_queues_rows_until_budget_frees():
+    """Requests beyond the row budget wait in FIFO order and are admitted as rows are released"""
+    async def scenario():
+        lane = Lane("batch", capacity=10, max_queued_rows=100)
+        deadline = time.perf_counter() + 5
+        await lane.acquire(8, deadline)
+        waiting = asyncio.ensure_future(lane.acquire(5, deadline))
+        await asyncio.sleep(0)
+        assert not waiting.done() and lane.queued_rows == 5
+        
+        lane.release(8, 0.08)
+        await waiting
+        assert lane.in_flight == 5 and lane.queued_rows == 0
+        assert lane.seconds_per_row == pytest.approx(0.01)
+        
+        # A request larger than the whole budget runs once the lane is idle
+        oversized = asyncio.ensure_future(lane.acquire(50, deadline))
+        await asyncio.sleep(0)
+        assert not oversized.done()
+        lane.release(5, 0.0)
+        await oversized
+        assert lane.in_flight == 50
+    
+    asyncio.run(scenario())
+
+
+def test_lane_sheds_load_it_cannot_serve_in_time():
+    """Estimated waits beyond the deadline are rejected up front; queued work expires at the deadline"""
+    async def scenario():
+        lane = Lane("interactive", capacity=2, max_queued_rows=4)
+        await lane.acquire(2, time.perf_counter() + 1)
+        
+        lane.seconds_per_row = 0.5
+        with pytest.raises(Overloaded) as rejected:
+            await lane.acquire(1, time.perf_counter() + 0.1)
+        assert rejected.value.retry_after == pytest.approx(0.5)
+        assert rejected.value.retry_after_header == "1"
+        
+        lane.seconds_per_row = 0.0
+        with pytest.raises(Overloaded):
+            await lane.acquire(5, time.perf_counter() + 1)
+        with pytest.raises(DeadlineExceeded):
+            await lane.acquire(1, time.perf_counter() + 0.01)
+        assert lane.queued_rows == 0 and lane.in_flight == 2
+    
+    asyncio.run(scenario())
+
+
+def test_deadline_propagates_to_the_service():
+    """Work inside an admitted block sees the request deadline"""
+    async def scenario():
+        controller = AdmissionController()
+        async with controller.admit("interactive", 1, "0"):
+            with pytest.raises(DeadlineExceeded):
+                check_deadline()
+        check_deadline()  # no deadline outside a request
+    
+    asyncio.run(scenario())
+
+
+def test_prediction_routes_shed_load(client, register_model, db_session, sample_customer_data):
+    """Overloaded lanes answer 429 with Retry-After, and expired requests skip inference"""
+    register_model("admission_v1")
+    admission_controller.reset()
+    batch = admission_controller.lane("batch")
+    
+    expired = client.post(
+        "/api/v1/predict", json={"customer": sample_customer_data}, headers={"X-Request-Timeout-Ms": "0"}
+    )
+    assert expired.status_code == 504
+    assert db_session.query(Prediction).count() == 0
+    
+    batch.in_flight, batch.seconds_per_row = batch.capacity, 60.0
+    try:
+        shed = client.post("/api/v1/predict/batch", json={"customers": [sample_customer_data]})
+        interactive = client.post("/api/v1/predict", json={"customer": sample_customer_data})
+    finally:
+        admission_controller.reset()
+    assert shed.status_code == 429 and shed.headers["Retry-After"] == "60"
+    # The interactive lane has its own budget
+    assert interactive.status_code == 200
@@ -0,0 +1,131 @@
+"""Unit tests for asynchronous batch scoring jobs"""
+import asyncio
+import io
+import os
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+import pytest
+from app.config import settings
+from app.database import dispose_async_engines
+from app.models import BatchJob
+from app.services.batch_jobs import BatchJobWorker, result_path
+
+
+@pytest.fixture
+def job_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "batch_jobs_path", str(tmp_path / "jobs"))
+    monkeypatch.setattr(settings, "batch_job_input_root", str(tmp_path / "inputs"))
+    (tmp_path / "inputs").mkdir()
+    return tmp_path
+
+
+def run_worker(worker=None):
+    """Process one job on a fresh event loop, as a background worker would"""
+    async def run():
+        try:
+            return await (worker or BatchJobWorker()).run_once()
+        finally:
+            await dispose_async_engines()
+    return asyncio.run(run())
+
+
+def test_inline_job_is_scored_in_chunks(client, register_model, job_paths, sample_customer_data):
+    """A submitted job returns at once, then a worker scores it chunk by chunk"""
+    register_model("jobs_v1")
+    customers = [dict(sample_customer_data, customer_id=f"CUST_{i}", tenure=i) for i in range(5)]
+    
+    submitted = client.post("/api/v1/jobs", json={"customers": customers, "chunk_size": 2})
+    assert submitted.status_code == 202
+    job = submitted.json()
+    assert job["status"] == "queued" and job["total_rows"] == 5 and job["progress"] == 0
+    
+    assert run_worker() == job["id"]
+    assert run_worker() is None
+    
+    status = client.get(f"/api/v1/jobs/{job['id']}").json()
+    assert status["status"] == "succeeded" and status["chunks_done"] == 3
+    assert status["processed_rows"] == 5 and status["progress"] == 1.0
+    
+    download = client.get(f"/api/v1/jobs/{job['id']}/results")
+    assert download.headers["x-job-status"] == "succeeded"
+    results = pd.read_csv(io.StringIO(download.text))
+    direct = client.post("/api/v1/predict/batch", json={"customers": customers}).json()["predictions"]
+    assert list(results["customer_id"]) == [c["customer_id"] for c in customers]
+    assert list(results["probability"]) == pytest.approx([p["probability"] for p in direct])
+    assert set(results["model_version"]) == {"jobs_v1"}
+    assert client.get("/api/v1/jobs/missing").status_code == 404
+
+
+def test_file_job_resumes_after_worker_loss(client, register_model, db_session, job_paths, sample_customer_data):
+    """Jobs read files only under the input root, skip invalid rows and continue after a stale worker"""
+    register_model("jobs_v1")
+    rows = [dict(sample_customer_data, customer_id=f"CUST_{i}") for i in range(6)]
+    rows[4]["gender"] = "Unknown"
+    pd.DataFrame(rows).to_csv(job_paths / "inputs" / "customers.csv", index=False)
+    
+    outside = client.post("/api/v1/jobs", json={"path": "../secret.csv"})
+    assert outside.status_code == 400
+    assert client.post("/api/v1/jobs", json={}).status_code == 422
+    job_id = client.post("/api/v1/jobs", json={"path": "customers.csv", "chunk_size": 3}).json()["id"]
+    
+    # A worker that died after its first chunk: stale heartbeat, one result file written
+    stale = datetime.now(timezone.utc) - timedelta(seconds=settings.batch_job_stale_seconds + 60)
+    db_session.query(BatchJob).filter(BatchJob.id == job_id).update({
+        "status": "running", "worker_id": "gone", "heartbeat_at": stale,
+        "chunks_done": 1, "processed_rows": 3, "total_rows": 6
+    })
+    db_session.commit()
+    first_chunk = pd.DataFrame({
+        "customer_id": ["CUST_0", "CUST_1", "CUST_2"], "prediction": [0.0] * 3,
+        "probability": [0.5] * 3, "model_version": ["jobs_v1"] * 3
+    })
+    os.makedirs(os.path.dirname(result_path(job_id, 0)))
+    first_chunk.to_parquet(result_path(job_id, 0), index=False)
+    
+    assert run_worker() == job_id
+    
+    status = client.get(f"/api/v1/jobs/{job_id}").json()
+    assert status["status"] == "succeeded" and status["chunks_done"] == 2
+    assert status["processed_rows"] == 5 and status["rejected_rows"] == 1
+    results = pd.read_csv(io.StringIO(client.get(f"/api/v1/jobs/{job_id}/results").text))
+    assert list(results["customer_id"]) == ["CUST_0", "CUST_1", "CUST_2", "CUST_3", "CUST_5"]
+    assert list(results["probability"][:3]) == [0.5] * 3  # earlier chunk kept, not rescored
+
+
+def test_failed_job_can_be_resumed(client, register_model, job_paths, sample_customer_data):
+    """A job pinned to an unknown version fails; resuming queues it again"""
+    register_model("jobs_v1")
+    job_id = client.post(
+        "/api/v1/jobs", json={"customers": [sample_customer_data], "model_version": "nope"}
+    ).json()["id"]
+    
+    run_worker()
+    failed = client.get(f"/api/v1/jobs/{job_id}").json()
+    assert failed["status"] == "failed" and "nope" in failed["error"]
+    
+    resumed = client.post(f"/api/v1/jobs/{job_id}/resume")
+    assert resumed.status_code == 200 and resumed.json()["status"] == "queued"
+    assert client.post(f"/api/v1/jobs/{job_id}/resume").status_code == 409
+
+
+def test_numeric_ids_are_scored_and_invalid_chunks_fail(client, register_model, job_paths, sample_customer_data):
+    """Numeric customer ids in CSV and Parquet inputs are read as strings; a chunk of invalid rows fails the job"""
+    register_model("jobs_v1")
+    rows = pd.DataFrame([dict(sample_customer_data, customer_id=12345 + i) for i in range(3)])
+    rows.to_csv(job_paths / "inputs" / "numeric.csv", index=False)
+    rows.to_parquet(job_paths / "inputs" / "numeric.parquet", index=False)
+    rows.assign(gender="Unknown").to_csv(job_paths / "inputs" / "invalid.csv", index=False)
+    
+    for name in ("numeric.csv", "numeric.parquet"):
+        job_id = client.post("/api/v1/jobs", json={"path": name}).json()["id"]
+        assert run_worker() == job_id
+        status = client.get(f"/api/v1/jobs/{job_id}").json()
+        assert status["status"] == "succeeded" and status["processed_rows"] == 3 and status["rejected_rows"] == 0
+        results = pd.read_csv(io.StringIO(client.get(f"/api/v1/jobs/{job_id}/results").text), dtype=str)
+        assert list(results["customer_id"]) == ["12345", "12346", "12347"]
+    
+    job_id = client.post("/api/v1/jobs", json={"path": "invalid.csv", "chunk_size": 2}).json()["id"]
+    run_worker()
+    failed = client.get(f"/api/v1/jobs/{job_id}").json()
+    assert failed["status"] == "failed" and failed["chunks_done"] == 0
+    assert "row 1: gender" in failed["error"]
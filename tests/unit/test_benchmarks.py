@@ -0,0 +1,43 @@
+"""Unit tests for the benchmark runner"""
+from benchmarks.runner import measure, run_cases, save_results, load_results, compare
+
+
+def test_run_cases_skips_sizes_projected_over_budget():
+    """Sizes whose projected duration exceeds the budget are skipped"""
+    calls = []
+    
+    def prepare(n):
+        def run():
+            calls.append(n)
+            sum(range(n * 1000))
+        return run
+    
+    results = run_cases({"sum": prepare}, [1, 10, 10 ** 6], max_seconds=0.5, log=None)
+    
+    assert [r["batch_size"] for r in results] == [1, 10]
+    assert 10 ** 6 not in calls
+    assert all(r["repeats"] >= 3 and r["rows_per_second"] > 0 for r in results)
+
+
+def test_compare_flags_regressions(tmp_path):
+    """Cases slower than the threshold are flagged; new cases are ignored"""
+    baseline = [
+        {"name": "a", "batch_size": 1, "median_seconds": 1.0},
+        {"name": "b", "batch_size": 1, "median_seconds": 1.0},
+    ]
+    path = str(tmp_path / "baseline.json")
+    save_results(baseline, path)
+    current = [
+        {"name": "a", "batch_size": 1, "median_seconds": 1.1},
+        {"name": "b", "batch_size": 1, "median_seconds": 1.5},
+        {"name": "c", "batch_size": 1, "median_seconds": 9.0},
+    ]
+    
+    rows = compare(current, load_results(path), threshold=0.2)
+    
+    assert [(r["name"], r["regression"]) for r in rows] == [("a", False), ("b", True)]
+
+
+def test_measure_stops_after_one_slow_call():
+    """A single call over min_time is not repeated"""
+    assert len(measure(lambda: None, min_time=0.0)) == 1
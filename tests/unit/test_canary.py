@@ -0,0 +1,138 @@
+"""Unit tests for streaming sequential canary analysis"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pytest
+from app.config import settings
+from app.database import dispose_async_engines, engine
+from app.ml.canary import CanaryAnalyzer, canary_analyzer
+from app.models import ModelVersion, Prediction
+from app.services.canary_service import CanaryService
+from app.services.performance_monitor import PerformanceMonitor
+
+
+@pytest.fixture(autouse=True)
+def fresh_analyzer():
+    canary_analyzer.reset()
+    yield
+    canary_analyzer.reset()
+
+
+def outcomes(n, churn_rate=0.3, noise=0.2, seed=0):
+    """Probabilities and labels of a model whose scores are off by up to ``noise``"""
+    rng = np.random.default_rng(seed)
+    actual = rng.random(n) < churn_rate
+    probabilities = np.clip(np.where(actual, 0.7, 0.3) + rng.uniform(-noise, noise, n), 0, 1)
+    return probabilities, actual
+
+
+def test_worse_canary_is_rolled_back():
+    """A canary with clearly higher loss gets a significant rollback"""
+    analyzer = CanaryAnalyzer()
+    analyzer.observe_outcomes("v1", *outcomes(5000, noise=0.1))
+    analyzer.observe_outcomes("v2", *outcomes(5000, noise=0.5, seed=1))
+    
+    report = analyzer.analyze("v1", "v2")
+    
+    assert report["recommendation"] == "rollback"
+    assert report["test"]["p_value"] < settings.canary_alpha
+    assert report["test"]["lower"] > settings.canary_noninferiority_margin
+    assert report["versions"]["v2"]["brier_score"] > report["versions"]["v1"]["brier_score"]
+
+
+def test_equivalent_canary_is_promoted_once_resolved():
+    """Without a difference the interval narrows until the canary is shown non-inferior"""
+    analyzer = CanaryAnalyzer()
+    analyzer.observe_outcomes("v1", *outcomes(300))
+    analyzer.observe_outcomes("v2", *outcomes(300, seed=1))
+    
+    early = analyzer.analyze("v1", "v2")
+    assert early["recommendation"] == "continue"
+    
+    analyzer.observe_outcomes("v1", *outcomes(50000, seed=2))
+    analyzer.observe_outcomes("v2", *outcomes(50000, seed=3))
+    late = analyzer.analyze("v1", "v2")
+    
+    assert late["recommendation"] == "promote"
+    assert early["test"]["lower"] <= late["test"]["lower"] <= late["test"]["upper"] <= early["test"]["upper"]
+
+
+def test_waits_for_labels_and_guards_latency():
+    """No test before enough outcomes, but a slow canary is rolled back on latency alone"""
+    analyzer = CanaryAnalyzer()
+    assert analyzer.analyze("v1", None)["recommendation"] == "none"
+    
+    analyzer.observe("v1", np.full(200, 0.2), np.full(200, 0.001))
+    analyzer.observe("v2", np.full(50, 0.8), np.full(50, 0.001))
+    report = analyzer.analyze("v1", "v2")
+    assert report["recommendation"] == "continue" and report["test"] is None
+    assert report["score_psi"] > 1.0
+    
+    analyzer.observe("v2", np.full(150, 0.2), np.full(150, 0.01))
+    report = analyzer.analyze("v1", "v2")
+    assert report["recommendation"] == "rollback" and "latency" in report["reason"]
+    assert report["versions"]["v2"]["latency_p95"] == pytest.approx(0.01, rel=0.15)
+
+
+def test_routed_predictions_feed_analysis_and_auto_action(client, db_session, register_model, sample_customer_data,
+                                                          monkeypatch):
+    """Routed traffic reaches the analyzer, and auto action promotes a non-inferior canary"""
+    register_model("canary_v1")
+    register_model("canary_v2", status="canary", traffic_percent=50, seed=1)
+    monkeypatch.setattr(settings, "canary_traffic_percent", 50)
+    
+    for _ in range(10):
+        assert client.post("/api/v1/predict", json={"customer": sample_customer_data}).status_code == 200
+    pinned = {"customer": sample_customer_data, "model_version": "canary_v1"}
+    assert client.post("/api/v1/predict", json=pinned).status_code == 200
+    
+    report = client.get("/api/v1/canary").json()
+    assert report["active_version"] == "canary_v1" and report["canary_version"] == "canary_v2"
+    assert sum(stats["predictions"] for stats in report["versions"].values()) == 10
+    assert report["recommendation"] == "continue"
+    
+    # Only the outcomes of the routed predictions are compared, not the pinned one's
+    db_session.query(Prediction).update({
+        "is_churn": True, "labeled_at": datetime.now(timezone.utc) - timedelta(minutes=5)
+    })
+    db_session.commit()
+    assert PerformanceMonitor().refresh() == 11
+    report = client.get("/api/v1/canary").json()
+    assert sum(stats["labelled"] for stats in report["versions"].values()) == 10
+    
+    canary_analyzer.observe_outcomes("canary_v1", *outcomes(50000))
+    canary_analyzer.observe_outcomes("canary_v2", *outcomes(50000, seed=1))
+    monkeypatch.setattr(settings, "canary_auto_action", True)
+    
+    async def run():
+        service = CanaryService()
+        try:
+            return await service.run()
+        finally:
+            await service.resign()
+            await dispose_async_engines()
+    result = asyncio.run(run())
+    
+    assert result["recommendation"] == "promote" and result["action"] == "promoted"
+    db_session.expire_all()
+    statuses = {model.version: model.status for model in db_session.query(ModelVersion)}
+    assert statuses == {"canary_v1": "deprecated", "canary_v2": "active"}
+
+
+def test_only_one_worker_leads():
+    """The leader lock is held until resigned, and then another worker can take it"""
+    if engine.dialect.name != "postgresql":
+        pytest.skip("leader election uses PostgreSQL advisory locks")
+    
+    async def run():
+        first, second = CanaryService(), CanaryService()
+        try:
+            leads = [await first.lead(), await second.lead(), await first.lead()]
+            await first.resign()
+            return leads + [await second.lead()]
+        finally:
+            await first.resign()
+            await second.resign()
+            await dispose_async_engines()
+    
+    assert asyncio.run(run()) == [True, False, True, True]
@@ -0,0 +1,43 @@
+"""Unit tests for the compact prediction responses"""
+import json
+from datetime import datetime
+import numpy as np
+from app.api import responses
+from app.api.responses import COMPACT_MEDIA_TYPE, dumps
+
+
+def test_dumps_handles_numpy_and_datetimes(monkeypatch):
+    """Strided arrays, numpy scalars and datetimes serialize with and without orjson"""
+    content = {
+        "probabilities": np.arange(6, dtype=float).reshape(3, 2)[:, 1],
+        "total": np.int64(3),
+        "timestamp": datetime(2024, 1, 2, 3, 4, 5)
+    }
+    expected = {"probabilities": [1.0, 3.0, 5.0], "total": 3, "timestamp": "2024-01-02T03:04:05"}
+    
+    assert json.loads(dumps(content)) == expected
+    monkeypatch.setattr(responses, "orjson", None)
+    assert json.loads(dumps(content)) == expected
+
+
+def test_compact_predictions(client, register_model, sample_customer_data):
+    """The compact format is opt-in and carries the same predictions as the default one"""
+    register_model("compact_v1")
+    
+    customers = [dict(sample_customer_data, customer_id=f"CUST_{i}", tenure=i) for i in range(5)]
+    default = client.post("/api/v1/predict/batch", json={"customers": customers})
+    by_flag = client.post("/api/v1/predict/batch?compact=true", json={"customers": customers})
+    by_accept = client.post(
+        "/api/v1/predict/batch", json={"customers": customers}, headers={"Accept": COMPACT_MEDIA_TYPE}
+    )
+    single = client.post("/api/v1/predict?compact=true", json={"customer": customers[0]})
+    
+    assert "predictions" in default.json() and default.headers["content-type"] == "application/json"
+    compact = by_flag.json()
+    assert by_flag.headers["content-type"] == COMPACT_MEDIA_TYPE
+    assert by_accept.json()["customer_ids"] == compact["customer_ids"]
+    assert compact["model_version"] == "compact_v1" and compact["total"] == 5
+    assert compact["customer_ids"] == [c["customer_id"] for c in customers]
+    assert compact["probabilities"] == [p["probability"] for p in default.json()["predictions"]]
+    assert compact["predictions"] == [p["prediction"] for p in default.json()["predictions"]]
+    assert single.json()["probability"] == compact["probabilities"][0]
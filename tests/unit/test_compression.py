@@ -0,0 +1,79 @@
+"""Unit tests for model compression"""
+import numpy as np
+import joblib
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from app.ml.compression import CompactTreeEnsemble, compress_model
+
+
+def _make_data(n_samples=500, seed=0):
+    rng = np.random.RandomState(seed)
+    X = rng.normal(size=(n_samples, 6))
+    y = (X[:, 0] + 0.5 * X[:, 1] - X[:, 2] * X[:, 3] > 0).astype(int)
+    return X, y
+
+
+def test_compact_random_forest_matches_sklearn():
+    """Compact random forest reproduces sklearn predictions"""
+    X, y = _make_data()
+    model = RandomForestClassifier(n_estimators=20, max_depth=8, random_state=42).fit(X, y)
+
+    compact = CompactTreeEnsemble.from_sklearn(model)
+
+    assert compact.node_value.dtype == np.float32
+    assert compact.feature.dtype == np.int8
+    assert compact.n_nodes <= sum(e.tree_.node_count for e in model.estimators_)
+    np.testing.assert_array_equal(compact.predict(X), model.predict(X))
+    np.testing.assert_allclose(compact.predict_proba(X), model.predict_proba(X), atol=1e-6)
+
+
+def test_compact_gradient_boosting_matches_sklearn():
+    """Compact gradient boosting reproduces sklearn probabilities"""
+    X, y = _make_data()
+    model = GradientBoostingClassifier(n_estimators=20, max_depth=3, random_state=42).fit(X, y)
+
+    compact = CompactTreeEnsemble.from_sklearn(model)
+
+    np.testing.assert_allclose(compact.predict_proba(X), model.predict_proba(X), atol=1e-5)
+
+
+def test_contributions_add_up_to_model_output():
+    """Path attributions plus the base value reproduce each row's output"""
+    X, y = _make_data()
+    X[:, 5] = 0.0  # never split on
+    forest = RandomForestClassifier(n_estimators=20, max_depth=8, random_state=42).fit(X, y)
+    boosting = GradientBoostingClassifier(n_estimators=20, max_depth=3, random_state=42).fit(X, y)
+
+    base, contributions = CompactTreeEnsemble.from_sklearn(forest).contributions(X, chunk_size=64)
+    assert contributions.shape == X.shape
+    np.testing.assert_allclose(base + contributions.sum(axis=1), forest.predict_proba(X)[:, 1], atol=1e-5)
+    assert np.all(contributions[:, 5] == 0)
+
+    base, contributions = CompactTreeEnsemble.from_sklearn(boosting).contributions(X)
+    np.testing.assert_allclose(base + contributions.sum(axis=1), boosting.decision_function(X), atol=1e-4)
+
+
+def test_compress_model_report(tmp_path):
+    """Compression reports size reduction and writes accepted artifacts"""
+    X, y = _make_data()
+    model = RandomForestClassifier(n_estimators=20, max_depth=8, random_state=42).fit(X, y)
+    output_path = str(tmp_path / "model.compact.joblib")
+
+    report = compress_model(model, X, output_path=output_path, min_agreement=0.99)
+
+    assert report["accepted"]
+    assert report["agreement_rate"] >= 0.99
+    assert report["compact_bytes"] < report["original_bytes"]
+    loaded = joblib.load(output_path)
+    np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+
+
+def test_compress_model_rejects_below_agreement(tmp_path):
+    """Artifacts below the agreement threshold are not written"""
+    X, y = _make_data()
+    model = RandomForestClassifier(n_estimators=5, random_state=42).fit(X, y)
+    output_path = tmp_path / "model.compact.joblib"
+
+    report = compress_model(model, X, output_path=str(output_path), min_agreement=1.01)
+
+    assert not report["accepted"]
+    assert not output_path.exists()
@@ -0,0 +1,68 @@
+"""Unit tests for the instrumented connection pools and async database URLs"""
+import asyncio
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, exc, text
+from app.database import async_database_url, async_session, dispose_async_engines
+from app.db_pool import DatabasePoolCollector, InstrumentedQueuePool, instrument_pool
+
+
+def _sample(name, role):
+    return REGISTRY.get_sample_value(name, {"role": role}) or 0.0
+
+
+def test_async_database_url():
+    """Synchronous URLs get the async driver; asyncpg keeps a prepared statement cache"""
+    url = async_database_url("postgresql://user:secret@db:5432/mldb")
+    
+    assert url.startswith("postgresql+asyncpg://user:secret@db:5432/mldb?prepared_statement_cache_size=")
+    assert async_database_url("sqlite:////tmp/app.db") == "sqlite+aiosqlite:////tmp/app.db"
+    with pytest.raises(ValueError):
+        async_database_url("mysql://db/app")
+
+
+def test_pool_exhaustion_and_wait_are_measured():
+    """A checkout from a full pool counts as exhausted and, when it times out, as a timeout"""
+    engine = create_engine("sqlite://", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.01)
+    pool = instrument_pool(engine.pool, "test_exhaustion")
+    before = _sample("db_pool_checkout_wait_seconds_count", "test_exhaustion")
+    
+    held = engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    gauges = {
+        sample.name: sample.value
+        for family in DatabasePoolCollector().collect()
+        for sample in family.samples
+        if sample.labels["role"] == "test_exhaustion"
+    }
+    held.close()
+    
+    assert _sample("db_pool_exhausted_total", "test_exhaustion") == 1
+    assert _sample("db_pool_checkout_timeouts_total", "test_exhaustion") == 1
+    assert _sample("db_pool_checkout_wait_seconds_count", "test_exhaustion") - before == 2
+    assert _sample("db_pool_connection_age_seconds_count", "test_exhaustion") == 1
+    assert gauges == {"db_pool_connections_in_use": 1, "db_pool_connections_idle": 0, "db_pool_capacity": 1}
+    assert pool.checkedout() == 0
+
+
+def test_async_sessions_use_role_pools(db_session):
+    """Write and read sessions run on separate pools of the running event loop"""
+    async def query():
+        try:
+            async with async_session("write") as write_db, async_session("read") as read_db:
+                values = [await write_db.scalar(text("SELECT 1")), await read_db.scalar(text("SELECT 2"))]
+                return values, write_db.get_bind() is read_db.get_bind()
+        finally:
+            await dispose_async_engines()
+    
+    values, same_engine = asyncio.run(query())
+    
+    assert values == [1, 2]
+    assert not same_engine
+    with pytest.raises(ValueError):
+        asyncio.run(_open_unknown_role())
+
+
+async def _open_unknown_role():
+    async_session("admin")
@@ -0,0 +1,63 @@
+"""Unit tests for streaming feature drift detection"""
+from scripts.generate_data import generate_customer_data
+from app.ml.drift import (
+    build_reference, save_reference, drift_reference_path,
+    StreamingDriftSketch, DriftMonitor, NUMERIC_FEATURES, CATEGORICAL_FEATURES
+)
+
+
+def test_same_distribution_has_low_drift():
+    """Live traffic drawn like the training data scores near zero"""
+    df = generate_customer_data(n_samples=2000)
+    sketch = StreamingDriftSketch(build_reference(df.iloc[:1000]))
+    
+    sketch.update(df.iloc[1000:])
+    scores = sketch.scores()
+    
+    assert set(scores) == set(NUMERIC_FEATURES + CATEGORICAL_FEATURES)
+    assert all(s["psi"] < 0.1 for s in scores.values())
+    assert all(scores[name]["ks"] < 0.1 for name in NUMERIC_FEATURES)
+
+
+def test_shifted_distribution_is_detected():
+    """Shifted numeric and unseen categorical values raise PSI and KS"""
+    df = generate_customer_data(n_samples=1000)
+    sketch = StreamingDriftSketch(build_reference(df))
+    shifted = df.assign(monthly_charges=df["monthly_charges"] * 2, contract_type="Weekly")
+    
+    sketch.update(shifted)
+    scores = sketch.scores()
+    
+    assert scores["monthly_charges"]["psi"] > 1.0
+    assert scores["monthly_charges"]["ks"] > 0.4
+    assert scores["contract_type"]["psi"] > 1.0
+    assert scores["age"]["psi"] < 0.1
+
+
+def test_sketch_memory_is_fixed():
+    """Counts are decayed instead of growing past the window"""
+    df = generate_customer_data(n_samples=500)
+    sketch = StreamingDriftSketch(build_reference(df), window_size=1000)
+    sizes = {name: counts.size for name, counts in sketch._counts.items()}
+    
+    for _ in range(10):
+        sketch.update(df)
+    
+    assert sketch.total <= 1000
+    assert {name: counts.size for name, counts in sketch._counts.items()} == sizes
+
+
+def test_monitor_tracks_versions_with_reference(tmp_path, monkeypatch, sample_customer_data):
+    """Only versions with a saved reference are reported"""
+    monkeypatch.setattr("app.config.settings.model_registry_path", str(tmp_path))
+    save_reference(build_reference(generate_customer_data(n_samples=200)), drift_reference_path("run1"))
+    monitor = DriftMonitor(max_versions=2)
+    single = {name: [sample_customer_data[name]] for name in NUMERIC_FEATURES + CATEGORICAL_FEATURES}
+    
+    monitor.observe("v1", "run1", single)
+    monitor.observe("v2", "missing", single)
+    
+    report = monitor.report()
+    assert [entry["model_version"] for entry in report] == ["v1"]
+    assert report[0]["sample_count"] == 1
+    assert monitor.report("v2") == []
@@ -0,0 +1,49 @@
+"""Unit tests for prediction explanations"""
+import joblib
+import pytest
+from app.api.responses import COMPACT_MEDIA_TYPE
+from app.ml.compression import CompactTreeEnsemble, compact_artifact_path
+
+
+def test_explanations_are_opt_in(client, register_model, sample_customer_data):
+    """Explanations appear only when requested and add up to the predicted probability"""
+    register_model("explain_v1")
+    customers = [dict(sample_customer_data, customer_id=f"CUST_{i}", tenure=i * 7) for i in range(4)]
+    
+    plain = client.post("/api/v1/predict", json={"customer": customers[0]})
+    single = client.post("/api/v1/predict?explain=true", json={"customer": customers[0]})
+    batch = client.post("/api/v1/predict/batch?explain=true", json={"customers": customers})
+    compact = client.post(
+        "/api/v1/predict/batch?explain=true", json={"customers": customers}, headers={"Accept": COMPACT_MEDIA_TYPE}
+    )
+    
+    assert "explanation" not in plain.json()
+    explanation = single.json()["explanation"]
+    assert explanation["output"] == "probability"
+    assert set(explanation["contributions"]) >= {"tenure", "contract_type"}
+    assert explanation["base_value"] + sum(explanation["contributions"].values()) == pytest.approx(
+        single.json()["probability"], abs=1e-5
+    )
+    for prediction in batch.json()["predictions"]:
+        contributions = prediction["explanation"]["contributions"]
+        assert prediction["explanation"]["base_value"] + sum(contributions.values()) == pytest.approx(
+            prediction["probability"], abs=1e-5
+        )
+    compact_explanations = compact.json()["explanations"]
+    assert len(compact_explanations["contributions"]) == 4
+    assert len(compact_explanations["contributions"][0]) == len(compact_explanations["feature_names"])
+
+
+def test_artifacts_without_node_means_ask_for_recompression(client, register_model, sample_customer_data):
+    """Compact artifacts written before explanations still predict, and explaining them is a 409"""
+    model = register_model("explain_legacy")
+    legacy = CompactTreeEnsemble.from_sklearn(model)
+    legacy.node_mean = None
+    joblib.dump(legacy, compact_artifact_path("run_explain_legacy"))
+    
+    assert client.post("/api/v1/predict", json={"customer": sample_customer_data}).status_code == 200
+    for path, body in (("/api/v1/predict", {"customer": sample_customer_data}),
+                       ("/api/v1/predict/batch", {"customers": [sample_customer_data]})):
+        response = client.post(f"{path}?explain=true", json=body)
+        assert response.status_code == 409
+        assert "recompress" in response.json()["detail"]
@@ -0,0 +1,60 @@
+"""Unit tests for compact feature logging"""
+from app.config import settings
+from app.ml.feature_codec import FeatureVectorCodec
+from app.models import FeatureVector, Prediction
+from app.services.feature_log import FeatureLog, delete_orphan_vectors, read_prediction_features
+
+
+def test_codec_round_trip(sample_customer_data):
+    """Encoded vectors decode to the original features"""
+    codec = FeatureVectorCodec()
+    features = {k: v for k, v in sample_customer_data.items() if k != "customer_id"}
+
+    vector = codec.encode(features)
+
+    assert vector.dtype.name == "float32"
+    assert len(codec.to_bytes(vector)) == 4 * len(features)
+    assert codec.decode(codec.from_bytes(codec.to_bytes(vector))) == features
+
+
+def test_vector_storage_deduplicates_and_decodes(db_session, sample_customer_data):
+    """Identical payloads are stored once and read back as readable features"""
+    feature_log = FeatureLog(mode="vector")
+    unknown = dict(sample_customer_data, payment_method="Crypto")
+
+    for features in (sample_customer_data, sample_customer_data, unknown):
+        columns = feature_log.columns(db_session, features)
+        db_session.add(Prediction(customer_id=features["customer_id"], model_version="v1", **columns))
+        db_session.commit()
+        feature_log.after_commit([columns])
+
+    assert db_session.query(FeatureVector).count() == 1
+    predictions = db_session.query(Prediction).order_by(Prediction.id).all()
+    assert predictions[0].features is None
+    assert predictions[2].features == unknown
+
+    assert read_prediction_features(db_session, predictions) == [
+        sample_customer_data, sample_customer_data, unknown
+    ]
+
+
+def test_orphan_vectors_are_deleted_and_rewritten(db_session, sample_customer_data, monkeypatch):
+    """Vectors no prediction references are deleted; expired cache entries write them again"""
+    monkeypatch.setattr(settings, "feature_vector_cache_seconds", 0)
+    feature_log = FeatureLog(mode="vector")
+    other = dict(sample_customer_data, tenure=40)
+    for features in (sample_customer_data, other):
+        columns = feature_log.columns(db_session, features)
+        db_session.add(Prediction(customer_id=features["customer_id"], model_version="v1", **columns))
+        db_session.commit()
+        feature_log.after_commit([columns])
+
+    # Retention dropped the predictions of the first payload
+    db_session.query(Prediction).filter(Prediction.id == 1).delete()
+    assert delete_orphan_vectors(db_session) == 1
+    db_session.commit()
+    assert db_session.query(FeatureVector).count() == 1
+
+    feature_log.columns(db_session, sample_customer_data)
+    db_session.commit()
+    assert db_session.query(FeatureVector).count() == 2
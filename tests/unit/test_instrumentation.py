@@ -0,0 +1,47 @@
+"""Unit tests for per-stage latency instrumentation"""
+from prometheus_client import REGISTRY
+from app.main import app
+from app.instrumentation import (
+    batch_size_bucket, route_template, start_request, current_timings, stage, annotate
+)
+
+
+def test_batch_size_buckets():
+    """Batch sizes collapse into a handful of labels"""
+    assert batch_size_bucket(1) == "1"
+    assert batch_size_bucket(7) == "2-10"
+    assert batch_size_bucket(100) == "11-100"
+    assert batch_size_bucket(5000) == "1001-10000"
+    assert batch_size_bucket(100000) == ">10000"
+    assert batch_size_bucket(None) == "none"
+
+
+def test_route_template_uses_path_parameters():
+    """Per-id paths map to their route template"""
+    def scope(path):
+        return {"type": "http", "path": path, "method": "GET", "root_path": ""}
+    
+    assert route_template(app, scope("/api/v1/models/v20240101_000000")) == "/api/v1/models/{version}"
+    assert route_template(app, scope("/metrics/")) == "/metrics"
+    assert route_template(app, scope("/no/such/path")) == "unmatched"
+
+
+def test_stages_are_recorded_per_request():
+    """Stages accumulate into the request's timings and the histogram"""
+    timings = start_request()
+    with stage("encoding"):
+        pass
+    with stage("persistence"):
+        pass
+    with stage("persistence"):
+        pass
+    annotate(model_version="v1", batch_size=3)
+    timings.observe("/api/v1/predict/batch")
+    
+    assert current_timings() is timings
+    assert set(timings.stages) == {"encoding", "persistence"}
+    assert "persistence;dur=" in timings.server_timing(timings.elapsed())
+    assert REGISTRY.get_sample_value(
+        "prediction_stage_duration_seconds_count",
+        {"stage": "persistence", "route": "/api/v1/predict/batch", "model_version": "v1", "batch_size": "2-10"}
+    ) == 1
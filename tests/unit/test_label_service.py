@@ -0,0 +1,66 @@
+"""Unit tests for bulk label ingestion"""
+from datetime import datetime, timezone
+import pandas as pd
+from app.models import Prediction
+from app.services.label_service import LabelIngestionService
+
+
+def _add_prediction(db, customer_id, timestamp):
+    db.add(Prediction(
+        customer_id=customer_id,
+        prediction=1.0,
+        probability=0.8,
+        model_version="v1",
+        features={},
+        timestamp=timestamp
+    ))
+    db.commit()
+
+
+def test_ingest_labels_is_idempotent(db_session, tmp_path):
+    """Labels apply once to matching predictions and re-runs change nothing"""
+    _add_prediction(db_session, "C1", datetime(2024, 1, 10, tzinfo=timezone.utc))
+    _add_prediction(db_session, "C1", datetime(2024, 2, 10, tzinfo=timezone.utc))
+    _add_prediction(db_session, "C2", datetime(2024, 1, 15, tzinfo=timezone.utc))
+
+    path = tmp_path / "labels.csv"
+    pd.DataFrame({
+        "customer_id": ["C1", "C2", "C3", "C4"],
+        "timestamp": ["2024-02-01T00:00:00Z", "2024-02-01T00:00:00Z", "2024-02-01T00:00:00Z", "2024-02-01"],
+        "label": ["true", "0", "1", "maybe"]
+    }).to_csv(path, index=False)
+
+    service = LabelIngestionService()
+    report = service.ingest_file(str(path))
+
+    assert report["labels_received"] == 4
+    assert report["labels_rejected"] == 1
+    assert report["labels_matched"] == 2
+    assert report["predictions_updated"] == 2
+
+    db_session.expire_all()
+    labels = {
+        (p.customer_id, p.timestamp.month): p.is_churn
+        for p in db_session.query(Prediction).all()
+    }
+    assert labels == {("C1", 1): True, ("C1", 2): None, ("C2", 1): False}
+
+    retry = service.ingest_file(str(path))
+    assert retry["labels_matched"] == 2
+    assert retry["predictions_updated"] == 0
+
+
+def test_earliest_matching_label_wins(db_session):
+    """When several labels cover one prediction, the earliest one is applied"""
+    _add_prediction(db_session, "C1", datetime(2024, 3, 1, tzinfo=timezone.utc))
+
+    labels = pd.DataFrame({
+        "customer_id": ["C1", "C1"],
+        "timestamp": ["2024-03-20T00:00:00Z", "2024-03-05T00:00:00Z"],
+        "label": ["0", "1"]
+    })
+    report = LabelIngestionService().ingest_chunks(iter([labels]))
+
+    db_session.expire_all()
+    assert report["predictions_updated"] == 1
+    assert db_session.query(Prediction).one().is_churn is True
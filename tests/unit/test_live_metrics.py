@@ -0,0 +1,83 @@
+"""Unit tests for the live metrics stream"""
+import asyncio
+import json
+import pytest
+from app.live_metrics import LiveMetrics, LiveMetricsBroadcaster, live_metrics, server_sent_events
+
+
+@pytest.fixture(autouse=True)
+def fresh_live_metrics():
+    live_metrics.reset()
+    yield
+    live_metrics.reset()
+
+
+def test_snapshot_aggregates_the_window():
+    """Requests, latency, scores and version split are summed over the window; old seconds drop out"""
+    metrics = LiveMetrics(window_seconds=60)
+    for seconds in (0.010, 0.020, 0.030, 0.500):
+        metrics.record_request(seconds, 200)
+    metrics.record_request(0.010, 503)
+    metrics.record_predictions("v1", [0.1, 0.2, 0.9])
+    metrics.record_predictions("v2", [0.95])
+    metrics.record_realized("v1", {"accuracy": 0.8})
+    
+    snapshot = metrics.snapshot()
+    assert snapshot["error_rate"] == pytest.approx(0.2)
+    assert snapshot["latency"]["p50"] == pytest.approx(0.020, rel=0.15)
+    assert snapshot["latency"]["p99"] == pytest.approx(0.500, rel=0.15)
+    assert snapshot["predictions"] == 4 and sum(snapshot["score_histogram"]) == 4
+    assert snapshot["score_histogram"][-1] == 1
+    assert snapshot["versions"] == {"v1": {"predictions": 3, "share": 0.75}, "v2": {"predictions": 1, "share": 0.25}}
+    assert snapshot["realized_metrics"] == {"v1": {"accuracy": 0.8}}
+    json.dumps(snapshot)
+    
+    for bucket in metrics._buckets:
+        bucket.second -= 60
+    assert metrics.snapshot()["predictions"] == 0
+
+
+def test_broadcaster_fans_out_and_drops_stale_updates():
+    """Every subscriber gets each tick; one that does not read only keeps the newest update"""
+    metrics = LiveMetrics()
+    broadcaster = LiveMetricsBroadcaster(metrics, interval_seconds=0.01)
+    
+    async def run():
+        fast, slow = broadcaster.subscribe(), broadcaster.subscribe()
+        first = await fast.__anext__()
+        await slow.__anext__()
+        assert broadcaster.subscribers == 2
+        
+        metrics.record_predictions("v1", [0.5])
+        await asyncio.sleep(0.05)
+        updates = [await fast.__anext__(), await slow.__anext__()]
+        
+        await fast.aclose()
+        await slow.aclose()
+        await asyncio.sleep(0.03)
+        return first, updates, broadcaster._task.done()
+    
+    first, updates, stopped = asyncio.run(run())
+    assert first["predictions"] == 0
+    assert [update["predictions"] for update in updates] == [1, 1]
+    assert broadcaster.subscribers == 0 and stopped
+
+
+def test_prediction_traffic_reaches_the_live_endpoint(client, register_model, sample_customer_data):
+    """Served predictions show up in the live snapshot and as server-sent events, without the database"""
+    register_model("live_v1")
+    assert client.post("/api/v1/predict", json={"customer": sample_customer_data}).status_code == 200
+    
+    snapshot = client.get("/api/v1/metrics/live").json()
+    assert snapshot["request_rate"] > 0
+    assert snapshot["versions"] == {"live_v1": {"predictions": 1, "share": 1.0}}
+    
+    async def first_event():
+        events = server_sent_events(LiveMetricsBroadcaster(live_metrics).subscribe())
+        event = await events.__anext__()
+        await events.aclose()
+        return event
+    
+    event = asyncio.run(first_event())
+    assert event.startswith("event: metrics\ndata: ") and event.endswith("\n\n")
+    assert json.loads(event.split("data: ", 1)[1])["predictions"] == 1
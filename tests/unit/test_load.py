@@ -0,0 +1,54 @@
+"""Unit tests for the load replay harness"""
+import asyncio
+import httpx
+import numpy as np
+import pytest
+from app.main import app
+from benchmarks.load import (
+    RequestSpec, Sample, LoadResult, arrival_offsets, parse_mix, parse_slo,
+    run_load, build_report, check_slos
+)
+
+
+def test_arrival_offsets_match_rate():
+    """Open-loop schedules follow the requested arrival rate"""
+    constant = arrival_offsets(100, rate=50, process="constant")
+    poisson = arrival_offsets(10000, rate=50, process="poisson")
+    
+    assert constant[1] - constant[0] == pytest.approx(0.02)
+    assert len(poisson) / poisson[-1] == pytest.approx(50, rel=0.05)
+
+
+def test_parse_mix_and_slo():
+    assert parse_mix("predict=3,batch=1") == {"predict": 0.75, "batch": 0.25}
+    assert parse_slo("p99<=0.25s") == ("p99_ms", "<=", 250.0)
+    assert parse_slo("error_rate<1%") == ("error_rate", "<", 0.01)
+    with pytest.raises(ValueError):
+        parse_mix("upload=1")
+
+
+def test_report_uses_corrected_latency_for_slos():
+    """A stalled request counts from its scheduled time, not its send time"""
+    samples = [Sample("predict", 200, 5.0, 5.0) for _ in range(99)]
+    samples.append(Sample("predict", 500, 5.0, 900.0))
+    report = build_report(LoadResult(samples=samples, duration_seconds=10.0))
+    
+    overall = report["overall"]
+    assert overall["service_p999_ms"] == pytest.approx(5.0)
+    assert overall["p999_ms"] > 800
+    assert overall["error_rate"] == pytest.approx(0.01)
+    assert sum(bucket["count"] for bucket in overall["histogram"]) == 100
+    
+    checks = check_slos(report, ["p50<=10ms", "predict:p999<=100ms", "throughput>=5"])
+    assert [check["passed"] for check in checks] == [True, False, True]
+
+
+def test_run_load_against_app(db_session):
+    """Scheduled requests are all sent and recorded"""
+    schedule = [(i * 0.01, RequestSpec("drift", "GET", "/api/v1/drift")) for i in range(5)]
+    transport = httpx.ASGITransport(app=app)
+    
+    result = asyncio.run(run_load("http://test", schedule, transport=transport))
+    
+    assert [sample.status for sample in result.samples] == [200] * 5
+    assert np.all([sample.corrected_ms >= sample.service_ms for sample in result.samples])
@@ -0,0 +1,109 @@
+"""Unit tests for the multi-version model pool"""
+import asyncio
+import threading
+import time
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from app.ml.model_pool import ModelPool, model_memory_bytes
+
+
+class _Model:
+    def __init__(self, n_bytes):
+        self.weights = np.zeros(n_bytes, dtype=np.uint8)
+
+
+def test_concurrent_loads_are_deduplicated():
+    """Concurrent requests for one version trigger a single load"""
+    pool = ModelPool(max_bytes=10 ** 6)
+    calls = []
+    
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return _Model(10)
+    
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(pool.get("v1", "run1", loader)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(calls) == 1
+    assert len({id(model) for model in results}) == 1
+    assert pool.stats()[0]["hits"] == 0
+
+
+def test_async_loads_leave_the_event_loop_running():
+    """Awaiting a missing version loads it once off the loop, while the loop keeps serving"""
+    pool = ModelPool(max_bytes=10 ** 6)
+    calls = []
+    
+    def loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return _Model(10)
+    
+    async def run():
+        ticks = 0
+        
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        
+        ticker = asyncio.create_task(tick())
+        models = await asyncio.gather(*(pool.get_async("v1", "run1", loader) for _ in range(4)))
+        ticker.cancel()
+        return models, ticks
+    
+    models, ticks = asyncio.run(run())
+    assert len(calls) == 1 and len({id(model) for model in models}) == 1
+    assert ticks >= 10
+    assert pool.get("v1", "run1", loader) is models[0]
+
+
+def test_pool_evicts_least_recently_used_by_memory():
+    """The memory budget evicts the least recently used versions"""
+    pool = ModelPool(max_bytes=250)
+    for version in ("v1", "v2"):
+        pool.get(version, version, lambda: _Model(100))
+    pool.get("v1", "v1", lambda: None)  # touch v1
+    pool.get("v3", "v3", lambda: _Model(100))
+    
+    assert [entry["version"] for entry in pool.stats()] == ["v1", "v3"]
+    assert pool.memory_bytes() == 200
+
+
+def test_memory_of_sklearn_forest_is_measured():
+    """Tree arrays held in sklearn's pickled state are counted"""
+    X = np.random.RandomState(0).normal(size=(200, 4))
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, X[:, 0] > 0)
+    
+    tree_bytes = sum(e.tree_.__getstate__()["nodes"].nbytes for e in model.estimators_)
+    assert model_memory_bytes(model) > tree_bytes
+
+
+def test_predict_pinned_to_version(client, register_model, sample_customer_data):
+    """Requests can pin a non-active version; unknown versions are 404"""
+    register_model("pin_a")
+    register_model("pin_b", status="deprecated", traffic_percent=0, seed=1)
+    
+    default = client.post("/api/v1/predict", json={"customer": sample_customer_data})
+    pinned = client.post("/api/v1/predict/batch", json={"customers": [sample_customer_data], "model_version": "pin_b"})
+    missing = client.post("/api/v1/predict", json={"customer": sample_customer_data, "model_version": "nope"})
+    missing_batch = client.post(
+        "/api/v1/predict/batch", json={"customers": [sample_customer_data], "model_version": "nope"}
+    )
+    pool = client.get("/api/v1/models/info/pool").json()
+    
+    assert default.json()["model_version"] == "pin_a"
+    assert pinned.json()["model_version"] == "pin_b"
+    assert missing.status_code == 404 and missing_batch.status_code == 404
+    # Unknown client-supplied versions never become metric label values
+    assert 'model_version="nope"' not in client.get("/metrics/").text
+    assert {"pin_a", "pin_b"} <= {entry["version"] for entry in pool["models"]}
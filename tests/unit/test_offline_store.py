@@ -0,0 +1,61 @@
+"""Unit tests for the offline feature store"""
+import os
+import pandas as pd
+import pytest
+from app.feature_store.offline import OfflineFeatureStore, FEATURE_COLUMNS
+from app.ml.trainer import ModelTrainer
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Store with two daily snapshots of the same customers, tenure differing"""
+    from scripts.generate_data import generate_customer_data
+    customers = generate_customer_data(n_samples=20).drop("churn", axis=1)
+    store = OfflineFeatureStore(str(tmp_path / "offline"))
+    store.materialize(customers.assign(tenure=1), as_of="2024-03-01 08:00")
+    store.materialize(customers.assign(tenure=2), as_of="2024-03-02 08:00")
+    return store
+
+
+def test_partitioned_reads(store):
+    """Snapshots land in daily partitions and reads prune dates, columns and customers"""
+    assert store.partitions() == ["2024-03-01", "2024-03-02"]
+    assert all(name.startswith("date=") for name in os.listdir(store.root))
+    
+    df = store.read(["tenure"], start="2024-03-02", customer_ids=["CUST_00001", "CUST_00002"])
+    assert list(df.columns) == ["customer_id", "feature_timestamp", "tenure"]
+    assert sorted(df["customer_id"]) == ["CUST_00001", "CUST_00002"]
+    assert (df["tenure"] == 2).all()
+    
+    latest = store.latest(as_of="2024-03-01 23:00")
+    assert len(latest) == 20 and (latest["tenure"] == 1).all()
+    assert list(latest.columns) == ["customer_id", "feature_timestamp"] + FEATURE_COLUMNS
+
+
+def test_point_in_time_join(store):
+    """Each label sees the features known at its timestamp, never later ones"""
+    labels = pd.DataFrame({
+        "customer_id": ["CUST_00001", "CUST_00001", "CUST_00002", "CUST_00003"],
+        "label_timestamp": ["2024-03-01 12:00", "2024-03-05 00:00", "2024-03-02 08:00", "2024-02-01 00:00"],
+        "churn": [0, 1, 1, 0]
+    })
+    
+    joined = store.point_in_time_join(labels, ["tenure"])
+    
+    by_label = joined.set_index(["customer_id", "label_timestamp"])["tenure"]
+    assert by_label[("CUST_00001", pd.Timestamp("2024-03-01 12:00"))] == 1
+    assert by_label[("CUST_00001", pd.Timestamp("2024-03-05 00:00"))] == 2
+    assert by_label[("CUST_00002", pd.Timestamp("2024-03-02 08:00"))] == 2
+    # Features observed only after the label are not joined
+    assert "CUST_00003" not in set(joined["customer_id"])
+
+
+def test_empty_store_joins_to_nothing(tmp_path):
+    """Without materialized features reads are typed and empty, and training reports the missing features"""
+    labels = pd.DataFrame({"customer_id": ["CUST_00001"], "label_timestamp": ["2024-03-01"], "churn": [1]})
+    for store in (OfflineFeatureStore(str(tmp_path / "missing")), OfflineFeatureStore(str(tmp_path))):
+        assert store.latest(as_of="2024-03-01").empty
+        assert store.point_in_time_join(labels, ["tenure"]).empty
+    
+    with pytest.raises(ValueError, match="No labels have features"):
+        ModelTrainer().train_from_store(labels, store=OfflineFeatureStore(str(tmp_path)))
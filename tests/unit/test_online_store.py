@@ -0,0 +1,79 @@
+"""Unit tests for the online feature store"""
+import numpy as np
+import pandas as pd
+import pytest
+from app.config import settings
+from app.feature_store.online import (
+    OnlineFeatureStore, FeatureStoreUnavailable, build_snapshot, online_store
+)
+from app.feature_store.transformer import FeatureTransformer
+from app.ml.feature_codec import FeatureVectorCodec
+
+
+@pytest.fixture
+def customers():
+    from scripts.generate_data import generate_customer_data
+    return generate_customer_data(n_samples=50).drop("churn", axis=1)
+
+
+def test_snapshot_lookup(customers, tmp_path):
+    """Lookups return the transformer's vectors in request order and report unknown ids"""
+    bad = customers.iloc[[0]].assign(customer_id="CUST_BAD", contract_type="Weekly")
+    meta = build_snapshot(pd.concat([customers.iloc[::-1], bad]), str(tmp_path))
+    assert meta["rows"] == 50 and meta["rejected"] == 1
+    
+    store = OnlineFeatureStore(str(tmp_path), cache_size=4)
+    ids = ["CUST_00007", "CUST_99999", "CUST_00002", "CUST_BAD"]
+    first = store.lookup(ids)
+    second = store.lookup(ids)
+    
+    expected = FeatureTransformer().transform_batch(customers.iloc[[6, 1]])
+    assert first.customer_ids == ["CUST_00007", "CUST_00002"]
+    assert first.missing == ["CUST_99999", "CUST_BAD"]
+    assert first.vectors.dtype == np.float32
+    np.testing.assert_allclose(first.vectors, expected, rtol=1e-6)
+    np.testing.assert_array_equal(second.vectors, first.vectors)
+    assert FeatureVectorCodec().decode(first.raw[1])["tenure"] == int(customers.iloc[1]["tenure"])
+
+
+def test_new_snapshot_replaces_current(customers, tmp_path, monkeypatch):
+    """A reload is picked up after the refresh interval, without serving rows cached from the old one"""
+    monkeypatch.setattr(settings, "online_store_refresh_seconds", 0)
+    store = OnlineFeatureStore(str(tmp_path))
+    with pytest.raises(FeatureStoreUnavailable):
+        store.lookup(["CUST_00001"])
+    
+    build_snapshot(customers, str(tmp_path))
+    assert store.lookup(["CUST_00001"]).raw[0][1] == customers.iloc[0]["tenure"]
+    
+    build_snapshot(customers.assign(tenure=99), str(tmp_path))
+    assert store.lookup(["CUST_00001"]).raw[0][1] == 99
+
+
+def test_predict_by_customer_id(client, register_model, customers, sample_customer_data, tmp_path, monkeypatch):
+    """Customer-id predictions match full-payload ones and unknown ids are reported"""
+    register_model("online_v1")
+    monkeypatch.setattr(settings, "feature_store_path", str(tmp_path))
+    online_store.reset()
+    
+    response = client.get("/api/v1/predict/customers/CUST_00001")
+    assert response.status_code == 503
+    
+    build_snapshot(customers)
+    online_store.reset()
+    
+    by_id = client.post("/api/v1/predict/customers", json={"customer_ids": ["CUST_00003", "CUST_NOPE"]})
+    full = client.post("/api/v1/predict", json={"customer": customers.iloc[2].to_dict()})
+    single = client.get("/api/v1/predict/customers/CUST_00003")
+    compact = client.post("/api/v1/predict/customers?compact=true", json={"customer_ids": ["CUST_00003"]})
+    
+    assert by_id.status_code == 200
+    body = by_id.json()
+    assert body["total"] == 1 and body["model_version"] == "online_v1"
+    assert body["missing_customer_ids"] == ["CUST_NOPE"]
+    assert body["predictions"][0]["probability"] == pytest.approx(full.json()["probability"])
+    assert single.json()["probability"] == body["predictions"][0]["probability"]
+    assert compact.json()["customer_ids"] == ["CUST_00003"]
+    assert client.get("/api/v1/predict/customers/CUST_NOPE").status_code == 404
+    assert client.post("/api/v1/predict/customers", json={"customer_ids": []}).status_code == 422
+    online_store.reset()
@@ -0,0 +1,55 @@
+"""Unit tests for prediction partition maintenance"""
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy import text
+from app.database import engine
+from app.services.partition_manager import (
+    DEFAULT_PARTITION, PredictionPartitionManager, add_months, month_start, partition_name
+)
+
+
+def test_month_arithmetic():
+    """Month helpers roll over year boundaries"""
+    start = month_start(datetime(2024, 11, 17, 8, 30, tzinfo=timezone.utc))
+    assert start == datetime(2024, 11, 1, tzinfo=timezone.utc)
+    assert add_months(start, 2) == datetime(2025, 1, 1, tzinfo=timezone.utc)
+    assert add_months(start, -11) == datetime(2023, 12, 1, tzinfo=timezone.utc)
+    assert partition_name(start) == "predictions_p202411"
+
+
+def test_maintenance_skips_unpartitioned_table(db_session):
+    """Tables created without migration 003 are left untouched"""
+    result = PredictionPartitionManager(months_ahead=1, retention_days=30).run_maintenance()
+    assert result == {"partitioned": False, "created": [], "dropped": []}
+
+
+def test_new_partition_takes_over_rows_from_default(db_session):
+    """Rows that landed in the default partition move into the month's partition when it is created"""
+    if engine.dialect.name != "postgresql":
+        pytest.skip("partitioning is PostgreSQL-only")
+    with engine.begin() as conn:
+        # The layout of migration 003, on the test database
+        conn.execute(text("DROP TABLE predictions"))
+        conn.execute(text(
+            "CREATE TABLE predictions (id INTEGER NOT NULL, customer_id VARCHAR, prediction FLOAT, "
+            "probability FLOAT, model_version VARCHAR, features JSON, feature_hash BYTEA, "
+            "timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(), is_churn BOOLEAN, "
+            "labeled_at TIMESTAMP WITH TIME ZONE, PRIMARY KEY (id, timestamp)) PARTITION BY RANGE (timestamp)"
+        ))
+        conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF predictions DEFAULT"))
+        for i, day in enumerate([3, 17, 30]):
+            conn.execute(text("INSERT INTO predictions (id, customer_id, timestamp) VALUES (:id, 'C', :ts)"),
+                         {"id": i + 1, "ts": datetime(2024, 5, day, tzinfo=timezone.utc)})
+        conn.execute(text("INSERT INTO predictions (id, customer_id, timestamp) VALUES (4, 'C', :ts)"),
+                     {"ts": datetime(2023, 1, 1, tzinfo=timezone.utc)})
+
+    result = PredictionPartitionManager(months_ahead=1, retention_days=0).run_maintenance(
+        now=datetime(2024, 5, 15, tzinfo=timezone.utc)
+    )
+
+    assert result["created"] == ["predictions_p202405", "predictions_p202406"]
+    assert result["rows_moved"] == 3
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM predictions_p202405")).scalar() == 3
+        assert conn.execute(text(f"SELECT id FROM {DEFAULT_PARTITION}")).scalars().all() == [4]
+        assert conn.execute(text("SELECT count(*) FROM predictions")).scalar() == 4
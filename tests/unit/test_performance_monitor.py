@@ -0,0 +1,131 @@
+"""Unit tests for the incremental performance monitor"""
+import threading
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pytest
+from sklearn.metrics import roc_auc_score
+from sqlalchemy import text
+from app.database import engine
+from app.live_metrics import live_metrics
+from app.models import MonitorWatermark, Prediction
+from app.services.label_service import LABEL_COMMIT_LOCK_KEY
+from app.services.performance_monitor import PerformanceMonitor, binned_auc
+
+
+def _add_predictions(db, rows, labeled_at):
+    for customer_id, probability, is_churn in rows:
+        db.add(Prediction(
+            customer_id=customer_id,
+            prediction=float(probability >= 0.5),
+            probability=probability,
+            model_version="v1",
+            features={},
+            is_churn=is_churn,
+            labeled_at=labeled_at if is_churn is not None else None
+        ))
+    db.commit()
+
+
+def test_binned_auc_matches_exact_auc():
+    """Histogram AUC approximates the exact AUC"""
+    rng = np.random.RandomState(0)
+    y = rng.randint(0, 2, size=2000)
+    scores = np.clip(0.3 * y + rng.normal(0.35, 0.2, size=2000), 0, 1)
+    bins = np.clip((scores * 1000).astype(int), 0, 999)
+
+    auc = binned_auc(
+        np.bincount(bins[y == 1], minlength=1000),
+        np.bincount(bins[y == 0], minlength=1000)
+    )
+
+    assert abs(auc - roc_auc_score(y, scores)) < 1e-3
+
+
+def test_performance_monitor_counts_each_label_once(db_session):
+    """Refreshing advances the watermark and counts each labelled row once"""
+    labeled_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+    _add_predictions(db_session, [
+        ("C1", 0.9, True),
+        ("C2", 0.8, False),
+        ("C3", 0.2, False),
+        ("C4", 0.1, True),
+        ("C5", 0.7, None),
+    ], labeled_at)
+
+    monitor = PerformanceMonitor(batch_size=2)
+    assert monitor.refresh() == 4
+    assert monitor.refresh() == 0
+
+    metrics = monitor.get_realized_metrics("v1")
+    assert metrics["labelled_count"] == 4
+    assert metrics["accuracy"] == 0.5
+    assert metrics["precision"] == 0.5
+    assert metrics["recall"] == 0.5
+
+    _add_predictions(db_session, [("C6", 0.95, True)], labeled_at + timedelta(seconds=1))
+    assert monitor.refresh() == 1
+    assert monitor.get_realized_metrics("v1")["labelled_count"] == 5
+
+
+def test_every_refresh_publishes_shared_realized_metrics(db_session):
+    """A worker that folded nothing in, or just restarted, still shows realized metrics"""
+    labeled_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+    _add_predictions(db_session, [("C1", 0.9, True), ("C2", 0.8, False)], labeled_at)
+    assert PerformanceMonitor().refresh() == 2
+
+    live_metrics.reset()
+    try:
+        assert PerformanceMonitor().refresh() == 0
+        realized = live_metrics.snapshot()["realized_metrics"]
+        assert realized["v1"]["labelled_count"] == 2
+        assert realized["v1"]["accuracy"] == 0.5
+    finally:
+        live_metrics.reset()
+
+
+def test_concurrent_first_refreshes_share_one_watermark(db_session):
+    """Workers starting on an empty database do not collide creating the watermark"""
+    errors = []
+
+    def refresh():
+        try:
+            PerformanceMonitor().refresh()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=refresh) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert db_session.query(MonitorWatermark).count() == 1
+
+
+def test_refresh_waits_for_labels_being_applied(db_session):
+    """A label import still committing is counted, although its rows are stamped behind the watermark"""
+    if engine.dialect.name != "postgresql":
+        pytest.skip("label commit lock is PostgreSQL-only")
+    labeled_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+    _add_predictions(db_session, [("C1", 0.9, True), ("C2", 0.2, None)], labeled_at)
+    monitor = PerformanceMonitor()
+
+    importer = engine.connect()
+    transaction = importer.begin()
+    importer.execute(text("SELECT pg_advisory_xact_lock_shared(:key)"), {"key": LABEL_COMMIT_LOCK_KEY})
+    importer.execute(text(
+        "UPDATE predictions SET is_churn = false, labeled_at = :at WHERE customer_id = 'C2'"
+    ), {"at": labeled_at - timedelta(minutes=1)})
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(monitor.refresh()))
+    thread.start()
+    thread.join(timeout=1)
+    assert thread.is_alive()
+
+    transaction.commit()
+    importer.close()
+    thread.join()
+    assert results == [2]
+    assert monitor.get_realized_metrics("v1")["labelled_count"] == 2
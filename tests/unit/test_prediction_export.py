@@ -0,0 +1,88 @@
+"""Unit tests for the streaming prediction export"""
+import io
+from datetime import datetime, timedelta
+import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from app.config import settings
+from app.models import Prediction
+from app.services.prediction_export import PredictionExporter
+
+
+def add_predictions(db_session):
+    """Ten predictions over two days, alternating between two model versions"""
+    base = datetime(2024, 3, 1, 20, 0, 0)
+    for i in range(10):
+        db_session.add(Prediction(
+            customer_id=f"CUST_{i}", model_version=f"v{i % 2 + 1}", prediction=float(i % 2),
+            probability=i / 10, timestamp=base + timedelta(hours=i)
+        ))
+    db_session.commit()
+    return base
+
+
+def test_partitioned_export_writes_chunks_per_day_and_version(db_session, tmp_path):
+    """Every matching row lands once, under its date= and model_version= directory, in chunk-sized files"""
+    base = add_predictions(db_session)
+    output = tmp_path / "export"
+    
+    report = PredictionExporter(chunk_size=3).write(
+        str(output), partition_by=["day", "model_version"], start=base + timedelta(hours=1)
+    )
+    
+    files = sorted(output.rglob("*.parquet"))
+    assert report == {"rows": 9, "files": len(files)}
+    assert {f.parent.relative_to(output).as_posix() for f in files} == {
+        "date=2024-03-01/model_version=v1", "date=2024-03-01/model_version=v2",
+        "date=2024-03-02/model_version=v1", "date=2024-03-02/model_version=v2"
+    }
+    rows = 0
+    for f in files:
+        frame = pq.read_table(f).to_pandas()
+        assert len(frame) <= 3
+        assert "model_version" not in frame and "date" not in frame
+        assert set(frame["timestamp"].dt.strftime("%Y-%m-%d")) == {f.parent.parent.name.split("=")[1]}
+        rows += len(frame)
+    assert rows == 9
+    assert sorted(pd.read_parquet(output)["id"]) == list(range(2, 11))
+    
+    csv = tmp_path / "v2.csv"
+    assert PredictionExporter(chunk_size=2).write(str(csv), file_format="csv", model_version="v2")["rows"] == 5
+    frame = pd.read_csv(csv)
+    assert frame["id"].tolist() == [2, 4, 6, 8, 10] and set(frame["model_version"]) == {"v2"}
+
+
+def test_partitioned_export_reads_back_as_one_dataset(db_session, tmp_path):
+    """The export directory reads back whole, partition keys from the paths and null versions as null"""
+    base = add_predictions(db_session)
+    db_session.add(Prediction(customer_id="CUST_X", prediction=0.0, probability=0.1, timestamp=base))
+    db_session.commit()
+    output = tmp_path / "export"
+    
+    PredictionExporter(chunk_size=4).write(str(output), partition_by=["day", "model_version"])
+    
+    assert (output / "date=2024-03-01" / "model_version=__HIVE_DEFAULT_PARTITION__").is_dir()
+    table = ds.dataset(output, format="parquet", partitioning="hive").to_table().sort_by("id")
+    assert table["id"].to_pylist() == list(range(1, 12))
+    assert table["model_version"].to_pylist() == [f"v{i % 2 + 1}" for i in range(10)] + [None]
+    frame = table.to_pandas()
+    assert (frame["date"] == frame["timestamp"].dt.strftime("%Y-%m-%d")).all()
+
+
+def test_endpoint_streams_one_file_a_chunk_at_a_time(client, db_session, monkeypatch):
+    """The endpoint returns a single Parquet file with a row group per chunk, or a filtered CSV"""
+    base = add_predictions(db_session)
+    monkeypatch.setattr(settings, "export_chunk_size", 4)
+    
+    response = client.get("/api/v1/predictions/export")
+    assert response.status_code == 200
+    parquet = pq.ParquetFile(io.BytesIO(response.content))
+    assert parquet.metadata.num_rows == 10 and parquet.num_row_groups == 3
+    assert parquet.read()["id"].to_pylist() == list(range(1, 11))
+    
+    params = {"format": "csv", "model_version": "v1", "end": (base + timedelta(hours=5)).isoformat()}
+    response = client.get("/api/v1/predictions/export", params=params)
+    assert response.headers["content-type"].startswith("text/csv")
+    assert pd.read_csv(io.StringIO(response.text))["id"].tolist() == [1, 3, 5]
+    
+    assert client.get("/api/v1/predictions/export", params={"format": "json"}).status_code == 422
@@ -0,0 +1,66 @@
+"""Unit tests for the keyset-paginated prediction history"""
+import asyncio
+from datetime import datetime, timedelta
+from app.database import dispose_async_engines
+from app.models import Prediction
+from app.services.prediction_history import PredictionHistoryService
+
+
+def add_predictions(db_session):
+    """Twelve predictions for two customers and versions, several sharing a timestamp"""
+    base = datetime(2024, 3, 1, 12, 0, 0)
+    for i in range(12):
+        db_session.add(Prediction(
+            customer_id=f"CUST_{i % 2}", model_version="v2" if i % 3 == 0 else "v1",
+            prediction=float(i % 2), probability=i / 20, timestamp=base + timedelta(minutes=i // 3)
+        ))
+    db_session.commit()
+    return base
+
+
+def walk(**params):
+    """All pages of a query, following next_cursor"""
+    async def run():
+        pages, cursor = [], None
+        try:
+            while True:
+                page = await PredictionHistoryService().page(cursor=cursor, **params)
+                pages.append(page["predictions"])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    return pages
+        finally:
+            await dispose_async_engines()
+    return asyncio.run(run())
+
+
+def test_pages_cover_every_prediction_once_newest_first(client, db_session):
+    """Walking the cursors returns each row once in (timestamp, id) descending order, ties included"""
+    add_predictions(db_session)
+    
+    pages = walk(limit=5)
+    assert [len(page) for page in pages] == [5, 5, 2]
+    rows = [row for page in pages for row in page]
+    keys = [(row["timestamp"], row["id"]) for row in rows]
+    assert keys == sorted(keys, reverse=True)
+    assert sorted(row["id"] for row in rows) == list(range(1, 13))
+    
+    response = client.get("/api/v1/predictions/history", params={"limit": 5})
+    assert response.status_code == 200
+    assert [row["id"] for row in response.json()["predictions"]] == [row["id"] for row in pages[0]]
+
+
+def test_filters_and_time_range(client, db_session):
+    """customer_id, model_version and [start, end) narrow every page; a bad cursor is rejected"""
+    base = add_predictions(db_session)
+    
+    rows = [row for page in walk(customer_id="CUST_1", model_version="v1", limit=2) for row in page]
+    assert {(row["customer_id"], row["model_version"]) for row in rows} == {("CUST_1", "v1")}
+    assert len(rows) == 4
+    
+    rows = [row for page in walk(start=base + timedelta(minutes=1), end=base + timedelta(minutes=3), limit=4)
+            for row in page]
+    assert sorted(row["id"] for row in rows) == list(range(4, 10))
+    
+    response = client.get("/api/v1/predictions/history", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
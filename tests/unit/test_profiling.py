@@ -0,0 +1,62 @@
+"""Unit tests for on-demand profiling"""
+import marshal
+import threading
+from app.config import settings
+from app.profiling import SamplingProfiler, RequestProfiler, stats_to_bytes, stats_to_text
+
+
+def _busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampling_profiler_collapses_stacks():
+    """Samples of a busy thread show up as collapsed stacks"""
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,), name="busy")
+    worker.start()
+    try:
+        result = SamplingProfiler(interval=0.001).sample(0.2)
+    finally:
+        stop.set()
+        worker.join()
+    
+    assert result["samples"] > 0
+    busy = [line for line in result["collapsed"].splitlines() if line.startswith("busy;")]
+    assert busy and all("_busy_loop" in line for line in busy)
+
+
+def test_request_profiler_profiles_matching_requests_only():
+    """Only the armed route is profiled, up to the requested count"""
+    profiler = RequestProfiler()
+    assert profiler.begin("/api/v1/predict") is None
+    
+    profiler.arm("/api/v1/predict", 2)
+    assert profiler.begin("/api/v1/models") is None
+    for _ in range(2):
+        profile = profiler.begin("/api/v1/predict")
+        sum(range(1000))
+        profiler.end(profile)
+    
+    assert profiler.done
+    assert profiler.begin("/api/v1/predict") is None
+    stats = profiler.collect()
+    assert profiler.profiled == 2
+    assert marshal.loads(stats_to_bytes(stats))
+    assert "function calls" in stats_to_text(stats)
+
+
+def test_admin_api_requires_token(client, monkeypatch):
+    """Admin endpoints are closed unless a token is configured and sent"""
+    response = client.post("/api/v1/admin/profile/sample", params={"seconds": 0.05})
+    assert response.status_code == 403
+    
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    response = client.post("/api/v1/admin/profile/sample", params={"seconds": 0.05},
+                           headers={"X-Admin-Token": "wrong"})
+    assert response.status_code == 403
+    
+    response = client.post("/api/v1/admin/profile/sample", params={"seconds": 0.05},
+                           headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.headers["X-Worker-Pid"]
@@ -0,0 +1,64 @@
+"""Unit tests for precomputed scores and read-through serving"""
+import asyncio
+from sqlalchemy import update
+from app.config import settings
+from app.database import dispose_async_engines
+from app.models import CustomerScore
+from app.schemas import CustomerFeatures
+from app.services.prediction_service import PredictionService
+
+
+def precompute(customers):
+    async def run():
+        try:
+            return await PredictionService().precompute_scores([CustomerFeatures(**c) for c in customers])
+        finally:
+            await dispose_async_engines()
+    return asyncio.run(run())
+
+
+def test_read_through_serves_stored_scores_only_for_unchanged_features(client, db_session, register_model,
+                                                                       sample_customer_data, monkeypatch):
+    """A stored score answers while the features hash matches; changed features are scored live"""
+    register_model("scores_v1")
+    customers = [dict(sample_customer_data, customer_id=f"CUST_{i}", tenure=i) for i in range(4)]
+    stored = precompute(customers)
+    assert stored["stored"] == 4 and stored["model_version"] == "scores_v1"
+    
+    # Mark the stored scores so answers from the store are recognizable
+    db_session.execute(update(CustomerScore).values(probability=0.999))
+    db_session.commit()
+    
+    live = client.post("/api/v1/predict", json={"customer": customers[1]}).json()
+    assert live["probability"] != 0.999
+    
+    monkeypatch.setattr(settings, "score_serving_mode", "read_through")
+    single = client.post("/api/v1/predict", json={"customer": customers[1]}).json()
+    assert single["probability"] == 0.999 and single["model_version"] == "scores_v1"
+    
+    changed = dict(customers[2], monthly_charges=99.0)
+    batch = client.post("/api/v1/predict/batch", json={"customers": [customers[0], changed, customers[3]]}).json()
+    probabilities = [p["probability"] for p in batch["predictions"]]
+    assert probabilities[0] == probabilities[2] == 0.999
+    assert probabilities[1] != 0.999
+    assert [p["customer_id"] for p in batch["predictions"]] == ["CUST_0", "CUST_2", "CUST_3"]
+    
+    explained = client.post("/api/v1/predict?explain=true", json={"customer": customers[1]}).json()
+    assert explained["probability"] == live["probability"]
+
+
+def test_top_k_is_ordered_by_risk(client, register_model, sample_customer_data):
+    """The top-K endpoint returns the highest stored probabilities of the active version first"""
+    register_model("scores_v2")
+    customers = [dict(sample_customer_data, customer_id=f"CUST_{i}", tenure=i * 7, contract_type=contract)
+                 for i, contract in enumerate(["Month-to-month", "One year", "Two year"] * 3)]
+    stored = precompute(customers)
+    
+    response = client.get("/api/v1/scores/top", params={"k": 3})
+    assert response.status_code == 200
+    top = response.json()
+    assert top["model_version"] == "scores_v2"
+    expected = sorted(stored["probabilities"], reverse=True)[:3]
+    assert [c["probability"] for c in top["customers"]] == expected
+    
+    assert client.get("/api/v1/scores/top", params={"model_version": "unknown"}).json()["customers"] == []
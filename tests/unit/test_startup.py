@@ -0,0 +1,35 @@
+"""Unit tests for startup timing and readiness"""
+import subprocess
+import sys
+from app.startup import StartupTracker
+
+
+def test_serving_import_does_not_load_training_stack():
+    """Importing the app leaves mlflow and sklearn for first use"""
+    code = (
+        "import sys, app.main; "
+        "print('heavy:' + ','.join(m for m in ('mlflow', 'sklearn') if m in sys.modules))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert output.stdout.strip().splitlines()[-1] == "heavy:"
+
+
+def test_startup_tracker_records_stages_and_readiness():
+    """Stages are timed and readiness flips once marked"""
+    tracker = StartupTracker(started=0.0)
+    with tracker.stage("load_models"):
+        pass
+    
+    assert not tracker.status()["ready"]
+    tracker.mark_ready()
+    status = tracker.status()
+    assert status["ready"]
+    assert "load_models" in status["stages"]
+    assert status["time_to_ready_seconds"] > 0
+
+
+def test_readiness_endpoint_before_startup(client):
+    """Without the lifespan startup stages the worker is not ready"""
+    response = client.get("/api/v1/health/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
@@ -0,0 +1,25 @@
+"""Unit tests for model warm-up"""
+from scripts.generate_data import generate_customer_data
+from app.ml.drift import build_reference, sample_reference, StreamingDriftSketch
+from app.ml.model_manager import ModelManager
+
+
+def test_sampled_rows_follow_reference():
+    """Synthetic warm-up rows are distributed like the training data"""
+    reference = build_reference(generate_customer_data(n_samples=1000))
+    sketch = StreamingDriftSketch(reference)
+    
+    sketch.update(sample_reference(reference, 5000))
+    
+    assert all(scores["psi"] < 0.1 for scores in sketch.scores().values())
+
+
+def test_warm_up_runs_every_batch_size(register_model):
+    """Active and canary models are warmed up at each batch size"""
+    register_model("v1", traffic_percent=90, run_id="run_active", drift_reference=True)
+    register_model("v2", status="canary", traffic_percent=10, run_id="run_canary")
+    
+    report = ModelManager().warm_up(batch_sizes=[1, 10, 50], rounds=1)
+    
+    assert set(report) == {"v1", "v2"}
+    assert all(set(timings) == {1, 10, 50} for timings in report.values())